@@ -0,0 +1,138 @@
+"""partition queries by month and add daily rollups
+
+Revision ID: partition_queries_monthly
+Revises:
+Create Date: 2025-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+from datetime import date, datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_queries_monthly'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Partitions are created from the oldest existing row up to this many months ahead
+PARTITIONS_AHEAD_MONTHS = 2
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_month_partitions(first_month: date, last_month: date) -> None:
+    month = first_month
+    while month <= last_month:
+        start = f"{month:%Y-%m-%d} 00:00:00+00"
+        end = f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00"
+        op.execute(f"CREATE TABLE queries_{month:%Y_%m} PARTITION OF queries "
+                   f"FOR VALUES FROM ('{start}') TO ('{end}')")
+        month = add_months(month, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+
+    # users is normally created by the app at boot; the partitioned table references it
+    from database import User
+    User.__table__.create(bind=conn, checkfirst=True)
+
+    relkind = conn.execute(sa.text("SELECT relkind FROM pg_class WHERE relname = 'queries'")).scalar()
+    legacy = relkind == 'r'
+    if legacy:
+        # Keep the old table (and free its index names) until its rows are copied
+        op.execute("ALTER TABLE queries RENAME TO queries_unpartitioned")
+        op.execute("ALTER INDEX IF EXISTS queries_pkey RENAME TO queries_unpartitioned_pkey")
+        op.execute("ALTER INDEX IF EXISTS ix_queries_id RENAME TO ix_queries_unpartitioned_id")
+
+    if relkind != 'p':
+        op.execute("CREATE SEQUENCE IF NOT EXISTS queries_id_seq")
+        op.execute("""
+            CREATE TABLE queries (
+                id INTEGER NOT NULL DEFAULT nextval('queries_id_seq'),
+                user_id INTEGER REFERENCES users (id),
+                query_text TEXT,
+                response_text TEXT,
+                module_used VARCHAR,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                PRIMARY KEY (id, created_at)
+            ) PARTITION BY RANGE (created_at)
+        """)
+        op.execute("CREATE INDEX ix_queries_id ON queries (id)")
+        op.execute("CREATE INDEX ix_queries_user_id_created_at ON queries (user_id, created_at)")
+        op.execute("CREATE TABLE queries_default PARTITION OF queries DEFAULT")
+
+        this_month = datetime.now(timezone.utc).date().replace(day=1)
+        first_month = this_month
+        if legacy:
+            oldest = conn.execute(sa.text("SELECT MIN(created_at) FROM queries_unpartitioned")).scalar()
+            if oldest:
+                first_month = min(first_month, oldest.astimezone(timezone.utc).date().replace(day=1))
+        create_month_partitions(first_month, add_months(this_month, PARTITIONS_AHEAD_MONTHS))
+
+    if legacy:
+        op.execute("""
+            INSERT INTO queries (id, user_id, query_text, response_text, module_used, created_at)
+            SELECT id, user_id, query_text, response_text, module_used, COALESCE(created_at, now())
+            FROM queries_unpartitioned
+        """)
+        # The sequence belongs to the old table; detach it so it survives the drop
+        op.execute("ALTER SEQUENCE queries_id_seq OWNED BY NONE")
+        op.execute("DROP TABLE queries_unpartitioned")
+        op.execute("SELECT setval('queries_id_seq', COALESCE((SELECT MAX(id) FROM queries), 0) + 1, false)")
+    op.execute("ALTER SEQUENCE queries_id_seq OWNED BY queries.id")
+
+    if sa.inspect(conn).has_table('query_daily_rollups'):
+        return
+
+    op.create_table(
+        'query_daily_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('module_used', sa.String(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('query_count', sa.Integer(), nullable=False),
+    )
+    op.create_index('ix_query_daily_rollups_day', 'query_daily_rollups', ['day'])
+    op.create_index('ix_query_daily_rollups_user_id', 'query_daily_rollups', ['user_id'])
+
+    # Backfill rollups for the rows that already exist
+    op.execute("""
+        INSERT INTO query_daily_rollups (day, module_used, user_id, query_count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, module_used, user_id, COUNT(*)
+        FROM queries
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('query_daily_rollups')
+
+    op.execute("ALTER TABLE queries RENAME TO queries_partitioned")
+    op.execute("ALTER INDEX queries_pkey RENAME TO queries_partitioned_pkey")
+    op.execute("ALTER INDEX ix_queries_id RENAME TO ix_queries_partitioned_id")
+    op.execute("ALTER INDEX ix_queries_user_id_created_at RENAME TO ix_queries_partitioned_user_id_created_at")
+    op.execute("""
+        CREATE TABLE queries (
+            id INTEGER PRIMARY KEY DEFAULT nextval('queries_id_seq'),
+            user_id INTEGER REFERENCES users (id),
+            query_text TEXT,
+            response_text TEXT,
+            module_used VARCHAR,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX ix_queries_id ON queries (id)")
+    op.execute("INSERT INTO queries SELECT * FROM queries_partitioned")
+    op.execute("ALTER SEQUENCE queries_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE queries_partitioned")
+    op.execute("ALTER SEQUENCE queries_id_seq OWNED BY queries.id")
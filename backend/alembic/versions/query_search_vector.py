@@ -0,0 +1,36 @@
+"""add full-text search vector to queries
+
+Revision ID: query_search_vector
+Revises: partition_queries_monthly
+Create Date: 2025-10-20 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'query_search_vector'
+down_revision: Union[str, None] = 'partition_queries_monthly'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    from database import QUERY_SEARCH_DOCUMENT
+
+    # Both statements propagate to every partition; IF NOT EXISTS covers
+    # tables that create_tables() already built with the column
+    op.execute(f"""
+        ALTER TABLE queries ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS ({QUERY_SEARCH_DOCUMENT}) STORED
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_queries_search_vector ON queries USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_queries_search_vector")
+    op.execute("ALTER TABLE queries DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,42 @@
+"""add persistent recipe cache
+
+Revision ID: recipe_cache
+Revises: query_search_vector
+Create Date: 2025-10-21 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'recipe_cache'
+down_revision: Union[str, None] = 'query_search_vector'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_tables() may already have built it at boot
+    if sa.inspect(op.get_bind()).has_table('recipe_cache'):
+        return
+
+    op.create_table(
+        'recipe_cache',
+        sa.Column('dish_key', sa.String(), primary_key=True),
+        sa.Column('dish_name', sa.String(), nullable=False),
+        sa.Column('title', sa.Text(), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('ingredients', postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column('instructions', postgresql.JSONB(), nullable=False, server_default=sa.text("'[]'::jsonb")),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recipe_cache')
@@ -3,9 +3,17 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from database import get_db, User
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_read_db, is_replica_session, AsyncSessionLocal, User
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+import asyncio
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,22 +23,142 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Resolved users are cached per (sub, exp) for this long; 0 disables the cache
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+# Trust the signed name/email claims in access tokens for optional auth (no DB lookup)
+TRUST_TOKEN_CLAIMS = os.getenv("TRUST_TOKEN_CLAIMS", "true").lower() == "true"
+# ...but only this long after the token was issued. Invalidation only reaches the
+# worker that made the change, so this (and the cache TTL) bound how long other
+# workers can accept a deleted or changed user's token
+TOKEN_CLAIMS_TRUST_SECONDS = int(os.getenv("TOKEN_CLAIMS_TRUST_SECONDS", "60"))
+
+# bcrypt work factor. Hashes made with a different cost are rehashed on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# At most this many hashes run at once; further signups/logins wait their turn
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+# Dedicated pool so bcrypt never runs on the event loop or competes with the
+# request thread pool; bcrypt releases the GIL while hashing
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password")
 security = HTTPBearer(auto_error=False)  # Set auto_error=False for optional auth
 
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, detached from any database session"""
+    id: int
+    name: str
+    email: str
+    created_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, name=user.name, email=user.email, created_at=user.created_at)
+
+class PrincipalCache:
+    """Thread-safe TTL + LRU cache of principals keyed by token (sub, exp)"""
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._revoked = {}  # sub -> time until which its tokens are rejected
+        self._lock = threading.Lock()
+
+    def get(self, sub: str, exp) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get((sub, exp))
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[(sub, exp)]
+                return None
+            self._entries.move_to_end((sub, exp))
+            return principal
+
+    def set(self, sub: str, exp, principal: Principal):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[(sub, exp)] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end((sub, exp))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, sub: str, revoke: bool = False):
+        """Drop every cached entry for sub; revoke also rejects its claims-only tokens"""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == sub]:
+                del self._entries[key]
+            if revoke:
+                self._revoked[sub] = time.monotonic() + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+    def is_revoked(self, sub: str) -> bool:
+        with self._lock:
+            revoked_until = self._revoked.get(sub)
+            if revoked_until is None:
+                return False
+            if revoked_until < time.monotonic():
+                del self._revoked[sub]
+                return False
+            return True
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+
+# Invalidation hooks: any change to a user made through the ORM drops their cached
+# principal. They only reach this process's cache and don't fire for Core
+# update()/delete(); everywhere else PRINCIPAL_CACHE_TTL_SECONDS and
+# TOKEN_CLAIMS_TRUST_SECONDS bound how long a stale principal is served.
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    principal_cache.invalidate(str(target.id))
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    principal_cache.invalidate(str(target.id), revoke=True)
+
+def user_claims(user: User) -> dict:
+    """Minimal signed user claims carried in the access token"""
+    return {"sub": str(user.id), "name": user.name, "email": user.email}
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the password executor without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password on the password executor.
+
+    Returns (valid, new_hash). new_hash is set when the stored hash was made
+    with a different bcrypt cost and should replace it.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -52,7 +180,14 @@ def verify_token(token: str):
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return {"user_id": user_id, "type": token_type}
+        return {
+            "user_id": user_id,
+            "type": token_type,
+            "exp": payload.get("exp"),
+            "iat": payload.get("iat"),
+            "name": payload.get("name"),
+            "email": payload.get("email"),
+        }
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -60,7 +195,41 @@ def verify_token(token: str):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def resolve_principal(token_data: dict, db: AsyncSession) -> Optional[Principal]:
+    """Look up the token's user, going to the database only on a cache miss"""
+    sub = str(token_data["user_id"])
+    principal = principal_cache.get(sub, token_data["exp"])
+    if principal:
+        return principal
+
+    result = await db.execute(select(User).where(User.id == int(sub)))
+    user = result.scalar_one_or_none()
+    if user is None and is_replica_session(db):
+        # The user may be newer than the replica (e.g. just signed up)
+        async with AsyncSessionLocal() as primary:
+            result = await primary.execute(select(User).where(User.id == int(sub)))
+            user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(sub, token_data["exp"], principal)
+    return principal
+
+def principal_from_claims(token_data: dict) -> Optional[Principal]:
+    """
+    Build a principal from the access token's own claims, if it carries them
+    and was issued within TOKEN_CLAIMS_TRUST_SECONDS
+    """
+    if not TRUST_TOKEN_CLAIMS or not token_data.get("email") or not token_data.get("iat"):
+        return None
+    if time.time() - token_data["iat"] > TOKEN_CLAIMS_TRUST_SECONDS:
+        return None
+    sub = str(token_data["user_id"])
+    if principal_cache.is_revoked(sub):
+        return None
+    return Principal(id=int(sub), name=token_data.get("name") or "", email=token_data["email"])
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_read_db)):
     if not credentials:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,7 +247,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == int(token_data["user_id"])).first()
+    user = await resolve_principal(token_data, db)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -87,7 +256,7 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         )
     return user
 
-def get_current_user_optional(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user_optional(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_read_db)):
     """Optional authentication - returns None if no token or invalid token"""
     try:
         if not credentials:
@@ -98,7 +267,10 @@ def get_current_user_optional(credentials: HTTPAuthorizationCredentials = Depend
         if token_data["type"] != "access":
             return None
         
-        user = db.query(User).filter(User.id == int(token_data["user_id"])).first()
-        return user
-    except:
+        # Signed claims are enough to attribute a query, no database round trip
+        principal = principal_from_claims(token_data)
+        if principal:
+            return principal
+        return await resolve_principal(token_data, db)
+    except Exception:
         return None
@@ -37,6 +37,24 @@ class TextClassifier:
             predictions, _ = self.model.predict([text])
         return self.label_encoder.inverse_transform([int(predictions[0])])[0]
 
+    def classify_many(self, texts: list[str]) -> list[str]:
+        """Returns the predicted category for each text in a single predict call"""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            predictions, _ = self.model.predict(list(texts))
+        return list(self.label_encoder.inverse_transform([int(p) for p in predictions]))
+
+_classifier = None
+
+def get_classifier() -> TextClassifier:
+    """Returns the shared classifier, loading the model on first use"""
+    global _classifier
+    if _classifier is None:
+        _classifier = TextClassifier()
+    return _classifier
+
 def classify_user_input(user_text: str) -> str:
-    classifier = TextClassifier()
-    return classifier.classify(user_text)
\ No newline at end of file
+    return get_classifier().classify(user_text)
+
+def classify_user_inputs(user_texts: list[str]) -> list[str]:
+    return get_classifier().classify_many(user_texts)
@@ -1,16 +1,27 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Date, Text, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
-from sqlalchemy.sql import func
+from sqlalchemy.orm import sessionmaker, Session, relationship, deferred
+from sqlalchemy.sql import func, text
+from v1.db.db import async_engine, AsyncSessionLocal
+from v1.db.replicas import get_read_db, is_replica_session, router as replica_router
+from v1.db.instrumentation import InstrumentedQueuePool, instrument_engine
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# Database URL
+# Full-text document for query history search; query_text is weighted above response_text
+QUERY_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(query_text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(response_text, '')), 'B')"
+)
+
+# Database URL (sync engine, used for schema creation at boot and by the module pipeline's worker threads)
 DATABASE_URL = f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}@{os.getenv('DB_HOST', 'localhost')}:{os.getenv('DB_PORT', '5432')}/{os.getenv('POSTGRES_DB')}"
 
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, pool_logging_name="sync")
+instrument_engine(engine, "sync")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -29,25 +40,64 @@ class User(Base):
 
 class Query(Base):
     __tablename__ = "queries"
+    # Partitioned by month on created_at (see partitions.py), so created_at
+    # has to be part of the primary key
+    __table_args__ = (
+        Index("ix_queries_user_id_created_at", "user_id", "created_at"),
+        Index("ix_queries_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # nullable for guest users
     query_text = Column(Text, nullable=True)
     response_text = Column(Text)
     module_used = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    # Maintained by Postgres; deferred so plain history reads don't load it
+    search_vector = deferred(Column(TSVECTOR, Computed(QUERY_SEARCH_DOCUMENT, persisted=True)))
     
     # Relationship to user
     user = relationship("User", back_populates="queries")
 
+class DailyQueryRollup(Base):
+    __tablename__ = "query_daily_rollups"
+    
+    # Per-day query counts by module and user, filled by partitions.py
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False, index=True)
+    module_used = Column(String, nullable=True)
+    user_id = Column(Integer, nullable=True, index=True)  # no FK: counts outlive deleted users
+    query_count = Column(Integer, nullable=False)
+
+class RecipeCache(Base):
+    __tablename__ = "recipe_cache"
+    
+    # Parsed recipes keyed by normalized dish name (see modules/cooking/recipestore.py)
+    dish_key = Column(String, primary_key=True)
+    dish_name = Column(String, nullable=False)  # as first searched; used to refresh the entry
+    title = Column(Text, nullable=False)
+    url = Column(Text, nullable=False)
+    ingredients = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    instructions = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    fetched_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
 # Create tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # A freshly created queries table needs partitions before the first insert.
+    # Existing unpartitioned tables are converted by the Alembic migration instead.
+    with engine.begin() as conn:
+        relkind = conn.execute(text("SELECT relkind FROM pg_class WHERE relname = 'queries'")).scalar()
+        if relkind != 'p':
+            return
+        if conn.execute(text("SELECT to_regclass('queries_default')")).scalar() is None:
+            conn.execute(text("CREATE TABLE queries_default PARTITION OF queries DEFAULT"))
+        from partitions import ensure_partitions
+        ensure_partitions(conn)
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+# Dependency to get an async DB session (asyncpg pool from v1.db.db)
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import os
+import time
+from typing import Optional
+
+# Total time budget for one request, shared by every pipeline stage
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "60"))
+
+# Extra time given to a stage to return its partial answer after the deadline
+DEADLINE_GRACE_SECONDS = 1.0
+
+_current_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request has no time budget left for the next step"""
+
+
+class Deadline:
+    """
+    Absolute deadline for one request.
+
+    Stages ask it how much budget remains instead of using their own fixed
+    timeouts, and record a partial answer that can be returned if the
+    deadline passes before they finish.
+    """
+
+    def __init__(self, seconds: float = REQUEST_DEADLINE_SECONDS, expires_at: Optional[float] = None):
+        self.expires_at = expires_at if expires_at is not None else time.monotonic() + seconds
+        self.partial_result = None
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Returns the remaining budget, capped at cap. Raises DeadlineExceeded if none is left."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline exceeded")
+        return min(cap, remaining) if cap is not None else remaining
+
+    def child(self) -> "Deadline":
+        """Returns a deadline with the same expiry but its own partial result"""
+        return Deadline(expires_at=self.expires_at)
+
+
+def get_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def request_timeout(cap: float) -> float:
+    """
+    Timeout to use for an outbound call: cap, or less if the request deadline is closer.
+
+    Raises DeadlineExceeded if the request has already run out of time.
+    """
+    deadline = get_deadline()
+    return deadline.timeout(cap) if deadline else cap
+
+
+def deadline_expired() -> bool:
+    deadline = get_deadline()
+    return deadline.expired() if deadline else False
+
+
+def backoff(seconds: float):
+    """Sleep before a retry, unless the request deadline would pass first"""
+    deadline = get_deadline()
+    if deadline and deadline.remaining() <= seconds:
+        raise DeadlineExceeded("Request deadline exceeded")
+    time.sleep(seconds)
+
+
+async def backoff_async(seconds: float):
+    """backoff() for coroutines: sleeps without blocking the event loop"""
+    deadline = get_deadline()
+    if deadline and deadline.remaining() <= seconds:
+        raise DeadlineExceeded("Request deadline exceeded")
+    await asyncio.sleep(seconds)
+
+
+def set_partial_result(result):
+    """Record the best answer so far, returned if the deadline passes before the stage finishes"""
+    deadline = get_deadline()
+    if deadline:
+        deadline.partial_result = result
+
+
+async def run_with_deadline(deadline: Deadline, func, *args, executor=None):
+    """
+    Run a blocking pipeline stage in a worker thread bound to deadline.
+
+    Outbound calls inside func see the deadline through request_timeout().
+    Raises DeadlineExceeded if the stage has not finished shortly after the
+    deadline; the stage's own calls then fail fast as they see no budget left.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    context.run(_current_deadline.set, deadline)
+    future = loop.run_in_executor(executor, context.run, func, *args)
+    try:
+        return await asyncio.wait_for(future, timeout=max(deadline.remaining(), 0) + DEADLINE_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("Request deadline exceeded")
@@ -0,0 +1,276 @@
+# Per-host outbound traffic governor for the shared HTTP client (and the Daraz browser)
+# Every host gets a token bucket for its request rate, a cap on requests in
+# flight, jittered exponential backoff for retryable failures (honouring
+# Retry-After on 429) and a circuit breaker that fails fast while the host is
+# unhealthy, so a dead or blocking site costs one quick error instead of a
+# full timeout on every request.
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+from deadline import backoff_async, get_deadline
+
+# (requests per second, burst, requests in flight) per host
+HOST_LIMITS = {
+    "api.groq.com": (10.0, 20, 10),
+    "www.simplyrecipes.com": (2.0, 4, 4),
+    "www.allrecipes.com": (2.0, 4, 4),
+    "www.food.com": (2.0, 4, 4),
+    "news.google.com": (2.0, 4, 4),
+    "duckduckgo.com": (1.0, 2, 2),
+    "www.daraz.com.np": (1.0, 2, 2),
+}
+# Hosts not listed above
+GOVERNOR_DEFAULT_RATE = float(os.getenv("GOVERNOR_DEFAULT_RATE", "50"))
+GOVERNOR_DEFAULT_BURST = int(os.getenv("GOVERNOR_DEFAULT_BURST", "100"))
+# Consecutive failures that open a host's circuit, and how long it then fails fast
+GOVERNOR_FAILURE_THRESHOLD = int(os.getenv("GOVERNOR_FAILURE_THRESHOLD", "5"))
+GOVERNOR_OPEN_SECONDS = float(os.getenv("GOVERNOR_OPEN_SECONDS", "30"))
+# Retries after the first attempt for 429s, 5xx gateway errors and failed connects
+GOVERNOR_MAX_RETRIES = int(os.getenv("GOVERNOR_MAX_RETRIES", "2"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+# Statuses that mean the host is blocking us or down; 429 only slows the host's bucket down
+FAILURE_STATUSES = frozenset({403, 500, 502, 503, 504})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Nothing reached the server, so these are safe to retry even for POSTs
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class HostUnavailable(httpx.TransportError):
+    """Raised without sending the request while a host's circuit is open"""
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, and up to burst at once"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        # updated is in the future while the bucket is paused
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for seconds, e.g. after the host answered 429 with Retry-After"""
+        self._refill()
+        self.tokens = 0.0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+    async def acquire(self):
+        """
+        Take a token, waiting for one if the bucket is empty.
+
+        Raises DeadlineExceeded if the request deadline would pass first.
+        """
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await backoff_async(max(self.updated - time.monotonic(), 0) + (1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Closed until failure_threshold consecutive failures, then open for open_seconds.
+
+    After that one probe request is let through (half-open); it closes the
+    circuit if it succeeds and reopens it if it fails.
+    """
+
+    def __init__(self, failure_threshold: int = GOVERNOR_FAILURE_THRESHOLD,
+                 open_seconds: float = GOVERNOR_OPEN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or time.monotonic() - self.opened_at < self.open_seconds:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "half-open":
+            self.probing = True
+        return state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+
+class HostGovernor:
+    """Rate limit, concurrency cap and circuit breaker for one host"""
+
+    def __init__(self, host: str, rate: float, burst: int, max_in_flight: int):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.breaker = CircuitBreaker()
+
+    def check(self):
+        if not self.breaker.allow():
+            raise HostUnavailable(f"{self.host} is failing, not sending requests to it for now")
+
+    async def acquire(self):
+        """Wait for a slot and a token; raises HostUnavailable while the circuit is open"""
+        # Fail fast without waiting, but only claim the half-open probe once the
+        # waits are over: a probe cancelled while waiting would never be released
+        if self.breaker.state == "open":
+            raise HostUnavailable(f"{self.host} is failing, not sending requests to it for now")
+        await self.in_flight.acquire()
+        try:
+            await self.bucket.acquire()
+            self.check()
+        except BaseException:
+            self.in_flight.release()
+            raise
+
+    def release(self, ok: Optional[bool]):
+        """Give the slot back, recording the outcome (None if it says nothing about the host)"""
+        self.in_flight.release()
+        if ok is True:
+            self.breaker.record_success()
+        elif ok is False:
+            self.breaker.record_failure()
+        else:
+            # A cancelled probe shouldn't leave the circuit open for good
+            self.breaker.probing = False
+
+
+class Governor:
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.hosts: dict[str, HostGovernor] = {}
+
+    def host(self, host: str) -> HostGovernor:
+        governor = self.hosts.get(host)
+        if governor is None:
+            rate, burst, max_in_flight = HOST_LIMITS.get(
+                host, (GOVERNOR_DEFAULT_RATE, GOVERNOR_DEFAULT_BURST, self.max_in_flight))
+            governor = self.hosts[host] = HostGovernor(host, rate, burst, max_in_flight)
+        return governor
+
+
+def retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Retry-After if the host sent one, otherwise full-jitter exponential backoff"""
+    if response is not None and "retry-after" in response.headers:
+        value = response.headers["retry-after"]
+        try:
+            return min(float(value), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            try:
+                return min(max(parsedate_to_datetime(value).timestamp() - time.time(), 0), BACKOFF_MAX_SECONDS)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """Response body that releases its host slot once the body is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self.stream = stream
+        self.release = release
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self.stream.aclose()
+        finally:
+            if self.release:
+                self.release()
+                self.release = None
+
+
+class GovernedTransport(httpx.AsyncBaseTransport):
+    """
+    Sends every request through its host's governor.
+
+    Responses with RETRY_STATUSES and failed connects are retried up to
+    GOVERNOR_MAX_RETRIES times after a jittered backoff, as long as the
+    request deadline allows; the last response is returned as is.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, governor: Governor):
+        self.transport = transport
+        self.governor = governor
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = self.governor.host(request.url.host)
+        attempt = 0
+        while True:
+            await host.acquire()
+            try:
+                response = await self.transport.handle_async_request(request)
+            except RETRY_ERRORS:
+                host.release(False)
+                delay = retry_delay(attempt)
+                if not self.can_retry(host, attempt, delay):
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except httpx.TimeoutException:
+                host.release(False)
+                raise
+            except BaseException:
+                host.release(None)
+                raise
+
+            # None: a 429 says the host is up, just that we're sending too much
+            ok = None if response.status_code == 429 else response.status_code not in FAILURE_STATUSES
+            if response.status_code in RETRY_STATUSES:
+                delay = retry_delay(attempt, response)
+                if response.status_code == 429:
+                    # Every caller waits, not just the one that was told to
+                    host.bucket.pause(delay)
+                if self.can_retry(host, attempt, delay):
+                    await response.aclose()
+                    host.release(ok)
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+
+            response.stream = ReleasingStream(response.stream, lambda: host.release(ok))
+            return response
+
+    @staticmethod
+    def can_retry(host: HostGovernor, attempt: int, delay: float) -> bool:
+        """Retry unless out of attempts, the circuit has opened, or the deadline is closer than delay"""
+        if attempt >= GOVERNOR_MAX_RETRIES or host.breaker.state != "closed":
+            return False
+        deadline = get_deadline()
+        return not deadline or deadline.remaining() > delay
+
+    async def aclose(self):
+        await self.transport.aclose()
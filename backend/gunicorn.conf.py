@@ -0,0 +1,40 @@
+# Production server configuration
+# Run with: gunicorn main:app -c gunicorn.conf.py
+#
+# The app (and with it Whisper, BLIP, the RoBERTa classifier and the recipe
+# index embedder) is imported once in the master process. Workers are then
+# forked from it and share the model weights copy-on-write instead of each
+# holding a private copy.
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+graceful_timeout = 30
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before any worker is forked."""
+    from searchquery import preload_models
+
+    preload_models()
+
+    # Move everything allocated so far into the permanent generation so the
+    # workers' garbage collector never writes to (and un-shares) those pages
+    gc.collect()
+    gc.freeze()
+    server.log.info("Models preloaded and frozen, forking %s workers", workers)
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after fork."""
+    from database import engine, async_engine, replica_router
+
+    # Connections opened by the master (e.g. create_tables) must not be
+    # shared across processes; drop them without closing the master's sockets
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+    replica_router.dispose(close=False)
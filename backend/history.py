@@ -0,0 +1,73 @@
+# Full-text search over a user's query history
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import Query
+
+SEARCH_CONFIG = "english"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(rank: float, created_at: datetime, query_id: int) -> str:
+    """Opaque cursor pointing just after the given result"""
+    payload = json.dumps([rank, created_at.isoformat(), query_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, created_at, query_id = json.loads(base64.urlsafe_b64decode(padded))
+        return float(rank), datetime.fromisoformat(created_at), int(query_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+async def search_queries(
+    db: AsyncSession,
+    user_id: int,
+    q: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Tuple[Query, float]], Optional[str]]:
+    """
+    Search a user's queries, best matches first.
+
+    Args:
+        q: Search text in web search syntax ("quoted phrases", or, -excluded)
+        cursor: next_cursor from the previous page
+
+    Returns:
+        (query, rank) pairs and the cursor for the next page, or None on the last page
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank(Query.search_vector, ts_query).label("rank")
+    # Ties on rank fall back to newest first; id makes the order total
+    stmt = (
+        select(Query, rank)
+        .where(Query.user_id == user_id, Query.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), Query.created_at.desc(), Query.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        # All three keys sort descending, so "after the cursor" is a row comparison
+        stmt = stmt.where(
+            tuple_(func.ts_rank(Query.search_vector, ts_query), Query.created_at, Query.id)
+            < tuple_(*decode_cursor(cursor))
+        )
+
+    rows = (await db.execute(stmt)).all()
+    page = [(query, float(query_rank)) for query, query_rank in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last_query, last_rank = page[-1]
+        next_cursor = encode_cursor(last_rank, last_query.created_at, last_query.id)
+    return page, next_cursor
@@ -0,0 +1,156 @@
+# Application-wide pooled HTTP client for outbound calls (Groq API and scrapers)
+# The app creates it at startup on its event loop; the module pipeline, which
+# runs in worker threads, sends requests through it with get()/post() so
+# connections (and their TCP+TLS handshakes) are reused across calls.
+import asyncio
+import os
+import threading
+from contextlib import contextmanager
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+
+import httpx
+
+from deadline import DEADLINE_GRACE_SECONDS, DeadlineExceeded, get_deadline
+from governor import Governor, GovernedTransport
+
+try:
+    import h2  # noqa: F401 - needed by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connections kept across all hosts, and requests in flight per host unless governor.HOST_LIMITS sets its own
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+# Idle connections are closed after this long
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "60"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true" and HTTP2_AVAILABLE
+# Used when a call doesn't pass its own timeout
+HTTP_DEFAULT_TIMEOUT_SECONDS = 20.0
+
+_client: Optional[httpx.AsyncClient] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_governor: Optional[Governor] = None
+_lock = threading.Lock()
+
+
+def create_client(governor: Optional[Governor] = None) -> httpx.AsyncClient:
+    """New pooled client with keep-alive, HTTP/2 (when h2 is installed) and per-host governed traffic"""
+    transport = httpx.AsyncHTTPTransport(
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=GovernedTransport(transport, governor or Governor(HTTP_MAX_CONNECTIONS_PER_HOST)),
+        timeout=HTTP_DEFAULT_TIMEOUT_SECONDS,
+        follow_redirects=True,
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client on the running loop; call once at app startup"""
+    global _client, _loop, _governor
+    with _lock:
+        if _client is None:
+            _governor = Governor(HTTP_MAX_CONNECTIONS_PER_HOST)
+            _client = create_client(_governor)
+            _loop = asyncio.get_running_loop()
+        return _client
+
+
+async def close_http_client():
+    """Close the shared client's connections; call at app shutdown"""
+    global _client, _loop
+    with _lock:
+        client, _client, _loop = _client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+def _start_background_client():
+    """Outside the app (scripts, module __main__ tests), run the shared client on its own loop thread"""
+    global _client, _loop, _governor
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="http-client", daemon=True).start()
+    _governor = Governor(HTTP_MAX_CONNECTIONS_PER_HOST)
+    _client = create_client(_governor)
+    _loop = loop
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client, for coroutines running on its loop"""
+    with _lock:
+        if _client is None:
+            _start_background_client()
+        return _client
+
+
+def run(coro) -> Any:
+    """
+    Run a coroutine on the shared client's loop from a worker thread and wait for it.
+
+    The coroutine sees the caller's request deadline. Raises DeadlineExceeded
+    if it has not finished shortly after the deadline.
+    """
+    get_client()
+    loop = _loop
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("http_client.run() would block the event loop; await the coroutine instead")
+
+    deadline = get_deadline()
+    # The task is created with a copy of this thread's context, deadline included
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result(timeout=max(deadline.remaining(), 0) + DEADLINE_GRACE_SECONDS if deadline else None)
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded("Request deadline exceeded")
+
+
+def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request on the shared client from synchronous code.
+
+    Takes the same arguments as requests.request for the calls the modules
+    make (headers, params, json, data, timeout); the response is read fully.
+    """
+    return run(get_client().request(method, url, **kwargs))
+
+
+def get(url: str, **kwargs) -> httpx.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> httpx.Response:
+    return request("POST", url, **kwargs)
+
+
+@contextmanager
+def governed(host: str):
+    """
+    Hold host's governor slot around traffic that doesn't go through the shared client.
+
+    For the Daraz browser scraper: waits for the host's rate limit and
+    concurrency cap, raises governor.HostUnavailable while its circuit is
+    open, and counts an exception from the block as a host failure.
+    """
+    get_client()
+    host_governor = _governor.host(host)
+    loop = _loop
+    run(host_governor.acquire())
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        loop.call_soon_threadsafe(host_governor.release, ok)
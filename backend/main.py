@@ -1,17 +1,39 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, status
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Header, status, Query as QueryParam
 import uvicorn
 import os
-from searchquery import query_screenshot, voice_screenshot, query_screenshot_explicit, voice_screenshot_explicit
+import uuid
+import asyncio
+from searchquery import (
+    query_screenshot, voice_screenshot, query_screenshot_explicit, voice_screenshot_explicit,
+    extract_text_or_caption, classify_queries, dispatch_module, batch_executor, SUPPORTED_MODULES
+)
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from database import get_db, create_tables, User, Query
-from auth import get_password_hash, verify_password, create_access_token, create_refresh_token, get_current_user, get_current_user_optional, verify_token
-from schemas import UserCreate, UserLogin, UserResponse, Token, QueryResponse
+from typing import Optional, List
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, get_read_db, create_tables, User, Query, AsyncSessionLocal
+from deadline import Deadline, DeadlineExceeded, run_with_deadline
+from auth import hash_password_async, verify_and_update_password_async, create_access_token, create_refresh_token, get_current_user, get_current_user_optional, verify_token, user_claims, Principal
+from schemas import UserCreate, UserLogin, UserResponse, Token, QueryResponse, QuerySearchResult, QuerySearchPage, query_list_adapter
+from history import search_queries, InvalidCursor
+from v1.db.instrumentation import metrics_snapshot
+from v1.types.serialization import ORJSONResponse, dump_json
+from http_client import start_http_client, close_http_client
+from modules.cooking.recipeindex import warm_recipe_index
+from contextlib import asynccontextmanager
 from datetime import timedelta
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled outbound HTTP client per worker process, shared by every module call
+    await start_http_client()
+    # Build the recipe index in the background so the first cooking query doesn't wait for it
+    warm_recipe_index()
+    yield
+    await close_http_client()
+
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Create database tables on startup
 create_tables()
@@ -29,13 +51,24 @@ app.add_middleware(
 SCREENSHOTS_DIR = "Screenshots"
 os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
 
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10"))
+# When set, /metrics/db requires it in the X-Metrics-Token header
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
 @app.get("/")
 async def root():
     return {"message": "Hello from backend!"}
 
+@app.get("/metrics/db")
+async def database_metrics(top: int = 50, x_metrics_token: Optional[str] = Header(None)):
+    """Per-statement latency histograms, pool checkout waits and recent slow queries for this worker"""
+    if METRICS_TOKEN and x_metrics_token != METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid metrics token")
+    return metrics_snapshot(top=top)
+
 # Authentication endpoints
 @app.post("/auth/signup", response_model=UserResponse)
-async def signup(user: UserCreate, db: Session = Depends(get_db)):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if passwords match
     if user.password != user.confirm_password:
         raise HTTPException(
@@ -44,7 +77,8 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalar_one_or_none()
     if db_user:
         raise HTTPException(
             status_code=400,
@@ -52,29 +86,43 @@ async def signup(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password_async(user.password)
     db_user = User(
         name=user.name,
         email=user.email,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
 @app.post("/auth/login", response_model=Token)
-async def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(User).where(User.email == user.email))
+    db_user = result.scalar_one_or_none()
+    if not db_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    valid, new_hash = await verify_and_update_password_async(user.password, db_user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    # Transparently upgrade hashes made with an old bcrypt cost
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
     
-    access_token = create_access_token(data={"sub": str(db_user.id)})
+    access_token = create_access_token(data=user_claims(db_user))
     refresh_token = create_refresh_token(data={"sub": str(db_user.id)})
     
     return {
@@ -84,7 +132,7 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
     }
 
 @app.post("/auth/refresh", response_model=Token)
-async def refresh_token(refresh_token: str = Form(...), db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str = Form(...), db: AsyncSession = Depends(get_db)):
     try:
         token_data = verify_token(refresh_token)
         if token_data["type"] != "refresh":
@@ -93,14 +141,15 @@ async def refresh_token(refresh_token: str = Form(...), db: Session = Depends(ge
                 detail="Invalid token type",
             )
         
-        user = db.query(User).filter(User.id == int(token_data["user_id"])).first()
+        result = await db.execute(select(User).where(User.id == int(token_data["user_id"])))
+        user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found",
             )
         
-        new_access_token = create_access_token(data={"sub": str(user.id)})
+        new_access_token = create_access_token(data=user_claims(user))
         new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
         
         return {
@@ -115,13 +164,47 @@ async def refresh_token(refresh_token: str = Form(...), db: Session = Depends(ge
         )
 
 @app.get("/auth/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     return current_user
 
 @app.get("/auth/queries", response_model=list[QueryResponse])
-async def get_user_queries(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    queries = db.query(Query).filter(Query.user_id == current_user.id).order_by(Query.created_at.desc()).all()
-    return queries
+async def get_user_queries(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    # One TypeAdapter validates and serializes the whole list in pydantic-core:
+    # building a QueryResponse per row and running jsonable_encoder over it
+    # dominates the cost of long histories
+    result = await db.execute(
+        select(*(getattr(Query, field) for field in QueryResponse.model_fields))
+        .where(Query.user_id == current_user.id)
+        .order_by(Query.created_at.desc())
+    )
+    queries = query_list_adapter.validate_python([dict(row) for row in result.mappings()])
+    return Response(content=query_list_adapter.dump_json(queries), media_type="application/json")
+
+@app.get("/auth/queries/search", response_model=QuerySearchPage)
+async def search_user_queries(
+    q: str = QueryParam(..., min_length=1, max_length=200),
+    limit: int = QueryParam(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    try:
+        page, next_cursor = await search_queries(db, current_user.id, q, limit=limit, cursor=cursor)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    results = [
+        QuerySearchResult(**QueryResponse.model_validate(query).model_dump(), rank=rank)
+        for query, rank in page
+    ]
+    return QuerySearchPage(results=results, next_cursor=next_cursor)
+
+async def run_pipeline(deadline: Deadline, func, *args, executor=None):
+    """Run a blocking pipeline function under the request deadline, falling back to its partial answer"""
+    try:
+        return await run_with_deadline(deadline, func, *args, executor=executor)
+    except DeadlineExceeded:
+        return deadline.partial_result or "Sorry, this request took too long to process. Please try again."
 
 # Helper function to process requests
 async def process_request(
@@ -129,10 +212,13 @@ async def process_request(
     image: UploadFile = None,
     audio: Optional[UploadFile] = None,
     module: Optional[str] = None,
-    current_user: Optional[User] = None,
-    db: Session = None
+    current_user: Optional[Principal] = None,
+    db: AsyncSession = None
 ):
     """Common processing logic for all endpoints"""
+    # Every stage and outbound call below shares this time budget
+    deadline = Deadline()
+
     # Validate exactly one input method is provided
     if not (bool(text) ^ bool(audio)):
         raise HTTPException(
@@ -165,9 +251,9 @@ async def process_request(
             
             audio_bytes = await audio.read()
             if module:
-                result = voice_screenshot_explicit(audio_bytes, image_path, module)
+                result = await run_pipeline(deadline, voice_screenshot_explicit, audio_bytes, image_path, module)
             else:
-                result = voice_screenshot(audio_bytes, image_path)
+                result = await run_pipeline(deadline, voice_screenshot, audio_bytes, image_path)
             query_text = None  # For audio, we don't store the transcribed text directly
         else:
             if not text or not text.strip():
@@ -177,9 +263,9 @@ async def process_request(
                 )
             query_text = text.strip()
             if module:
-                result = query_screenshot_explicit(query_text, image_path, module)
+                result = await run_pipeline(deadline, query_screenshot_explicit, query_text, image_path, module)
             else:
-                result = query_screenshot(query_text, image_path)
+                result = await run_pipeline(deadline, query_screenshot, query_text, image_path)
         
         # Store query in database
         if db:
@@ -190,8 +276,7 @@ async def process_request(
                 module_used=module
             )
             db.add(db_query)
-            db.commit()
-            db.refresh(db_query)
+            await db.commit()
         
         return {"result": result}
     
@@ -200,22 +285,188 @@ async def process_request(
         if os.path.exists(image_path):
             os.remove(image_path)
 
+async def prepare_batch(
+    texts: List[str],
+    images: List[UploadFile],
+    module: Optional[str] = None
+):
+    """Validate a batch request and save its images, returning (queries, image_paths)"""
+    if not images:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one image is required"
+        )
+    if len(images) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch can contain at most {MAX_BATCH_SIZE} images"
+        )
+
+    # A single question applies to every image
+    if len(texts) == 1:
+        texts = texts * len(images)
+    elif len(texts) != len(images):
+        raise HTTPException(
+            status_code=400,
+            detail="Provide one question per image or a single question for all images"
+        )
+
+    queries = [text.strip() if text else "" for text in texts]
+    if not all(queries):
+        raise HTTPException(
+            status_code=400,
+            detail="Text query cannot be empty"
+        )
+
+    if module and module.lower() not in SUPPORTED_MODULES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Module '{module}' is not supported. Available modules: cooking, shopping, travel, news"
+        )
+
+    for image in images:
+        if not image.filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid image format. Only PNG, JPG, JPEG are supported."
+            )
+
+    # Prefix saved files so images with the same name don't overwrite each other
+    image_paths = []
+    for image in images:
+        image_path = os.path.join(SCREENSHOTS_DIR, f"{uuid.uuid4().hex}_{os.path.basename(image.filename)}")
+        with open(image_path, "wb") as buffer:
+            buffer.write(await image.read())
+        image_paths.append(image_path)
+
+    return queries, image_paths
+
+async def run_batch(
+    queries: List[str],
+    image_paths: List[str],
+    module: Optional[str] = None,
+    current_user: Optional[Principal] = None,
+    db: AsyncSession = None
+):
+    """
+    Process a batch of screenshots on the batch worker pool.
+
+    OCR/captioning for every image starts at once, identical questions are
+    classified only once, and each result is yielded as soon as it finishes.
+    The whole batch shares one request deadline.
+    """
+    loop = asyncio.get_running_loop()
+    user_id = current_user.id if current_user else None
+    deadline = Deadline()
+
+    try:
+        extractions = [
+            asyncio.ensure_future(
+                run_with_deadline(deadline, extract_text_or_caption, image_path, executor=batch_executor)
+            )
+            for image_path in image_paths
+        ]
+        if module:
+            categories = loop.create_future()
+            categories.set_result({query: module for query in queries})
+        else:
+            categories = asyncio.ensure_future(
+                run_with_deadline(deadline, classify_queries, queries, executor=batch_executor)
+            )
+
+        async def run_one(index: int) -> dict:
+            query = queries[index]
+            try:
+                text, is_caption = await extractions[index]
+                category = (await categories)[query]
+                if category.lower() in SUPPORTED_MODULES:
+                    # Each image keeps its own partial answer under the shared deadline
+                    result = await run_pipeline(
+                        deadline.child(), dispatch_module, category, text, query, is_caption,
+                        executor=batch_executor
+                    )
+                else:
+                    result = f"Category '{category}' is not supported."
+                return {"index": index, "module": category.lower(), "result": result}
+            except Exception as e:
+                return {"index": index, "error": f"Internal server error: {str(e)}"}
+
+        for next_item in asyncio.as_completed([run_one(i) for i in range(len(queries))]):
+            item = await next_item
+
+            # Store query in database
+            if db and "result" in item:
+                db_query = Query(
+                    user_id=user_id,
+                    query_text=queries[item["index"]],
+                    response_text=str(item["result"]),
+                    # The module that answered, also for auto-classified queries
+                    module_used=item["module"]
+                )
+                db.add(db_query)
+                await db.commit()
+
+            yield item
+
+    finally:
+        # Clean up the image files after processing
+        for image_path in image_paths:
+            if os.path.exists(image_path):
+                os.remove(image_path)
+
 @app.post("/query")
 async def process_query(
     text: Optional[str] = Form(None),
     image: UploadFile = File(...),
     audio: Optional[UploadFile] = File(None),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """General query endpoint that uses classifier to determine module"""
     try:
         response = await process_request(text, image, audio, current_user=current_user, db=db)
-        return JSONResponse(content=response)
+        return ORJSONResponse(content=response)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
+            status_code=500,
+            content={"error": f"Internal server error: {str(e)}"}
+        )
+
+@app.post("/query/batch")
+async def process_batch_query(
+    texts: List[str] = Form(...),
+    images: List[UploadFile] = File(...),
+    module: Optional[str] = Form(None),
+    stream: bool = Form(False),
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Batch endpoint for several screenshots in one request.
+
+    Send one question per image (or a single question for all of them).
+    Returns {"results": [...]} in image order, or NDJSON lines in completion
+    order when stream is true.
+    """
+    queries, image_paths = await prepare_batch(texts, images, module)
+
+    if stream:
+        async def ndjson():
+            # The request-scoped session may be closed before streaming ends
+            async with AsyncSessionLocal() as stream_db:
+                async for item in run_batch(queries, image_paths, module, current_user, stream_db):
+                    yield dump_json(item) + b"\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    try:
+        results = [item async for item in run_batch(queries, image_paths, module, current_user, db)]
+        results.sort(key=lambda item: item["index"])
+        return ORJSONResponse(content={"results": results})
+    except Exception as e:
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Internal server error: {str(e)}"}
         )
@@ -225,17 +476,17 @@ async def process_cooking_query(
     text: Optional[str] = Form(None),
     image: UploadFile = File(...),
     audio: Optional[UploadFile] = File(None),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """Explicit cooking module endpoint"""
     try:
         response = await process_request(text, image, audio, "cooking", current_user=current_user, db=db)
-        return JSONResponse(content=response)
+        return ORJSONResponse(content=response)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Internal server error: {str(e)}"}
         )
@@ -245,17 +496,17 @@ async def process_shopping_query(
     text: Optional[str] = Form(None),
     image: UploadFile = File(...),
     audio: Optional[UploadFile] = File(None),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """Explicit shopping module endpoint"""
     try:
         response = await process_request(text, image, audio, "shopping", current_user=current_user, db=db)
-        return JSONResponse(content=response)
+        return ORJSONResponse(content=response)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Internal server error: {str(e)}"}
         )
@@ -265,17 +516,17 @@ async def process_travel_query(
     text: Optional[str] = Form(None),
     image: UploadFile = File(...),
     audio: Optional[UploadFile] = File(None),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """Explicit travel module endpoint"""
     try:
         response = await process_request(text, image, audio, "travel", current_user=current_user, db=db)
-        return JSONResponse(content=response)
+        return ORJSONResponse(content=response)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Internal server error: {str(e)}"}
         )
@@ -285,17 +536,17 @@ async def process_news_query(
     text: Optional[str] = Form(None),
     image: UploadFile = File(...),
     audio: Optional[UploadFile] = File(None),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    current_user: Optional[Principal] = Depends(get_current_user_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """Explicit news module endpoint"""
     try:
         response = await process_request(text, image, audio, "news", current_user=current_user, db=db)
-        return JSONResponse(content=response)
+        return ORJSONResponse(content=response)
     except HTTPException as http_exc:
         raise http_exc
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"error": f"Internal server error: {str(e)}"}
         )
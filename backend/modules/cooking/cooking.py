@@ -1,18 +1,19 @@
-from modules.cooking.foodocr import identify_food_dish, identify_food_from_caption
 from modules.cooking.cookingscraping import get_recipe_data, display_recipe
-from modules.cooking.queryselector import identify_selector
+from modules.cooking.queryselector import identify_dish_and_selector
+from deadline import deadline_expired, set_partial_result
 
 def cooking_init(ocr_text: str, query: str, is_caption: bool = False) -> str:
-    selector = identify_selector(query)
-    
     if is_caption:
         print(f"[DEBUG] Processing image caption for food identification...")
-        dish = identify_food_from_caption(ocr_text)
-    else:
-        dish = identify_food_dish(ocr_text)
+    dish, selector = identify_dish_and_selector(ocr_text, query, is_caption)
+    
+    partial = f"The dish in your screenshot looks like {dish}, but the recipe search did not finish in time."
+    set_partial_result(partial)
     
     print(f"\nSearching SimplyRecipes for '{dish}'...")
     recipe_data = get_recipe_data(dish, selector)
+    if not recipe_data.get('url') and deadline_expired():
+        return partial
     return display_recipe(recipe_data, selector)
 
 
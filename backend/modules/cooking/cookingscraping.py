@@ -1,9 +1,113 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import html
+import httpx
+import lxml.etree
+import lxml.html
+import orjson
+from lxml.cssselect import CSSSelector
 import urllib.parse
-import time
 import re
 import json
+import http_client
+from deadline import request_timeout, get_deadline
+from modules.cooking.recipestore import normalize_dish_name, load_recipe, save_recipe, is_stale, schedule_refresh
+from modules.cooking.recipeindex import RECIPE_INDEX_MIN_SCORE, find_indexed_recipe, add_to_index
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+def compile_selectors(selectors):
+    """Translate CSS selectors to XPath once, at import, instead of on every page"""
+    return [CSSSelector(selector_item, translator='html') for selector_item in selectors]
+
+# Page parsing patterns, compiled once at import
+WHITESPACE = re.compile(r'\s+')
+LD_JSON_OPEN = re.compile(rb'<script\b[^>]*\btype\s*=\s*["\']?application/ld\+json["\']?[^>]*>', re.IGNORECASE)
+SCRIPT_CLOSE = re.compile(rb'</script\s*>', re.IGNORECASE)
+# Longest opening and closing tags the streaming scanner expects; it keeps this much of an unmatched tail
+MAX_SCRIPT_TAG_BYTES = 512
+MAX_SCRIPT_CLOSE_BYTES = 32
+CDATA_WRAPPER = re.compile(rb'^\s*(?://\s*)?<!\[CDATA\[|(?://\s*)?\]\]>\s*$')
+# Leading step number ("3. ") and/or dash
+LIST_MARKER = re.compile(r'^(?:\d+\.\s*)?(?:-\s*)?')
+INGREDIENT_LINE = re.compile(
+    r'^-?\s*\d+.*(?:cup|tablespoon|teaspoon|pound|ounce|clove|slice)'
+    r'|^-?\s*\d+.*(?:tsp|tbsp|lb|oz|g|kg|ml|l)'
+    r'|^-?\s*(?:Salt|Pepper|Oil|Butter|Flour|Sugar|Egg)',
+    re.IGNORECASE
+)
+NON_INGREDIENT_PREFIXES = ('method', 'instruction', 'step', 'cook', 'bake', 'heat')
+SECTION_HEADINGS = {'ingredients', 'directions', 'instructions'}
+STEP_VERBS = re.compile('cook|add|mix|heat|stir|bake|boil|place|set|remove|cover|combine|whisk|pour')
+METHOD_VERBS = re.compile('cook|add|mix|heat|stir|bake|boil|place|set|remove')
+SENTENCE_VERBS = re.compile('cook|add|mix|heat|stir|bake|boil|place|set|remove|cover|combine|whisk')
+NON_STEP_WORDS = re.compile('recipe|author|photo|image|website|copyright')
+SENTENCE_END = re.compile(r'[.!?]+')
+METHOD_SECTIONS = [
+    re.compile(rf'{heading}\s*\n(.*?)(?:\n\n|\nIngredients|\nNutrition|$)', re.DOTALL | re.IGNORECASE)
+    for heading in ('Method', 'Instructions', 'Directions')
+]
+UNWANTED_INSTRUCTION_TEXT = re.compile('|'.join([
+    r'Did you love the recipe\? Let us know with a rating and review!',
+    r'Simply Recipes / [A-Za-z\s]+',
+    r'READ MORE:',
+    r'How to Cook [A-Za-z\s]+',
+    r'Simple Tip!',
+    r'NUTRITION FACTS.*',
+    r'Prep Time:.*',
+    r'Cook Time:.*',
+    r'Total Time:.*',
+    r'Servings:.*',
+    r'Author:.*',
+    r'Course:.*',
+    r'Cuisine:.*',
+    r'Method:.*',
+    r'Diet:.*'
+]), re.IGNORECASE)
+
+INGREDIENT_SELECTORS = compile_selectors([
+    # Common ingredient selectors
+    '.recipe-ingredients li',
+    '.structured-ingredients li',
+    '.ingredients li',
+    'ul.ingredients li',
+    '.recipe-ingredient',
+    '[class*="ingredient"] li',
+    # More specific selectors for SimplyRecipes
+    '.comp.mntl-structured-ingredients__list-item',
+    '.mntl-structured-ingredients__list-item',
+    'li[data-ingredient]',
+])
+
+INSTRUCTION_SELECTORS = compile_selectors([
+    # Common instruction selectors
+    '.recipe-instructions li',
+    '.recipe-method li',
+    '.instructions ol li',
+    '.instructions li',
+    'ol.instructions li',
+    '.structured-instructions li',
+    # More specific selectors for SimplyRecipes
+    '.comp.mntl-sc-block-group--OL li',
+    '.mntl-sc-block-group--OL li',
+    '.mntl-sc-block.mntl-sc-block-startgroup',
+    'li[data-step]',
+    # Method section selectors
+    '.method li',
+    '.recipe-method-text'
+])
+
+TITLE_SELECTORS = compile_selectors([
+    'h1.entry-title',
+    'h1.recipe-title',
+    'h1.headline',
+    '.recipe-header h1',
+    'h1.recipe-summary__h1',  # AllRecipes
+    'h1',
+    '.recipe-title h1'  # Food.com
+])
+
 
 def display_recipe(result, selector):
     """Return the formatted recipe string based on selector"""
@@ -30,145 +134,220 @@ def display_recipe(result, selector):
     
     return '\n'.join(output)
     
-def search_simply_recipes(dish_name):
+async def fetch_page(client, url, timeout_cap):
+    """
+    GET url. Retries with backoff, and failing fast while the site is down,
+    are left to the shared client's per-host governor.
+
+    Returns:
+        httpx.Response or None if the request failed
+    """
+    try:
+        response = await client.get(url, headers=HEADERS, timeout=request_timeout(timeout_cap))
+        response.raise_for_status()
+        return response
+    except httpx.HTTPError:
+        return None
+
+def parse_html(content):
+    """lxml tree of a page with scripts and styles removed, or None if it can't be parsed"""
+    try:
+        root = lxml.html.document_fromstring(content)
+    except (lxml.etree.ParserError, ValueError):
+        return None
+    lxml.etree.strip_elements(root, 'script', 'style', 'noscript', with_tail=False)
+    return root
+
+def text_of(element):
+    """Text content of an element with whitespace collapsed"""
+    return WHITESPACE.sub(' ', element.text_content()).strip()
+
+def first_link(content, recipe_selectors, base_url):
+    """Absolute URL of the first result link matched by recipe_selectors, in order"""
+    root = parse_html(content)
+    if root is None:
+        return None
+    for selector_item in recipe_selectors:
+        elements = selector_item(root)
+        if elements:
+            href = elements[0].get('href', '')
+            return href if href.startswith('http') else f"{base_url}{href}"
+    return None
+
+SIMPLYRECIPES_LINKS = compile_selectors([
+    'a.comp.card[href*="/recipes/"]',
+    'a[href*="/recipes/"]:not([href*="/search"])',
+    '.card-list__item a[href*="/recipes/"]'
+])
+
+# Recipe links in AllRecipes search results
+ALLRECIPES_LINKS = compile_selectors([
+    'a[href*="/recipe/"]',
+    '.card__title-text a[href*="/recipe/"]',
+    '.mntl-card-list-items a[href*="/recipe/"]'
+])
+
+# Recipe links in Food.com search results
+FOOD_COM_LINKS = compile_selectors([
+    'a[href*="/recipe/"]',
+    '.recipe-card a[href*="/recipe/"]',
+    'h3 a[href*="/recipe/"]'
+])
+
+async def search_simply_recipes(client, dish_name):
     """Helper function to search SimplyRecipes"""
     try:
         encoded_query = urllib.parse.quote_plus(dish_name)
         search_url = f"https://www.simplyrecipes.com/search?q={encoded_query}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-
-        for attempt in range(3):
-            try:
-                response = requests.get(search_url, headers=headers, timeout=20)
-                response.raise_for_status()
-                break
-            except (requests.RequestException, requests.Timeout):
-                if attempt == 2:
-                    return None
-                time.sleep(2)
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        recipe_selectors = [
-            'a.comp.card[href*="/recipes/"]',
-            'a[href*="/recipes/"]:not([href*="/search"])',
-            '.card-list__item a[href*="/recipes/"]'
-        ]
-        
-        for selector_item in recipe_selectors:
-            elements = soup.select(selector_item)
-            if elements:
-                href = elements[0].get('href', '')
-                return f"https://www.simplyrecipes.com{href}" if href.startswith('/') else href
-        return None
-        
+
+        response = await fetch_page(client, search_url, 20)
+        if response is None:
+            return None
+
+        return await asyncio.to_thread(first_link, response.content, SIMPLYRECIPES_LINKS, "https://www.simplyrecipes.com")
+
     except Exception:
         return None
 
-def search_allrecipes(dish_name):
+async def search_allrecipes(client, dish_name):
     """Search AllRecipes.com for recipe URL"""
     try:
         encoded_query = urllib.parse.quote_plus(dish_name)
         search_url = f"https://www.allrecipes.com/search/results/?search={encoded_query}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-
-        for attempt in range(3):
-            try:
-                response = requests.get(search_url, headers=headers, timeout=20)
-                response.raise_for_status()
-                break
-            except (requests.RequestException, requests.Timeout):
-                if attempt == 2:
-                    return None
-                time.sleep(2)
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Look for recipe links in AllRecipes search results
-        recipe_selectors = [
-            'a[href*="/recipe/"]',
-            '.card__title-text a[href*="/recipe/"]',
-            '.mntl-card-list-items a[href*="/recipe/"]'
-        ]
-        
-        for selector_item in recipe_selectors:
-            elements = soup.select(selector_item)
-            if elements:
-                href = elements[0].get('href', '')
-                return href if href.startswith('http') else f"https://www.allrecipes.com{href}"
-        return None
-        
+        response = await fetch_page(client, search_url, 20)
+        if response is None:
+            return None
+
+        return await asyncio.to_thread(first_link, response.content, ALLRECIPES_LINKS, "https://www.allrecipes.com")
+
     except Exception:
         return None
 
-def search_food_com(dish_name):
+async def search_food_com(client, dish_name):
     """Search Food.com for recipe URL"""
     try:
         encoded_query = urllib.parse.quote_plus(dish_name)
         search_url = f"https://www.food.com/search/{encoded_query}"
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-
-        for attempt in range(3):
-            try:
-                response = requests.get(search_url, headers=headers, timeout=20)
-                response.raise_for_status()
-                break
-            except (requests.RequestException, requests.Timeout):
-                if attempt == 2:
-                    return None
-                time.sleep(2)
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Look for recipe links in Food.com search results
-        recipe_selectors = [
-            'a[href*="/recipe/"]',
-            '.recipe-card a[href*="/recipe/"]',
-            'h3 a[href*="/recipe/"]'
-        ]
-        
-        for selector_item in recipe_selectors:
-            elements = soup.select(selector_item)
-            if elements:
-                href = elements[0].get('href', '')
-                return href if href.startswith('http') else f"https://www.food.com{href}"
-        return None
-        
+        response = await fetch_page(client, search_url, 20)
+        if response is None:
+            return None
+
+        return await asyncio.to_thread(first_link, response.content, FOOD_COM_LINKS, "https://www.food.com")
+
     except Exception:
         return None
 
-def extract_json_ld_recipe(soup):
-    """Extract recipe from JSON-LD data"""
+# Website search functions, all queried at once by get_recipe_data_async
+RECIPE_SITES = [
+    ("SimplyRecipes", search_simply_recipes),
+    ("AllRecipes", search_allrecipes),
+    ("Food.com", search_food_com)
+]
+
+def is_recipe_type(item):
+    item_type = item.get('@type')
+    return item_type == 'Recipe' or (isinstance(item_type, list) and 'Recipe' in item_type)
+
+def find_recipe_object(data):
+    """Recipe object in parsed JSON-LD: top level, in a list, in @graph or as a page's mainEntity"""
+    if isinstance(data, list):
+        for item in data:
+            recipe = find_recipe_object(item)
+            if recipe:
+                return recipe
+    elif isinstance(data, dict):
+        if is_recipe_type(data):
+            return data
+        for key in ('@graph', 'mainEntity'):
+            if key in data:
+                recipe = find_recipe_object(data[key])
+                if recipe:
+                    return recipe
+    return None
+
+def parse_json_ld_block(block):
+    """Recipe object in one JSON-LD block, or None"""
+    block = CDATA_WRAPPER.sub(b'', block)
     try:
-        json_scripts = soup.find_all('script', {'type': 'application/ld+json'})
-        
-        for script in json_scripts:
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                            return item
-                elif isinstance(data, dict):
-                    if data.get('@type') == 'Recipe':
-                        return data
-                    elif '@graph' in data:
-                        for item in data['@graph']:
-                            if isinstance(item, dict) and item.get('@type') == 'Recipe':
-                                return item
-            except (json.JSONDecodeError, KeyError, TypeError):
-                continue
-        return None
-    except Exception:
-        return None
+        data = orjson.loads(block)
+    except orjson.JSONDecodeError:
+        # Some sites leave raw newlines inside strings, which only the lenient parser accepts
+        try:
+            data = json.loads(block, strict=False)
+        except ValueError:
+            return None
+    return find_recipe_object(data)
+
+class JsonLdScanner:
+    """
+    Finds the first Recipe in a page's application/ld+json blocks as the page arrives.
+
+    Only complete blocks (closing </script> received) are parsed. Apart from
+    a short tail kept for tags split across chunks, each byte is searched
+    once, so feeding a page in chunks costs about the same as scanning it whole.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        # Where to look for the next opening tag
+        self.position = 0
+        # Start of the block whose closing tag hasn't arrived yet, and where to look for it
+        self.block_start = None
+        self.close_position = 0
+        self.recipe = None
+
+    def feed(self, chunk):
+        """Add the next chunk of the page; returns the Recipe object once one has been found"""
+        self.buffer += chunk
+        while self.recipe is None:
+            if self.block_start is None:
+                opening = LD_JSON_OPEN.search(self.buffer, self.position)
+                if not opening:
+                    # An opening tag may be split across chunks, so rescan the tail next time
+                    self.position = max(self.position, len(self.buffer) - MAX_SCRIPT_TAG_BYTES)
+                    break
+                self.block_start = self.close_position = opening.end()
+            closing = SCRIPT_CLOSE.search(self.buffer, self.close_position)
+            if not closing:
+                # Likewise for a closing tag
+                self.close_position = max(self.close_position, len(self.buffer) - MAX_SCRIPT_CLOSE_BYTES)
+                break
+            self.position = closing.end()
+            self.recipe = parse_json_ld_block(bytes(self.buffer[self.block_start:closing.start()]))
+            self.block_start = None
+        return self.recipe
+
+def extract_json_ld_recipe(content):
+    """
+    Extract recipe from JSON-LD data
+
+    Scans the raw page bytes for application/ld+json blocks and parses only
+    those, so pages with structured data never go through an HTML parser.
+    """
+    return JsonLdScanner().feed(content)
+
+def json_ld_text(value):
+    """JSON-LD string with HTML entities decoded and whitespace collapsed"""
+    return WHITESPACE.sub(' ', html.unescape(str(value))).strip()
+
+def json_ld_instructions(instructions):
+    """Flatten recipeInstructions: strings, HowToSteps and HowToSections of steps"""
+    if isinstance(instructions, (str, dict)):
+        instructions = [instructions]
+    steps = []
+    for instruction in instructions:
+        if isinstance(instruction, dict):
+            if 'itemListElement' in instruction:
+                steps.extend(json_ld_instructions(instruction['itemListElement']))
+            elif 'text' in instruction:
+                steps.append(json_ld_text(instruction['text']))
+            elif 'name' in instruction:
+                steps.append(json_ld_text(instruction['name']))
+        elif isinstance(instruction, str):
+            steps.append(json_ld_text(instruction))
+    return steps
 
 def extract_recipe_from_json_ld(recipe_data):
     """Parse JSON-LD recipe object"""
@@ -176,25 +355,17 @@ def extract_recipe_from_json_ld(recipe_data):
     try:
         # Extract title
         if 'name' in recipe_data:
-            extracted['title'] = recipe_data['name']
+            extracted['title'] = json_ld_text(recipe_data['name'])
         
         # Extract ingredients
         if 'recipeIngredient' in recipe_data:
             ingredients = recipe_data['recipeIngredient']
-            extracted['ingredients'] = [str(ing) for ing in ingredients] if isinstance(ingredients, list) else [str(ingredients)]
+            ingredients = ingredients if isinstance(ingredients, list) else [ingredients]
+            extracted['ingredients'] = [json_ld_text(ing) for ing in ingredients]
         
         # Extract instructions
         if 'recipeInstructions' in recipe_data:
-            instructions = []
-            for instruction in recipe_data['recipeInstructions']:
-                if isinstance(instruction, dict):
-                    if 'text' in instruction:
-                        instructions.append(instruction['text'])
-                    elif 'name' in instruction:
-                        instructions.append(instruction['name'])
-                elif isinstance(instruction, str):
-                    instructions.append(instruction)
-            extracted['instructions'] = instructions
+            extracted['instructions'] = json_ld_instructions(recipe_data['recipeInstructions'])
         
         return extracted
     except Exception:
@@ -202,92 +373,40 @@ def extract_recipe_from_json_ld(recipe_data):
 
 def clean_instruction_text(text):
     """Clean instruction text by removing irrelevant content"""
-    # Remove common unwanted phrases
-    unwanted_phrases = [
-        r'Did you love the recipe\? Let us know with a rating and review!',
-        r'Simply Recipes / [A-Za-z\s]+',
-        r'READ MORE:',
-        r'How to Cook [A-Za-z\s]+',
-        r'Simple Tip!',
-        r'NUTRITION FACTS.*',
-        r'Prep Time:.*',
-        r'Cook Time:.*',
-        r'Total Time:.*',
-        r'Servings:.*',
-        r'Author:.*',
-        r'Course:.*',
-        r'Cuisine:.*',
-        r'Method:.*',
-        r'Diet:.*'
-    ]
-    
-    cleaned_text = text
-    for pattern in unwanted_phrases:
-        cleaned_text = re.sub(pattern, '', cleaned_text, flags=re.IGNORECASE)
+    cleaned_text = UNWANTED_INSTRUCTION_TEXT.sub('', text)
     
     # Remove multiple consecutive spaces and newlines
-    cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-    cleaned_text = cleaned_text.strip()
-    
-    return cleaned_text
+    return WHITESPACE.sub(' ', cleaned_text).strip()
 
-def extract_ingredients_from_html(soup):
+def extract_ingredients_from_html(root):
     """Extract ingredients using multiple strategies"""
     ingredients = []
     
     # Strategy 1: Look for ingredients in structured data or lists
-    ingredient_selectors = [
-        # Common ingredient selectors
-        '.recipe-ingredients li',
-        '.structured-ingredients li', 
-        '.ingredients li',
-        'ul.ingredients li',
-        '.recipe-ingredient',
-        '[class*="ingredient"] li',
-        # More specific selectors for SimplyRecipes
-        '.comp.mntl-structured-ingredients__list-item',
-        '.mntl-structured-ingredients__list-item',
-        'li[data-ingredient]',
-        # Fallback selectors
-        'li:contains("-")',  # Lines that contain dashes (common in ingredient lists)
-    ]
-    
-    for selector_item in ingredient_selectors:
-        try:
-            elements = soup.select(selector_item)
-            if elements:
-                temp_ingredients = []
-                for element in elements:
-                    text = element.get_text(strip=True)
-                    # Filter out non-ingredient text
-                    if (text and len(text) > 2 and 
-                        not text.lower().startswith(('method', 'instruction', 'step', 'cook', 'bake', 'heat')) and
-                        not text.lower() in ['ingredients', 'directions', 'instructions']):
-                        # Clean up the text
-                        text = re.sub(r'^\d+\.\s*', '', text)  # Remove leading numbers
-                        text = re.sub(r'^-\s*', '', text)      # Remove leading dashes
-                        temp_ingredients.append(text)
-                
-                if temp_ingredients and len(temp_ingredients) >= 3:
-                    ingredients = temp_ingredients
-                    break
-        except Exception:
-            continue
+    for selector_item in INGREDIENT_SELECTORS:
+        elements = selector_item(root)
+        if elements:
+            temp_ingredients = []
+            for element in elements:
+                text = text_of(element)
+                lowered = text.lower()
+                # Filter out non-ingredient text
+                if (len(text) > 2 and
+                    not lowered.startswith(NON_INGREDIENT_PREFIXES) and
+                    lowered not in SECTION_HEADINGS):
+                    temp_ingredients.append(LIST_MARKER.sub('', text, count=1))
+            
+            if len(temp_ingredients) >= 3:
+                ingredients = temp_ingredients
+                break
     
     # Strategy 2: Look for ingredients in text patterns if first strategy fails
     if not ingredients:
-        # Look for text patterns that typically indicate ingredients
-        text_content = soup.get_text()
-        lines = text_content.split('\n')
         potential_ingredients = []
-        
-        for line in lines:
+        for line in root.text_content().split('\n'):
             line = line.strip()
             # Look for lines that match ingredient patterns
-            if (line and 
-                re.match(r'^-?\s*\d+.*(?:cup|tablespoon|teaspoon|pound|ounce|clove|slice)', line, re.IGNORECASE) or
-                re.match(r'^-?\s*\d+.*(?:tsp|tbsp|lb|oz|g|kg|ml|l)', line, re.IGNORECASE) or
-                re.match(r'^-?\s*(?:Salt|Pepper|Oil|Butter|Flour|Sugar|Egg)', line, re.IGNORECASE)):
+            if INGREDIENT_LINE.match(line):
                 potential_ingredients.append(line.strip('- '))
         
         if len(potential_ingredients) >= 3:
@@ -295,181 +414,165 @@ def extract_ingredients_from_html(soup):
     
     return ingredients
 
-def extract_instructions_from_html(soup):
+def extract_instructions_from_html(root):
     """Extract cooking instructions using multiple strategies"""
     instructions = []
     
     # Strategy 1: Look for instructions in structured format
-    instruction_selectors = [
-        # Common instruction selectors
-        '.recipe-instructions li',
-        '.recipe-method li',
-        '.instructions ol li',
-        '.instructions li',
-        'ol.instructions li',
-        '.structured-instructions li',
-        # More specific selectors for SimplyRecipes
-        '.comp.mntl-sc-block-group--OL li',
-        '.mntl-sc-block-group--OL li',
-        '.mntl-sc-block.mntl-sc-block-startgroup',
-        'li[data-step]',
-        # Method section selectors
-        '.method li',
-        '.recipe-method-text'
-    ]
+    for selector_item in INSTRUCTION_SELECTORS:
+        elements = selector_item(root)
+        if elements:
+            temp_instructions = []
+            for element in elements:
+                text = text_of(element)
+                # Filter for actual cooking instructions
+                if len(text) > 15 and STEP_VERBS.search(text.lower()):
+                    text = clean_instruction_text(LIST_MARKER.sub('', text, count=1))
+                    if len(text) > 10:  # Only add if still substantial after cleaning
+                        temp_instructions.append(text)
+            
+            if len(temp_instructions) >= 2:
+                instructions = temp_instructions
+                break
     
-    for selector_item in instruction_selectors:
-        try:
-            elements = soup.select(selector_item)
-            if elements:
-                temp_instructions = []
-                for element in elements:
-                    text = element.get_text(strip=True)
-                    # Filter for actual cooking instructions
-                    if (text and len(text) > 15 and
-                        any(verb in text.lower() for verb in ['cook', 'add', 'mix', 'heat', 'stir', 'bake', 'boil', 'place', 'set', 'remove', 'cover', 'combine', 'whisk', 'pour'])):
-                        # Clean up the text
-                        text = re.sub(r'^\d+\.\s*', '', text)  # Remove step numbers
-                        text = re.sub(r'^-\s*', '', text)      # Remove leading dashes
-                        text = clean_instruction_text(text)    # Clean unwanted phrases
-                        if text and len(text) > 10:  # Only add if still substantial after cleaning
-                            temp_instructions.append(text)
-                
-                if temp_instructions and len(temp_instructions) >= 2:
-                    instructions = temp_instructions
-                    break
-        except Exception:
-            continue
+    if instructions:
+        return instructions
     
-    # Strategy 2: Look for method sections in plain text
-    if not instructions:
-        # Find "Method" or "Instructions" sections
-        text_content = soup.get_text()
-        
-        # Look for method sections
-        method_patterns = [
-            r'Method\s*\n(.*?)(?:\n\n|\nIngredients|\nNutrition|$)',
-            r'Instructions\s*\n(.*?)(?:\n\n|\nIngredients|\nNutrition|$)',
-            r'Directions\s*\n(.*?)(?:\n\n|\nIngredients|\nNutrition|$)'
-        ]
-        
-        for pattern in method_patterns:
-            match = re.search(pattern, text_content, re.DOTALL | re.IGNORECASE)
-            if match:
-                method_text = match.group(1)
-                lines = method_text.split('\n')
-                temp_instructions = []
-                
-                for line in lines:
-                    line = line.strip()
-                    if (line and len(line) > 20 and
-                        any(verb in line.lower() for verb in ['cook', 'add', 'mix', 'heat', 'stir', 'bake', 'boil', 'place', 'set', 'remove'])):
-                        # Clean up formatting
-                        line = re.sub(r'^\d+\.\s*', '', line)
-                        line = re.sub(r'^-\s*', '', line)
-                        line = clean_instruction_text(line)
-                        if line and len(line) > 10:
-                            temp_instructions.append(line)
-                
-                if len(temp_instructions) >= 2:
-                    instructions = temp_instructions[:20]  # Limit to reasonable number
-                    break
+    text_content = root.text_content()
+    
+    # Strategy 2: Look for "Method" or "Instructions" sections in plain text
+    for pattern in METHOD_SECTIONS:
+        match = pattern.search(text_content)
+        if match:
+            temp_instructions = []
+            for line in match.group(1).split('\n'):
+                line = line.strip()
+                if len(line) > 20 and METHOD_VERBS.search(line.lower()):
+                    line = clean_instruction_text(LIST_MARKER.sub('', line, count=1))
+                    if len(line) > 10:
+                        temp_instructions.append(line)
+            
+            if len(temp_instructions) >= 2:
+                return temp_instructions[:20]  # Limit to reasonable number
     
     # Strategy 3: Look for step-by-step text patterns
-    if not instructions:
-        all_text = soup.get_text()
-        sentences = re.split(r'[.!?]+', all_text)
-        temp_instructions = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if (len(sentence) > 30 and
-                any(verb in sentence.lower() for verb in ['cook', 'add', 'mix', 'heat', 'stir', 'bake', 'boil', 'place', 'set', 'remove', 'cover', 'combine', 'whisk']) and
-                not any(word in sentence.lower() for word in ['recipe', 'author', 'photo', 'image', 'website', 'copyright'])):
-                cleaned_sentence = clean_instruction_text(sentence)
-                if cleaned_sentence and len(cleaned_sentence) > 10:
-                    temp_instructions.append(cleaned_sentence + '.')
-        
-        if len(temp_instructions) >= 3:
-            instructions = temp_instructions[:15]
+    temp_instructions = []
+    for sentence in SENTENCE_END.split(text_content):
+        sentence = sentence.strip()
+        lowered = sentence.lower()
+        if len(sentence) > 30 and SENTENCE_VERBS.search(lowered) and not NON_STEP_WORDS.search(lowered):
+            cleaned_sentence = clean_instruction_text(sentence)
+            if len(cleaned_sentence) > 10:
+                temp_instructions.append(cleaned_sentence + '.')
+    
+    if len(temp_instructions) >= 3:
+        instructions = temp_instructions[:15]
     
     return instructions
 
-def extract_recipe_from_website(recipe_url, selector):
+def parse_recipe_page(content, recipe_url, selector, recipe_data=None):
+    """
+    Extract recipe data from a downloaded recipe page
+
+    recipe_data is the page's JSON-LD Recipe object if it was already found
+    while the page was downloading.
+    """
+    result = {
+        'ingredients': [],
+        'instructions': [],
+        'url': recipe_url,
+        'title': ''
+    }
+
+    # Try JSON-LD extraction first (works for all sites, and needs no HTML parsing)
+    if recipe_data is None:
+        recipe_data = extract_json_ld_recipe(content)
+    if recipe_data:
+        json_recipe = extract_recipe_from_json_ld(recipe_data)
+        if json_recipe:
+            if 'title' in json_recipe:
+                result['title'] = json_recipe['title']
+            if 'ingredients' in json_recipe and selector in ['ingredients', 'both']:
+                result['ingredients'] = json_recipe['ingredients']
+            if 'instructions' in json_recipe and selector in ['steps', 'both']:
+                result['instructions'] = json_recipe['instructions']
+
+    needs_ingredients = selector in ['ingredients', 'both'] and not result['ingredients']
+    needs_instructions = selector in ['steps', 'both'] and not result['instructions']
+
+    # HTML parsing fallback for missing data
+    if needs_ingredients or needs_instructions or not result['title']:
+        root = parse_html(content)
+        if root is not None:
+            if needs_ingredients:
+                result['ingredients'] = extract_ingredients_from_html(root)
+
+            if needs_instructions:
+                result['instructions'] = extract_instructions_from_html(root)
+
+            # Extract title if not found
+            if not result['title']:
+                for selector_item in TITLE_SELECTORS:
+                    title_elements = selector_item(root)
+                    if title_elements:
+                        title_text = text_of(title_elements[0])
+                        if len(title_text) > 3:
+                            result['title'] = title_text
+                            break
+
+    # Clean up results
+    result['ingredients'] = [ing.strip() for ing in result['ingredients'] if ing.strip()]
+    result['instructions'] = [inst.strip() for inst in result['instructions'] if inst.strip()]
+
+    return result
+
+def json_ld_covers(recipe_data, selector):
+    """Whether the JSON-LD recipe alone answers selector, so the rest of the page isn't needed"""
+    json_recipe = extract_recipe_from_json_ld(recipe_data)
+    return bool(
+        json_recipe.get('title') and
+        (selector == 'steps' or json_recipe.get('ingredients')) and
+        (selector == 'ingredients' or json_recipe.get('instructions'))
+    )
+
+async def stream_recipe_page(client, url, selector, timeout_cap):
+    """
+    Download a recipe page, stopping as soon as a complete Recipe JSON-LD block has arrived.
+
+    The rest of the page (ads, inline scripts, comments) is never read unless
+    the JSON-LD recipe is missing or lacks what selector asks for, in which
+    case the whole page is read for the HTML fallback.
+
+    Returns:
+        (content read so far, Recipe object or None), or None if the request failed
+    """
+    scanner = JsonLdScanner()
+    try:
+        async with client.stream('GET', url, headers=HEADERS, timeout=request_timeout(timeout_cap)) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                if scanner.recipe is not None:
+                    # An incomplete recipe was found; the HTML fallback needs the full page
+                    scanner.buffer += chunk
+                elif scanner.feed(chunk) is not None and json_ld_covers(scanner.recipe, selector):
+                    # Leaving the block closes the response without reading the rest
+                    break
+        return bytes(scanner.buffer), scanner.recipe
+    except httpx.HTTPError:
+        return None
+
+async def extract_recipe_from_website(client, recipe_url, selector):
     """Extract recipe data from any supported website"""
     if not recipe_url:
         return None
-        
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        
-        for attempt in range(3):
-            try:
-                response = requests.get(recipe_url, headers=headers, timeout=30)
-                response.raise_for_status()
-                break
-            except (requests.RequestException, requests.Timeout):
-                if attempt == 2:
-                    return None
-                time.sleep(3)
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        result = {
-            'ingredients': [],
-            'instructions': [],
-            'url': recipe_url,
-            'title': ''
-        }
-
-        # Try JSON-LD extraction first (works for all sites)
-        recipe_data = extract_json_ld_recipe(soup)
-        if recipe_data:
-            json_recipe = extract_recipe_from_json_ld(recipe_data)
-            if json_recipe:
-                if 'title' in json_recipe:
-                    result['title'] = json_recipe['title']
-                if 'ingredients' in json_recipe and selector in ['ingredients', 'both']:
-                    result['ingredients'] = json_recipe['ingredients']
-                if 'instructions' in json_recipe and selector in ['steps', 'both']:
-                    result['instructions'] = json_recipe['instructions']
-
-        # HTML parsing fallback for missing data
-        if selector in ['ingredients', 'both'] and not result['ingredients']:
-            result['ingredients'] = extract_ingredients_from_html(soup)
-
-        if selector in ['steps', 'both'] and not result['instructions']:
-            result['instructions'] = extract_instructions_from_html(soup)
-
-        # Extract title if not found
-        if not result['title']:
-            title_selectors = [
-                'h1.entry-title',
-                'h1.recipe-title', 
-                'h1.headline',
-                '.recipe-header h1',
-                'h1.recipe-summary__h1',  # AllRecipes
-                'h1',
-                '.recipe-title h1'  # Food.com
-            ]
-            for selector_item in title_selectors:
-                title_element = soup.select_one(selector_item)
-                if title_element:
-                    title_text = title_element.get_text(strip=True)
-                    if title_text and len(title_text) > 3:
-                        result['title'] = title_text
-                        break
-
-        # Clean up results
-        if 'ingredients' in result:
-            result['ingredients'] = [ing.strip() for ing in result['ingredients'] if ing.strip()]
-
-        if 'instructions' in result:
-            result['instructions'] = [inst.strip() for inst in result['instructions'] if inst.strip()]
-
-        return result
+    try:
+        page = await stream_recipe_page(client, recipe_url, selector, 30)
+        if page is None:
+            return None
+        content, recipe_data = page
+        # Parsing is CPU bound; keep it off the event loop the shared client runs on
+        return await asyncio.to_thread(parse_recipe_page, content, recipe_url, selector, recipe_data)
 
     except Exception as e:
         print(f"Error extracting from {recipe_url}: {str(e)}")
@@ -490,87 +593,187 @@ def is_result_relevant(result, dish_name):
         
     return any(word in title for word in relevant_words)
 
-def get_recipe_data(dish_name: str, selector: str = "both") -> dict:
+def default_result():
+    """Result returned when no relevant recipe is found"""
+    return {
+        'ingredients': [],
+        'instructions': [],
+        'url': '',
+        'title': ''
+    }
+
+def validate_selector(selector):
+    selector = selector.lower()
+    if selector not in ['ingredients', 'steps', 'both']:
+        raise ValueError("Selector must be 'ingredients', 'steps', or 'both'")
+    return selector
+
+def has_requested_content(result, selector):
+    return bool(
+        (selector == 'ingredients' and result.get('ingredients')) or
+        (selector == 'steps' and result.get('instructions')) or
+        (selector == 'both' and (result.get('ingredients') or result.get('instructions')))
+    )
+
+def requested_components(result, selector):
+    """Return only the requested components of a full recipe"""
+    final_result = {
+        'url': result['url'],
+        'title': result['title']
+    }
+
+    if selector == 'ingredients':
+        final_result['ingredients'] = result['ingredients']
+    elif selector == 'steps':
+        final_result['instructions'] = result['instructions']
+    else:  # both
+        final_result.update({
+            'ingredients': result['ingredients'],
+            'instructions': result['instructions']
+        })
+
+    return final_result
+
+async def search_site(client, website_name, search_func, dish_name, selector):
+    """
+    Search one website and extract its top recipe.
+
+    The page is always parsed for both ingredients and steps so the full
+    recipe can be stored; selector only decides whether it is complete enough.
+
+    Returns:
+        dict: The recipe, or None if nothing relevant with the requested content was found
+    """
+    print(f"Trying {website_name}...")
+
+    try:
+        recipe_url = await search_func(client, dish_name)
+        if not recipe_url:
+            print(f"No results found on {website_name}")
+            return None
+
+        result = await extract_recipe_from_website(client, recipe_url, 'both')
+        if not result:
+            print(f"Failed to extract recipe from {website_name}")
+            return None
+
+        # Check if result is relevant and has content
+        if has_requested_content(result, selector) and is_result_relevant(result, dish_name):
+            print(f"Found relevant recipe on {website_name}")
+            return result
+
+        print(f"Recipe from {website_name} not relevant or incomplete")
+
+    except Exception as e:
+        print(f"Error with {website_name}: {str(e)}")
+
+    return None
+
+async def find_recipe_async(dish_name: str, selector: str = "both", client=None):
     """
-    Get recipe data from multiple websites with fallback functionality
+    Search every website concurrently for a recipe
+    
+    The first relevant recipe wins and the searches still running on the
+    other websites are cancelled.
     
     Args:
         dish_name (str): Name of dish to search for
-        selector (str): What to return - 'ingredients', 'steps', or 'both'
+        selector (str): Components the recipe must have - 'ingredients', 'steps', or 'both'
+        client (httpx.AsyncClient): Client to send requests with; defaults to the shared http_client
         
     Returns:
-        dict: Dictionary containing requested recipe components
+        dict: The full recipe (title, url, ingredients, instructions), or None
     """
-    # Validate selector input
-    selector = selector.lower()
-    if selector not in ['ingredients', 'steps', 'both']:
-        raise ValueError("Selector must be 'ingredients', 'steps', or 'both'")
+    if client is None:
+        client = http_client.get_client()
 
-    # Default result structure
-    default_result = {
-        'ingredients': [],
-        'instructions': [],
-        'url': '',
-        'title': ''
-    }
-
-    # Website search functions in order of preference
-    search_functions = [
-        ("SimplyRecipes", search_simply_recipes),
-        ("AllRecipes", search_allrecipes),
-        ("Food.com", search_food_com)
+    tasks = [
+        asyncio.create_task(search_site(client, website_name, search_func, dish_name, selector))
+        for website_name, search_func in RECIPE_SITES
     ]
+    deadline = get_deadline()
+    try:
+        for next_result in asyncio.as_completed(tasks, timeout=max(deadline.remaining(), 0) if deadline else None):
+            result = await next_result
+            if result:
+                return result
+    except asyncio.TimeoutError:
+        print("Request deadline reached, stopping recipe search")
+    finally:
+        # Losing searches are cancelled rather than left to finish in the background
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-    for website_name, search_func in search_functions:
-        print(f"Trying {website_name}...")
+    print("No relevant recipes found on any website")
+    return None
+
+async def get_recipe_data_async(dish_name: str, selector: str = "both", client=None) -> dict:
+    """
+    Get recipe data from the web, searching every website concurrently
+    
+    Args:
+        dish_name (str): Name of dish to search for
+        selector (str): What to return - 'ingredients', 'steps', or 'both'
+        client (httpx.AsyncClient): Client to send requests with; defaults to the shared http_client
         
-        try:
-            recipe_url = search_func(dish_name)
-            if not recipe_url:
-                print(f"No results found on {website_name}")
-                continue
-                
-            result = extract_recipe_from_website(recipe_url, selector)
-            if not result:
-                print(f"Failed to extract recipe from {website_name}")
-                continue
-                
-            # Check if result is relevant and has content
-            has_content = (
-                (selector == 'ingredients' and result.get('ingredients')) or
-                (selector == 'steps' and result.get('instructions')) or
-                (selector == 'both' and (result.get('ingredients') or result.get('instructions')))
-            )
-            
-            if has_content and is_result_relevant(result, dish_name):
-                print(f"Found relevant recipe on {website_name}")
-                
-                # Return only requested components
-                final_result = {
-                    'url': result['url'],
-                    'title': result['title']
-                }
-
-                if selector == 'ingredients':
-                    final_result['ingredients'] = result['ingredients']
-                elif selector == 'steps':
-                    final_result['instructions'] = result['instructions']
-                else:  # both
-                    final_result.update({
-                        'ingredients': result['ingredients'],
-                        'instructions': result['instructions']
-                    })
-
-                return final_result
-            else:
-                print(f"Recipe from {website_name} not relevant or incomplete")
-                
-        except Exception as e:
-            print(f"Error with {website_name}: {str(e)}")
-            continue
+    Returns:
+        dict: Dictionary containing requested recipe components
+    """
+    selector = validate_selector(selector)
+    result = await find_recipe_async(dish_name, selector, client)
+    if not result:
+        return default_result()
+    return requested_components(result, selector)
+
+def fetch_recipe(dish_name: str):
+    """Full recipe from the web, for the recipe store's background refreshes"""
+    return http_client.run(find_recipe_async(dish_name, 'both'))
+
+def get_recipe_data(dish_name: str, selector: str = "both") -> dict:
+    """
+    Get recipe data, reading through the persistent recipe store
     
-    print("No relevant recipes found on any website")
-    return default_result
+    Stored recipes are returned without touching the web; stale ones are
+    refreshed in the background. A dish not stored under its own name is
+    looked up in the local recipe index, and only if no indexed recipe scores
+    RECIPE_INDEX_MIN_SCORE are the websites searched (on the shared HTTP
+    client's event loop, since the module pipeline runs in a worker thread)
+    and the recipe found is stored.
+    
+    Args:
+        dish_name (str): Name of dish to search for
+        selector (str): What to return - 'ingredients', 'steps', or 'both'
+        
+    Returns:
+        dict: Dictionary containing requested recipe components
+    """
+    selector = validate_selector(selector)
+
+    # Failed dish identification ("Unknown food") is not worth storing
+    dish_key = normalize_dish_name(dish_name) if not dish_name.lower().startswith('unknown') else ''
+
+    if dish_key:
+        cached = load_recipe(dish_key)
+        if cached and has_requested_content(cached, selector):
+            print(f"Found stored recipe for '{dish_key}'")
+            if is_stale(cached):
+                schedule_refresh(dish_key, dish_name, fetch_recipe)
+            return requested_components(cached, selector)
+
+        score, indexed = find_indexed_recipe(dish_name)
+        if indexed and score >= RECIPE_INDEX_MIN_SCORE and has_requested_content(indexed, selector):
+            print(f"Found indexed recipe '{indexed['title']}' for '{dish_key}' (score {score:.2f})")
+            return requested_components(indexed, selector)
+
+    result = http_client.run(find_recipe_async(dish_name, selector))
+    if not result:
+        return default_result()
+
+    if dish_key:
+        save_recipe(dish_key, dish_name, result)
+        add_to_index(dish_key, dish_name, result)
+    return requested_components(result, selector)
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -1,10 +1,16 @@
 import re
-import requests
+import http_client
 import os
 from dotenv import load_dotenv
+from deadline import request_timeout
 
 load_dotenv()
 
+def clean_food_name(text: str) -> str:
+    """Strip the lead-in and trailing punctuation the model sometimes wraps a food name in"""
+    food_name = re.sub(r'^(The|This|That|It\'s|It is|Looks like)\s+', '', text.strip(), flags=re.IGNORECASE)
+    return re.sub(r'[.,;!?]*$', '', food_name).strip()
+
 def identify_food_dish(ocr_text: str) -> str:
     """
     Analyzes OCR text to identify and return the main food dish.
@@ -33,18 +39,15 @@ def identify_food_dish(ocr_text: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
-        food_name = response.json()['choices'][0]['message']['content'].strip()
-        
-        # Clean up the response to get just the food name
-        food_name = re.sub(r'^(The|This|That|It\'s|It is|Looks like)\s+', '', food_name, flags=re.IGNORECASE)
-        food_name = re.sub(r'[.,;!?]*$', '', food_name).strip()
+        food_name = clean_food_name(response.json()['choices'][0]['message']['content'])
         
         return food_name if food_name else "Unknown food"
     
@@ -87,18 +90,15 @@ def identify_food_from_caption(caption: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
-        food_name = response.json()['choices'][0]['message']['content'].strip()
-        
-        # Clean up the response
-        food_name = re.sub(r'^(The|This|That|It\'s|It is|Looks like)\s+', '', food_name, flags=re.IGNORECASE)
-        food_name = re.sub(r'[.,;!?]*$', '', food_name).strip()
+        food_name = clean_food_name(response.json()['choices'][0]['message']['content'])
         
         return food_name if food_name else "Unknown dish"
     
@@ -1,10 +1,22 @@
 import re
-import requests
+import json
+import contextvars
+import http_client
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from dotenv import load_dotenv
+from deadline import request_timeout
+from modules.cooking.foodocr import identify_food_dish, identify_food_from_caption, clean_food_name
 
 load_dotenv()
 
+SELECTORS = ('ingredients', 'steps', 'both')
+# Longer "dish names" are the model explaining itself rather than naming a dish
+MAX_DISH_LENGTH = 80
+# Runs identify_selector next to the dish call when the structured call fails
+fallback_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="cooking-identify")
+
 def identify_selector(text: str) -> str:
     """
     Identifies whether the user wants ingredients, steps, or both from a food query.
@@ -45,11 +57,11 @@ def identify_selector(text: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
             json=payload,
-            timeout=10
+            timeout=request_timeout(10)
         )
         response.raise_for_status()
         
@@ -69,4 +81,111 @@ def identify_selector(text: str) -> str:
     
     except Exception as e:
         print(f"Error analyzing selector: {str(e)}")
-        return "both"  # Default fallback on any error
\ No newline at end of file
+        return "both"  # Default fallback on any error
+
+def parse_dish_and_selector(content: str) -> Optional[tuple[str, str]]:
+    """
+    Validates the structured response against its schema.
+
+    Returns:
+        (dish, selector), or None unless content is a JSON object with exactly
+        a non-empty "dish" string and a "selector" of ingredients, steps or both
+    """
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or set(data) != {'dish', 'selector'}:
+        return None
+    dish, selector = data['dish'], data['selector']
+    if not isinstance(dish, str) or not isinstance(selector, str):
+        return None
+
+    dish = clean_food_name(dish)
+    selector = selector.strip().lower()
+    if not dish or len(dish) > MAX_DISH_LENGTH or selector not in SELECTORS:
+        return None
+    return dish, selector
+
+def identify_dish_and_selector_structured(text: str, query: str, is_caption: bool = False) -> Optional[tuple[str, str]]:
+    """
+    Identifies the dish and the wanted recipe components in one JSON-mode Groq call.
+    
+    Args:
+        text: OCR text, or a caption generated from the image if is_caption
+        query: User's question about the dish
+        
+    Returns:
+        (dish, selector), or None if the call failed or the response didn't match the schema
+    """
+    api_key = os.getenv("GROQ_API_KEY")
+    if not api_key:
+        print("GROQ_API_KEY not found in environment variables")
+        return None
+
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+
+    source = "Image Caption (generated from a food image)" if is_caption else "OCR Text"
+    prompt = f"""A user took a screenshot of something food-related and asked a question about it.
+
+    {source}: {text}
+    User question: {query}
+
+    Identify the main food dish and whether the user wants the ingredients, the cooking steps, or both.
+    Respond with a JSON object with exactly these keys:
+    "dish": JUST THE FOOD NAME that would be useful for finding recipes; if uncertain, make your best guess
+    "selector": exactly one of "ingredients", "steps", "both"
+
+    Example: {{"dish": "chicken lasagna", "selector": "ingredients"}}"""
+
+    payload = {
+        "model": "llama3-70b-8192",
+        "messages": [{
+            "role": "user",
+            "content": prompt
+        }],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.1,
+        "max_tokens": 60
+    }
+
+    try:
+        response = http_client.post(
+            "https://api.groq.com/openai/v1/chat/completions",
+            headers=headers,
+            json=payload,
+            timeout=request_timeout(20)
+        )
+        response.raise_for_status()
+        
+        content = response.json()['choices'][0]['message']['content']
+        result = parse_dish_and_selector(content)
+        if result is None:
+            print(f"Structured dish response did not match the schema: {content!r}")
+        return result
+    
+    except Exception as e:
+        print(f"Error identifying dish and selector: {str(e)}")
+        return None
+
+def identify_dish_and_selector(text: str, query: str, is_caption: bool = False) -> tuple[str, str]:
+    """
+    Identifies the dish and what the user wants from it - one Groq round trip normally.
+    
+    If the structured call fails, the separate dish and selector calls are
+    made concurrently instead, so the fallback still costs about one round trip.
+    
+    Returns:
+        (dish, selector) where selector is one of 'ingredients', 'steps', 'both'
+    """
+    result = identify_dish_and_selector_structured(text, query, is_caption)
+    if result:
+        return result
+
+    # The worker thread needs this thread's context for the request deadline
+    selector_future = fallback_executor.submit(contextvars.copy_context().run, identify_selector, query)
+    dish = identify_food_from_caption(text) if is_caption else identify_food_dish(text)
+    return dish, selector_future.result()
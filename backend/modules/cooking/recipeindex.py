@@ -0,0 +1,320 @@
+# In-memory recipe search index over the recipe store and bundled recipe datasets
+# A dish is looked up here before any recipe site is searched: a BM25 inverted
+# index over recipe titles finds lexical matches, cosine similarity over small
+# sentence embeddings catches reworded ones, and the web is only searched when
+# the best combined score is below RECIPE_INDEX_MIN_SCORE.
+import glob
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from modules.cooking.recipestore import load_all_recipes, normalize_dish_name
+
+# Best combined score (0-1) an indexed recipe needs to be served without a web search
+RECIPE_INDEX_MIN_SCORE = float(os.getenv("RECIPE_INDEX_MIN_SCORE", "0.8"))
+# Share of the combined score that comes from BM25; the rest is embedding similarity
+RECIPE_INDEX_BM25_WEIGHT = float(os.getenv("RECIPE_INDEX_BM25_WEIGHT", "0.6"))
+# The index is rebuilt from the store this often, picking up recipes saved by other workers
+RECIPE_INDEX_REFRESH_SECONDS = float(os.getenv("RECIPE_INDEX_REFRESH_SECONDS", "900"))
+# JSON Lines files of {"title", "url", "ingredients", "instructions"} indexed alongside the store
+RECIPE_DATASET_DIR = os.getenv("RECIPE_DATASET_DIR", "data/recipes")
+# Sentence embedding model; empty to always use the hashed n-gram embeddings
+RECIPE_EMBEDDING_MODEL = os.getenv("RECIPE_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = 64
+HASHED_EMBEDDING_DIMENSIONS = 256
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class TransformerEmbedder:
+    """Mean-pooled sentence embeddings from a small transformers model (MiniLM by default)"""
+
+    def __init__(self, model_name: str):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).eval()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            batch = self.tokenizer(texts[start:start + EMBEDDING_BATCH_SIZE], padding=True,
+                                   truncation=True, max_length=64, return_tensors="pt")
+            with self.torch.inference_mode():
+                output = self.model(**batch).last_hidden_state
+            mask = batch["attention_mask"].unsqueeze(-1).to(output.dtype)
+            pooled = (output * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            vectors.append(pooled.numpy())
+        return normalize_rows(np.vstack(vectors).astype(np.float32))
+
+
+class HashedNgramEmbedder:
+    """
+    Character trigram counts hashed into a fixed-size vector.
+
+    Used when the sentence model can't be loaded. It catches spelling and
+    inflection variants ("lasagne", "enchiladas") but not synonyms.
+    """
+
+    def __init__(self, dimensions: int = HASHED_EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                padded = f" {word} "
+                for start in range(len(padded) - 2):
+                    vectors[row, zlib.crc32(padded[start:start + 3].encode()) % self.dimensions] += 1.0
+        return normalize_rows(vectors)
+
+
+def create_embedder():
+    if RECIPE_EMBEDDING_MODEL:
+        try:
+            return TransformerEmbedder(RECIPE_EMBEDDING_MODEL)
+        except Exception as e:
+            print(f"Recipe index using hashed embeddings, could not load {RECIPE_EMBEDDING_MODEL}: {str(e)}")
+    return HashedNgramEmbedder()
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms: the words of the normalized dish name"""
+    return normalize_dish_name(text).split()
+
+
+class RecipeIndex:
+    """
+    BM25 inverted index plus an embedding matrix over recipe titles.
+
+    Documents are keyed like the recipe store (normalized dish name); adding
+    a recipe under an existing key replaces the indexed one.
+    """
+
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.lock = threading.Lock()
+        self.recipes: list[dict] = []
+        self.terms: list[list[str]] = []
+        self.lengths: list[int] = []
+        self.removed: set[int] = set()
+        self.doc_ids: dict[str, int] = {}
+        # term -> (doc ids, term frequencies); replaced documents stay listed
+        self.postings: dict[str, tuple[list[int], list[int]]] = {}
+        # term -> number of live documents containing it
+        self.frequencies: Counter = Counter()
+        self.embeddings = np.zeros((0, 0), dtype=np.float32)
+        self.pending_embeddings: list[np.ndarray] = []
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.recipes) - len(self.removed)
+
+    def add_many(self, entries: list[tuple[str, str, dict]]):
+        """Index (key, indexed text, recipe) entries, embedding their texts in one batch"""
+        entries = [(key, text, recipe) for key, text, recipe in entries if tokenize(text)]
+        if not entries:
+            return
+        vectors = self.embedder.embed([normalize_dish_name(text) for _, text, _ in entries])
+        with self.lock:
+            for (key, text, recipe), vector in zip(entries, vectors):
+                self._add(key, text, recipe, vector)
+
+    def add(self, key: str, text: str, recipe: dict):
+        self.add_many([(key, text, recipe)])
+
+    def _add(self, key, text, recipe, vector):
+        previous = self.doc_ids.get(key)
+        if previous is not None:
+            self.removed.add(previous)
+            self.total_length -= self.lengths[previous]
+            self.frequencies.subtract(self.terms[previous])
+
+        doc_id = len(self.recipes)
+        terms = tokenize(text)
+        self.doc_ids[key] = doc_id
+        self.recipes.append(recipe)
+        self.terms.append(sorted(set(terms)))
+        self.lengths.append(len(terms))
+        self.total_length += len(terms)
+        self.frequencies.update(self.terms[doc_id])
+        for term, count in Counter(terms).items():
+            doc_list, tf_list = self.postings.setdefault(term, ([], []))
+            doc_list.append(doc_id)
+            tf_list.append(count)
+        self.pending_embeddings.append(vector)
+
+    def idf(self, term: str, documents: int) -> float:
+        frequency = self.frequencies[term]
+        return math.log(1 + (documents - frequency + 0.5) / (frequency + 0.5))
+
+    def search(self, dish_name: str) -> tuple[float, Optional[dict]]:
+        """
+        Best-matching recipe for a dish name.
+
+        Returns:
+            tuple: (score between 0 and 1, recipe), or (0.0, None) if nothing matches
+        """
+        query_terms = set(tokenize(dish_name))
+        if not query_terms:
+            return 0.0, None
+        query_vector = self.embedder.embed([normalize_dish_name(dish_name)])[0]
+
+        with self.lock:
+            documents = len(self)
+            if not documents:
+                return 0.0, None
+            if self.pending_embeddings:
+                pending = np.vstack(self.pending_embeddings)
+                self.embeddings = np.vstack([self.embeddings, pending]) if len(self.embeddings) else pending
+                self.pending_embeddings = []
+
+            lengths = np.asarray(self.lengths, dtype=np.float32)
+            average_length = self.total_length / documents
+            idfs = {term: self.idf(term, documents) for term in query_terms}
+            bm25 = np.zeros(len(self.recipes), dtype=np.float32)
+            for term in query_terms:
+                if term not in self.postings:
+                    continue
+                doc_list, tf_list = self.postings[term]
+                doc_list = np.asarray(doc_list)
+                tf = np.asarray(tf_list, dtype=np.float32)
+                length_norm = 1 - BM25_B + BM25_B * lengths[doc_list] / average_length
+                bm25[doc_list] += idfs[term] * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+
+            # BM25 is unbounded; divide by what an exact title match would score so
+            # words missing from either the query or the title lower the score
+            query_weight = sum(idfs.values())
+            lexical = np.zeros_like(bm25)
+            for doc_id in np.flatnonzero(bm25):
+                doc_weight = sum(self.idf(term, documents) for term in self.terms[doc_id])
+                lexical[doc_id] = min(bm25[doc_id] / max(query_weight, doc_weight), 1.0)
+
+            cosine = np.clip(self.embeddings @ query_vector, 0.0, 1.0)
+            scores = RECIPE_INDEX_BM25_WEIGHT * lexical + (1 - RECIPE_INDEX_BM25_WEIGHT) * cosine
+            if self.removed:
+                scores[list(self.removed)] = -1.0
+            best = int(np.argmax(scores))
+            return float(scores[best]), self.recipes[best]
+
+
+def load_dataset_recipes(directory: str = RECIPE_DATASET_DIR) -> list[tuple[str, str, dict]]:
+    """Index entries from the bundled JSON Lines recipe datasets"""
+    entries = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    if not item.get('url') or not (item.get('ingredients') or item.get('instructions')):
+                        continue
+                    text = item.get('dish_name') or item.get('title') or ''
+                    recipe = {
+                        'title': item.get('title') or text,
+                        'url': item['url'],
+                        'ingredients': item.get('ingredients') or [],
+                        'instructions': item.get('instructions') or [],
+                    }
+                    entries.append((normalize_dish_name(text), text, recipe))
+        except (OSError, ValueError) as e:
+            print(f"Error reading recipe dataset {path}: {str(e)}")
+    return entries
+
+
+def build_recipe_index(embedder=None) -> RecipeIndex:
+    """Index the bundled datasets, then the recipe store (stored recipes win on the same key)"""
+    index = RecipeIndex(embedder or create_embedder())
+    entries = load_dataset_recipes()
+    for recipe in load_all_recipes():
+        dish_key = recipe.pop('dish_key')
+        dish_name = recipe.pop('dish_name')
+        entries.append((dish_key, f"{dish_name} {recipe['title']}", recipe))
+    index.add_many(entries)
+    return index
+
+
+_index: Optional[RecipeIndex] = None
+_embedder = None
+_built_at = float("-inf")
+_building = False
+_lock = threading.Lock()
+
+
+def get_embedder():
+    """The shared embedder, loading the model on first use (or in the server master, before forking)"""
+    global _embedder
+    with _lock:
+        if _embedder is None:
+            _embedder = create_embedder()
+        return _embedder
+
+
+def _build():
+    global _index, _built_at, _building
+    try:
+        start_time = time.perf_counter()
+        index = build_recipe_index(get_embedder())
+        with _lock:
+            _index = index
+            _built_at = time.monotonic()
+        print(f"Recipe index built: {len(index)} recipes in {time.perf_counter() - start_time:.2f}s")
+    except Exception as e:
+        print(f"Error building recipe index: {str(e)}")
+        with _lock:
+            _built_at = time.monotonic()
+    finally:
+        with _lock:
+            _building = False
+
+
+def warm_recipe_index():
+    """Build (or rebuild, once RECIPE_INDEX_REFRESH_SECONDS old) the index in a background thread"""
+    global _building
+    with _lock:
+        if _building or time.monotonic() - _built_at < RECIPE_INDEX_REFRESH_SECONDS:
+            return
+        _building = True
+    threading.Thread(target=_build, name="recipe-index", daemon=True).start()
+
+
+def get_recipe_index() -> Optional[RecipeIndex]:
+    """The current index, or None while the first build is still running; never blocks on a build"""
+    warm_recipe_index()
+    return _index
+
+
+def find_indexed_recipe(dish_name: str) -> tuple[float, Optional[dict]]:
+    index = get_recipe_index()
+    if index is None:
+        return 0.0, None
+    return index.search(dish_name)
+
+
+def add_to_index(dish_key: str, dish_name: str, recipe: dict):
+    """Make a newly stored recipe searchable in this worker without waiting for a rebuild"""
+    index = _index
+    if index is not None:
+        index.add(dish_key, f"{dish_name} {recipe.get('title') or ''}", {
+            'title': recipe.get('title') or '',
+            'url': recipe['url'],
+            'ingredients': recipe.get('ingredients') or [],
+            'instructions': recipe.get('instructions') or [],
+        })
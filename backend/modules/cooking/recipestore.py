@@ -0,0 +1,161 @@
+# Persistent recipe store: parsed recipes in Postgres, keyed by normalized dish name
+# Recipes rarely change, so entries are served for RECIPE_CACHE_TTL_DAYS and
+# refreshed in the background after that instead of being scraped per request.
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from database import SessionLocal, RecipeCache
+
+# Entries older than this are still served, but trigger a background refresh
+RECIPE_CACHE_TTL_DAYS = float(os.getenv("RECIPE_CACHE_TTL_DAYS", "30"))
+# A key is refreshed at most once per this many seconds, even if refreshes keep failing
+RECIPE_REFRESH_RETRY_SECONDS = 3600
+RECIPE_REFRESH_WORKERS = 2
+
+WORD = re.compile(r"[a-z0-9]+")
+# Words that don't change which recipe is wanted
+STOP_WORDS = frozenset({
+    "a", "an", "the", "and", "or", "of", "with", "in", "on", "for", "to", "from", "style",
+    "recipe", "recipes", "homemade", "easy", "simple", "quick", "best", "classic", "traditional",
+    "authentic", "delicious", "perfect", "ultimate", "how", "make", "making", "cook", "cooking",
+})
+# Plurals the suffix rules below would get wrong
+IRREGULAR_SINGULARS = {
+    "leaves": "leaf", "loaves": "loaf", "halves": "half", "knives": "knife",
+    "potatoes": "potato", "tomatoes": "tomato", "mangoes": "mango", "molasses": "molasses",
+    "cookies": "cookie", "brownies": "brownie", "smoothies": "smoothie", "quiches": "quiche",
+}
+
+refresh_executor = ThreadPoolExecutor(max_workers=RECIPE_REFRESH_WORKERS, thread_name_prefix="recipe-refresh")
+refresh_lock = threading.Lock()
+refresh_started: dict[str, float] = {}
+
+
+def singularize(word: str) -> str:
+    if word in IRREGULAR_SINGULARS:
+        return IRREGULAR_SINGULARS[word]
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def normalize_dish_name(dish_name: str) -> str:
+    """
+    Cache key for a dish name: lowercased, accents dropped, stop words removed,
+    each word singularized.
+
+    "The Best Chicken Tacos Recipe" and "chicken taco" both become "chicken taco",
+    "Crème Brûlée" becomes "creme brulee".
+    """
+    # Decompose accented letters and drop the marks, so WORD keeps them as letters
+    folded = "".join(char for char in unicodedata.normalize("NFKD", dish_name.lower())
+                     if not unicodedata.combining(char))
+    words = [singularize(word) for word in WORD.findall(folded) if word not in STOP_WORDS]
+    return " ".join(words)
+
+
+def load_recipe(dish_key: str) -> Optional[dict]:
+    """Stored recipe for dish_key, with its fetched_at, or None"""
+    try:
+        with SessionLocal() as db:
+            row = db.execute(select(RecipeCache).where(RecipeCache.dish_key == dish_key)).scalar_one_or_none()
+            if row is None:
+                return None
+            return {
+                'title': row.title,
+                'url': row.url,
+                'ingredients': row.ingredients,
+                'instructions': row.instructions,
+                'fetched_at': row.fetched_at,
+            }
+    except Exception as e:
+        print(f"Error reading recipe cache: {str(e)}")
+        return None
+
+
+def load_all_recipes() -> list[dict]:
+    """Every stored recipe with its dish_key and dish_name, for the recipe index"""
+    try:
+        with SessionLocal() as db:
+            rows = db.execute(select(
+                RecipeCache.dish_key, RecipeCache.dish_name, RecipeCache.title, RecipeCache.url,
+                RecipeCache.ingredients, RecipeCache.instructions,
+            )).all()
+            return [row._asdict() for row in rows]
+    except Exception as e:
+        print(f"Error reading recipe cache: {str(e)}")
+        return []
+
+
+def save_recipe(dish_key: str, dish_name: str, recipe: dict):
+    """Insert or replace the stored recipe for dish_key"""
+    values = {
+        'dish_key': dish_key,
+        'dish_name': dish_name,
+        'title': recipe.get('title') or '',
+        'url': recipe['url'],
+        'ingredients': recipe.get('ingredients') or [],
+        'instructions': recipe.get('instructions') or [],
+        'fetched_at': datetime.now(timezone.utc),
+    }
+    statement = insert(RecipeCache).values(values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RecipeCache.dish_key],
+        set_={key: statement.excluded[key] for key in values if key != 'dish_key'},
+    )
+    try:
+        with SessionLocal() as db:
+            db.execute(statement)
+            db.commit()
+    except Exception as e:
+        print(f"Error writing recipe cache: {str(e)}")
+
+
+def is_stale(recipe: dict) -> bool:
+    return datetime.now(timezone.utc) - recipe['fetched_at'] > timedelta(days=RECIPE_CACHE_TTL_DAYS)
+
+
+def refresh_recipe(dish_key: str, dish_name: str, fetch: Callable[[str], Optional[dict]]):
+    try:
+        recipe = fetch(dish_name)
+    except Exception as e:
+        print(f"Error refreshing recipe for '{dish_name}': {str(e)}")
+        return
+    # Keep the stale entry if no site returned a relevant recipe this time
+    if recipe:
+        save_recipe(dish_key, dish_name, recipe)
+
+
+def schedule_refresh(dish_key: str, dish_name: str, fetch: Callable[[str], Optional[dict]]) -> bool:
+    """
+    Refresh a stale entry in the background with fetch(dish_name).
+
+    Runs outside the request (and its deadline). Returns False if the key
+    was already refreshed within RECIPE_REFRESH_RETRY_SECONDS.
+    """
+    now = time.monotonic()
+    with refresh_lock:
+        if now - refresh_started.get(dish_key, float("-inf")) < RECIPE_REFRESH_RETRY_SECONDS:
+            return False
+        refresh_started[dish_key] = now
+        if len(refresh_started) > 10000:
+            for key, started in list(refresh_started.items()):
+                if now - started >= RECIPE_REFRESH_RETRY_SECONDS:
+                    del refresh_started[key]
+    refresh_executor.submit(refresh_recipe, dish_key, dish_name, fetch)
+    return True
@@ -1,7 +1,8 @@
 import re
-import requests
+import http_client
 import os
 from dotenv import load_dotenv
+from deadline import request_timeout, deadline_expired, set_partial_result
 from bs4 import BeautifulSoup
 import urllib.parse
 import time
@@ -44,10 +45,11 @@ def identify_news_topic(ocr_text: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
@@ -98,10 +100,11 @@ def identify_news_from_caption(caption: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
@@ -130,7 +133,7 @@ def search_google_news(topic: str):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
 
-        response = requests.get(search_url, headers=headers, timeout=15)
+        response = http_client.get(search_url, headers=headers, timeout=request_timeout(15))
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -188,7 +191,7 @@ def search_alternative_news(topic: str):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
 
-        response = requests.get(search_url, headers=headers, timeout=15)
+        response = http_client.get(search_url, headers=headers, timeout=request_timeout(15))
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -263,10 +266,11 @@ def summarize_news_content(articles: list, query: str, topic: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
@@ -282,12 +286,16 @@ def summarize_news_content(articles: list, query: str, topic: str) -> str:
     except Exception as e:
         print(f"Error generating summary: {str(e)}")
         # Fallback: return basic article information
-        response = f"Found {len(articles)} recent articles about '{topic}':\n\n"
-        for i, article in enumerate(articles[:3], 1):
-            response += f"{i}. **{article['title']}**\n"
-            response += f"   {article['snippet']}\n"
-            response += f"   Source: {article['source']}\n\n"
-        return response
+        return format_articles(articles, topic)
+
+def format_articles(articles: list, topic: str) -> str:
+    """Basic article listing used when no AI summary is available"""
+    response = f"Found {len(articles)} recent articles about '{topic}':\n\n"
+    for i, article in enumerate(articles[:3], 1):
+        response += f"{i}. **{article['title']}**\n"
+        response += f"   {article['snippet']}\n"
+        response += f"   Source: {article['source']}\n\n"
+    return response
 
 def news_init(ocr_text: str, query: str, is_caption: bool = False) -> str:
     """
@@ -319,7 +327,7 @@ def news_init(ocr_text: str, query: str, is_caption: bool = False) -> str:
         articles = search_google_news(topic)
         
         # Try alternative search if Google News fails
-        if not articles:
+        if not articles and not deadline_expired():
             print("🔄 Trying alternative news search...")
             articles = search_alternative_news(topic)
         
@@ -327,6 +335,7 @@ def news_init(ocr_text: str, query: str, is_caption: bool = False) -> str:
             return f"No recent news articles found for '{topic}'. Please try with more specific terms."
         
         print(f"📰 Found {len(articles)} relevant articles")
+        set_partial_result(format_articles(articles, topic))
         
         # Generate summary and answer user query
         result = summarize_news_content(articles, query, topic)
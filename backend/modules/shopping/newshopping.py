@@ -7,6 +7,8 @@ from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import urllib.parse
 import logging
+import http_client
+from deadline import request_timeout
 
 # Optional: Enable logging for debugging
 logging.basicConfig(level=logging.INFO)
@@ -31,10 +33,12 @@ def search_daraz(query):
         # Setup ChromeDriver
         service = Service(ChromeDriverManager().install())
         driver = webdriver.Chrome(service=service, options=options)
-        driver.set_page_load_timeout(30)
+        driver.set_page_load_timeout(request_timeout(30))
 
         logging.info(f"Navigating to {search_url}")
-        driver.get(search_url)
+        # The browser doesn't use the shared HTTP client, so take Daraz's governor slot explicitly
+        with http_client.governed("www.daraz.com.np"):
+            driver.get(search_url)
 
         # Wait for products to load with multiple possible selectors
         product_selectors = [
@@ -48,11 +52,11 @@ def search_daraz(query):
         for selector in product_selectors:
             try:
                 if selector.startswith("["):
-                    first_card = WebDriverWait(driver, 5).until(
+                    first_card = WebDriverWait(driver, request_timeout(5)).until(
                         EC.presence_of_element_located((By.CSS_SELECTOR, selector))
                     )
                 else:
-                    first_card = WebDriverWait(driver, 5).until(
+                    first_card = WebDriverWait(driver, request_timeout(5)).until(
                         EC.presence_of_element_located((By.CLASS_NAME, selector))
                     )
                 break
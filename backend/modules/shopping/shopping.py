@@ -1,7 +1,8 @@
 import re
-import requests
+import http_client
 import os
 from dotenv import load_dotenv
+from deadline import request_timeout, set_partial_result
 
 # Load environment variables
 load_dotenv()
@@ -46,10 +47,11 @@ def identify_item(ocr_text: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
@@ -73,6 +75,7 @@ def shopping_init(ocr_text: str, query: str) -> str:
         
         if item_name.lower() == "unknown item":
             return "Could not identify a valid item from the image."
+        set_partial_result(f"The item in your screenshot looks like '{item_name}', but the Daraz search did not finish in time.")
         
         result = search_daraz(item_name)
         print(f"🛒 Daraz Result: {result}")
@@ -1,5 +1,6 @@
 from modules.travel.travelocr import identify_place, identify_place_from_caption
 from modules.travel.travelplanning import generate_travel_plan, display_travel_plan
+from deadline import set_partial_result
 
 def travel_init(ocr_text: str, query: str, is_caption: bool = False) -> str:
     """
@@ -26,6 +27,8 @@ def travel_init(ocr_text: str, query: str, is_caption: bool = False) -> str:
         if destination.lower() == "unknown place":
             return "Could not identify a valid destination from the image."
         
+        set_partial_result(f"The destination in your screenshot looks like {destination}, but the travel plan did not finish in time.")
+
         # Generate travel plan
         print(f"📋 Generating travel plan for {destination}...")
         travel_data = generate_travel_plan(destination)
@@ -1,7 +1,8 @@
 import re
-import requests
+import http_client
 import os
 from dotenv import load_dotenv
+from deadline import request_timeout
 
 load_dotenv()
 
@@ -33,10 +34,11 @@ def identify_place(ocr_text: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
@@ -87,10 +89,11 @@ def identify_place_from_caption(caption: str) -> str:
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
-            json=payload
+            json=payload,
+            timeout=request_timeout(20)
         )
         response.raise_for_status()
         
@@ -1,6 +1,7 @@
-import requests
+import http_client
 import os
 from dotenv import load_dotenv
+from deadline import request_timeout
 
 load_dotenv()
 
@@ -65,11 +66,11 @@ Keep it practical and Nepal-focused. Format clearly with sections."""
     }
 
     try:
-        response = requests.post(
+        response = http_client.post(
             "https://api.groq.com/openai/v1/chat/completions",
             headers=headers,
             json=payload,
-            timeout=30
+            timeout=request_timeout(30)
         )
         response.raise_for_status()
         
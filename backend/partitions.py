@@ -0,0 +1,176 @@
+# Maintenance for the monthly-partitioned queries table
+# Run daily (e.g. from cron): python partitions.py
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from database import engine
+
+# Monthly partitions older than this are detached and dropped
+QUERY_RETENTION_MONTHS = int(os.getenv("QUERY_RETENTION_MONTHS", "12"))
+# Partitions are created this many months ahead so inserts never land in the default partition
+PARTITIONS_AHEAD_MONTHS = 2
+
+PARTITION_NAME = re.compile(r"^queries_(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"queries_{month:%Y_%m}"
+
+
+def create_month_partition(conn: Connection, month: date) -> bool:
+    """
+    Create and attach the partition for month if it does not exist yet.
+
+    Rows that already landed in the default partition for that month are
+    moved into it first, otherwise attaching would fail.
+    Returns True if a partition was created.
+    """
+    name = partition_name(month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+        return False
+
+    start = f"{month:%Y-%m-%d} 00:00:00+00"
+    end = f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00"
+    conn.execute(text(f"CREATE TABLE {name} (LIKE queries INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"))
+    # search_vector is generated, so it is recomputed rather than copied
+    conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM queries_default
+            WHERE created_at >= '{start}' AND created_at < '{end}'
+            RETURNING id, user_id, query_text, response_text, module_used, created_at
+        )
+        INSERT INTO {name} (id, user_id, query_text, response_text, module_used, created_at)
+        SELECT * FROM moved
+    """))
+    conn.execute(text(f"ALTER TABLE queries ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+    return True
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = PARTITIONS_AHEAD_MONTHS) -> list[str]:
+    """Create partitions for the current month and months_ahead months after it"""
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(this_month, offset)
+        if create_month_partition(conn, month):
+            created.append(partition_name(month))
+    return created
+
+
+def list_month_partitions(conn: Connection) -> list[tuple[str, date]]:
+    rows = conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'queries'
+    """)).scalars()
+    partitions = []
+    for name in rows:
+        match = PARTITION_NAME.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def refresh_daily_rollups(conn: Connection, start_day: date, end_day: date) -> int:
+    """Recompute per-module, per-user query counts for days in [start_day, end_day]"""
+    params = {"start": start_day, "end": end_day + timedelta(days=1)}
+    conn.execute(text("""
+        DELETE FROM query_daily_rollups WHERE day >= :start AND day < :end
+    """), params)
+    result = conn.execute(text("""
+        INSERT INTO query_daily_rollups (day, module_used, user_id, query_count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, module_used, user_id, COUNT(*)
+        FROM queries
+        WHERE created_at >= CAST(:start AS timestamp) AT TIME ZONE 'UTC'
+          AND created_at < CAST(:end AS timestamp) AT TIME ZONE 'UTC'
+        GROUP BY 1, 2, 3
+    """), params)
+    return result.rowcount
+
+
+def rollup_start_day(conn: Connection, today: date) -> date:
+    """
+    First day refresh_daily_rollups needs to cover: the last day already rolled
+    up (it may have been counted before it was over), or the oldest query if
+    there are no rollups yet. Days missed while maintenance wasn't running are
+    caught up this way.
+    """
+    last_day = conn.execute(text("SELECT max(day) FROM query_daily_rollups")).scalar()
+    if last_day is None:
+        first_query = conn.execute(text("SELECT min(created_at) FROM queries")).scalar()
+        last_day = first_query.astimezone(timezone.utc).date() if first_query else today
+    return min(last_day, today)
+
+
+def retention_cutoff(retention_months: int = QUERY_RETENTION_MONTHS) -> date:
+    """First day of the oldest month that is kept"""
+    return add_months(datetime.now(timezone.utc).date().replace(day=1), -retention_months)
+
+
+def delete_default_rows(conn: Connection, start: Optional[date], end: date) -> int:
+    """Delete rows created in [start, end) (from the beginning if start is None) from the default partition"""
+    result = conn.execute(text("""
+        DELETE FROM queries_default
+        WHERE (CAST(:start AS timestamp) IS NULL OR created_at >= CAST(:start AS timestamp) AT TIME ZONE 'UTC')
+          AND created_at < CAST(:end AS timestamp) AT TIME ZONE 'UTC'
+    """), {"start": start, "end": end})
+    return result.rowcount
+
+
+def drop_old_partitions(conn: Connection, retention_months: int = QUERY_RETENTION_MONTHS) -> list[str]:
+    """
+    Detach and drop monthly partitions that ended more than retention_months
+    ago, together with the default partition's rows for those months.
+    """
+    cutoff = retention_cutoff(retention_months)
+    dropped = []
+    for name, month in list_month_partitions(conn):
+        if add_months(month, 1) > cutoff:
+            break
+        # Keep the dashboards' numbers for the days being dropped
+        refresh_daily_rollups(conn, month, add_months(month, 1) - timedelta(days=1))
+        delete_default_rows(conn, month, add_months(month, 1))
+        conn.execute(text(f"ALTER TABLE queries DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+def prune_default_partition(conn: Connection, retention_months: int = QUERY_RETENTION_MONTHS) -> int:
+    """
+    Delete default partition rows older than the retention cutoff whose month
+    has no partition left to drop them with. Their rollups are left as they
+    were last refreshed, since the rest of those days is already gone.
+    """
+    return delete_default_rows(conn, None, retention_cutoff(retention_months))
+
+
+def run_maintenance():
+    """Create upcoming partitions, bring the rollups up to date, and apply retention"""
+    today = datetime.now(timezone.utc).date()
+    with engine.begin() as conn:
+        created = ensure_partitions(conn)
+        rollup_rows = refresh_daily_rollups(conn, rollup_start_day(conn, today), today)
+        dropped = drop_old_partitions(conn)
+        pruned = prune_default_partition(conn)
+
+    print(f"Created partitions: {', '.join(created) or 'none'}")
+    print(f"Rollup rows written: {rollup_rows}")
+    print(f"Dropped partitions: {', '.join(dropped) or 'none'}")
+    print(f"Old rows deleted from queries_default: {pruned}")
+
+
+if __name__ == "__main__":
+    run_maintenance()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, TypeAdapter
+from typing import Optional, List
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -43,3 +43,13 @@ class QueryResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Built once: validates and serializes a whole query history in one call
+query_list_adapter = TypeAdapter(list[QueryResponse])
+
+class QuerySearchResult(QueryResponse):
+    rank: float
+
+class QuerySearchPage(BaseModel):
+    results: List[QuerySearchResult]
+    next_cursor: Optional[str] = None
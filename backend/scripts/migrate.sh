@@ -7,6 +7,10 @@ python -m alembic revision
 echo "Applying database migrations..."
 python -m alembic upgrade head
 
-# Start the FastAPI server
+# Create upcoming query partitions (also run daily from cron for retention and rollups)
+echo "Maintaining query partitions..."
+python partitions.py
+
+# Start the FastAPI server (models are loaded once and shared by all workers)
 echo "Starting server..."
-python -m uvicorn main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+python -m gunicorn main:app -c gunicorn.conf.py
\ No newline at end of file
@@ -0,0 +1,6 @@
+#!/bin/bash
+# Runs once when the primary's data directory is first created.
+# Allows the read replica to stream WAL as the main database user.
+set -e
+
+echo "host replication ${POSTGRES_USER} all md5" >> "$PGDATA/pg_hba.conf"
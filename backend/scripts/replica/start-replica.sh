@@ -0,0 +1,22 @@
+#!/bin/bash
+# Starts a hot-standby read replica of the primary database.
+# On first start the data directory is cloned from the primary with pg_basebackup.
+set -e
+
+PGDATA=/var/lib/postgresql/data
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    echo "Waiting for primary at ${PRIMARY_HOST}..."
+    until pg_isready -h "$PRIMARY_HOST" -U "$POSTGRES_USER"; do
+        sleep 1
+    done
+
+    echo "Cloning primary..."
+    PGPASSWORD="$POSTGRES_PASSWORD" pg_basebackup -h "$PRIMARY_HOST" -U "$POSTGRES_USER" \
+        -D "$PGDATA" -R -X stream -P
+    chown -R postgres:postgres "$PGDATA"
+    chmod 700 "$PGDATA"
+fi
+
+echo "Starting replica..."
+exec gosu postgres postgres -c hot_standby=on
@@ -1,11 +1,12 @@
 import pytesseract
 from PIL import Image
-from classifier import classify_user_input
+from classifier import classify_user_input, classify_user_inputs, get_classifier
 import whisper
 import io
 import torch
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
 from transformers import BlipProcessor, BlipForConditionalGeneration
 
 # Load models once at startup
@@ -16,6 +17,57 @@ print("Loading BLIP model for image captioning...")
 blip_processor = BlipProcessor.from_pretrained("Salesforce/blip-image-captioning-base")
 blip_model = BlipForConditionalGeneration.from_pretrained("Salesforce/blip-image-captioning-base")
 
+SUPPORTED_MODULES = ("cooking", "shopping", "travel", "news")
+
+# Worker pool shared by batch requests for OCR/captioning and module calls.
+# Most of the work waits on tesseract or the network, so size it like an I/O pool.
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+def dispatch_module(module: str, text: str, query: str, is_caption: bool = False) -> str:
+    """
+    Run the given module on already extracted text.
+    
+    Args:
+        module: One of SUPPORTED_MODULES (case-insensitive)
+        text: OCR text or image caption
+        query: User's text query
+        is_caption: Whether text is an image caption
+    """
+    module = module.lower()
+    if module == "cooking":
+        from modules.cooking.cooking import cooking_init
+        return cooking_init(text, query, is_caption)
+    if module == "shopping":
+        from modules.shopping.shopping import shopping_init
+        return shopping_init(text, query)
+    if module == "travel":
+        from modules.travel.travel import travel_init
+        return travel_init(text, query, is_caption)
+    if module == "news":
+        from modules.news.news import news_init
+        return news_init(text, query, is_caption)
+    raise ValueError(f"Module '{module}' is not supported")
+
+def preload_models():
+    """
+    Load every model up front and freeze it for inference.
+    
+    Called in the server master before forking so workers share the weights
+    copy-on-write instead of each loading (or lazily touching) their own copy.
+    """
+    from modules.cooking.recipeindex import TransformerEmbedder, get_embedder
+
+    classifier = get_classifier()
+    models = [whisper_model, blip_model, classifier.model.model]
+    embedder = get_embedder()
+    if isinstance(embedder, TransformerEmbedder):
+        models.append(embedder.model)
+    for model in models:
+        model.eval()
+        for param in model.parameters():
+            param.requires_grad_(False)
+
 def extract_text_or_caption(image_path: str) -> tuple[str, bool]:
     """
     Extract text from image using OCR, fallback to image captioning if minimal text found.
@@ -47,9 +99,6 @@ def extract_text_or_caption(image_path: str) -> tuple[str, bool]:
             print(f"[ERROR] Image captioning failed: {str(e)}")
             return ocr_text if ocr_text else "Unable to process image", False
 
-# Load Whisper model once at startup
-whisper_model = whisper.load_model("base")
-
 def main():
     img = Image.open("Screenshot 2025-06-04 at 8.00.22 PM.png")
     text = pytesseract.image_to_string(img)
@@ -69,6 +118,17 @@ def main():
     else:
         print(f"Category '{category}' is not supported.")
 
+def classify_queries(queries: list[str]) -> dict[str, str]:
+    """
+    Classify each distinct query once and map it to its category.
+    
+    Identical questions in a batch share a single classification.
+    """
+    unique_queries = list(dict.fromkeys(queries))
+    if not unique_queries:
+        return {}
+    return dict(zip(unique_queries, classify_user_inputs(unique_queries)))
+
 def query_screenshot(query: str, screenshot_path: str) -> str:
     text, is_caption = extract_text_or_caption(screenshot_path)
     category = classify_user_input(query)
@@ -76,18 +136,8 @@ def query_screenshot(query: str, screenshot_path: str) -> str:
     # Add context about whether we're using caption or OCR
     context_info = " (analyzed from image)" if is_caption else " (from text)"
     
-    if category.lower() == "cooking":
-        from modules.cooking.cooking import cooking_init
-        return cooking_init(text, query, is_caption)
-    if category.lower() == "shopping":
-        from modules.shopping.shopping import shopping_init
-        return shopping_init(text, query)
-    if category.lower() == "travel":
-        from modules.travel.travel import travel_init
-        return travel_init(text, query, is_caption)
-    if category.lower() == "news":
-        from modules.news.news import news_init
-        return news_init(text, query, is_caption)
+    if category.lower() in SUPPORTED_MODULES:
+        return dispatch_module(category, text, query, is_caption)
     return f"Category '{category}' is not supported."
 
 def voice_screenshot(audio_bytes: bytes, screenshot_path: str) -> str:
@@ -157,20 +207,9 @@ def query_screenshot_explicit(query: str, screenshot_path: str, module: str) ->
     # Add context about whether we're using caption or OCR
     context_info = " (analyzed from image)" if is_caption else " (from text)"
     
-    if module.lower() == "cooking":
-        from modules.cooking.cooking import cooking_init
-        return cooking_init(text, query, is_caption)
-    elif module.lower() == "shopping":
-        from modules.shopping.shopping import shopping_init
-        return shopping_init(text, query)
-    elif module.lower() == "travel":
-        from modules.travel.travel import travel_init
-        return travel_init(text, query, is_caption)
-    elif module.lower() == "news":
-        from modules.news.news import news_init
-        return news_init(text, query, is_caption)
-    else:
-        return f"Module '{module}' is not supported. Available modules: cooking, shopping, travel, news"
+    if module.lower() in SUPPORTED_MODULES:
+        return dispatch_module(module, text, query, is_caption)
+    return f"Module '{module}' is not supported. Available modules: cooking, shopping, travel, news"
 
 def voice_screenshot_explicit(audio_bytes: bytes, screenshot_path: str, module: str) -> str:
     """
@@ -0,0 +1,56 @@
+import statistics
+import time
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+EMAIL = "auth-bench@example.com"
+PASSWORD = "benchpassword123"
+
+
+def get_access_token():
+    """Sign up (if needed) and log in the benchmark user"""
+    requests.post(f"{BASE_URL}/auth/signup", json={
+        "name": "Auth Bench",
+        "email": EMAIL,
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    })
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def time_requests(session, url, headers=None, num_requests=500):
+    """Return per-request latencies in milliseconds"""
+    latencies = []
+    for _ in range(num_requests):
+        start_time = time.perf_counter()
+        response = session.get(url, headers=headers)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<24} mean {statistics.mean(latencies):6.2f} ms | "
+          f"p50 {statistics.median(latencies):6.2f} ms | p99 {p99:6.2f} ms")
+    return statistics.median(latencies)
+
+
+if __name__ == "__main__":
+    # Run once against a server started with PRINCIPAL_CACHE_TTL_SECONDS=0
+    # (every request hits Postgres) and once with the default cache enabled
+    token = get_access_token()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with requests.Session() as session:
+        # Warm up connections and the principal cache
+        time_requests(session, f"{BASE_URL}/auth/me", headers, num_requests=20)
+
+        baseline = report("GET / (no auth)", time_requests(session, f"{BASE_URL}/"))
+        authed = report("GET /auth/me", time_requests(session, f"{BASE_URL}/auth/me", headers))
+
+    print(f"\nAuth overhead per request (p50): {authed - baseline:.2f} ms")
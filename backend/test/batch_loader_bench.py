@@ -0,0 +1,97 @@
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import event, text
+
+# Run from backend/: python test/batch_loader_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from v1.db.db import AsyncSessionLocal, async_engine
+from v1.db.helpers import BatchLoader, bulk_upsert, get_data, get_single_record, upsert_data
+
+AUTHORS = "loader_bench_authors"
+POSTS = "loader_bench_posts"
+NUM_AUTHORS = 50
+NUM_POSTS = 500
+UPSERT_ROWS = 2000
+
+statements = {"count": 0}
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    statements["count"] += 1
+
+
+async def measure(label, call):
+    statements["count"] = 0
+    start_time = time.perf_counter()
+    result = await call()
+    duration = time.perf_counter() - start_time
+    print(f"  {label:<28} {duration * 1000:>8.1f}ms  {statements['count']:>5} statements")
+    return result
+
+
+async def posts_with_authors_n_plus_one(db):
+    """One author lookup per post"""
+    posts = await get_data(db, POSTS, order_by="id")
+    for post in posts:
+        post["author"] = await get_single_record(db, AUTHORS, ["id", "name"], "id = :id", {"id": post["author_id"]})
+    return posts
+
+
+async def posts_with_authors_loader(db):
+    """Author lookups resolved concurrently, batched by the loader"""
+    posts = await get_data(db, POSTS, order_by="id")
+    authors = BatchLoader(db, AUTHORS, "id", ["id", "name"])
+
+    async def attach(post):
+        post["author"] = await authors.load(post["author_id"])
+
+    await asyncio.gather(*(attach(post) for post in posts))
+    return posts
+
+
+async def upsert_row_by_row(db, rows):
+    for row in rows:
+        await upsert_data(db, AUTHORS, row, "email")
+    return len(rows)
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {POSTS}, {AUTHORS}"))
+        await conn.execute(text(f"CREATE TABLE {AUTHORS} (id SERIAL PRIMARY KEY, email TEXT UNIQUE, name TEXT)"))
+        await conn.execute(text(f"""
+            CREATE TABLE {POSTS} (id SERIAL PRIMARY KEY, author_id INTEGER REFERENCES {AUTHORS} (id), title TEXT)
+        """))
+
+    async with AsyncSessionLocal() as db:
+        authors = [{"email": f"author{i}@example.com", "name": f"Author {i}"} for i in range(NUM_AUTHORS)]
+        await bulk_upsert(db, AUTHORS, authors, "email")
+        await db.execute(text(f"""
+            INSERT INTO {POSTS} (author_id, title)
+            SELECT 1 + g % {NUM_AUTHORS}, 'Post ' || g FROM generate_series(1, {NUM_POSTS}) g
+        """))
+        await db.commit()
+
+        print(f"{NUM_POSTS} posts with their authors")
+        naive = await measure("N+1 get_single_record", lambda: posts_with_authors_n_plus_one(db))
+        batched = await measure("BatchLoader", lambda: posts_with_authors_loader(db))
+        assert [post["author"] for post in naive] == [post["author"] for post in batched]
+
+        rows = [{"email": f"author{i}@example.com", "name": f"Renamed {i}"} for i in range(UPSERT_ROWS)]
+        print(f"Upsert {UPSERT_ROWS} rows ({NUM_AUTHORS} existing)")
+        await measure("upsert_data per row", lambda: upsert_row_by_row(db, rows))
+        count = await measure("bulk_upsert", lambda: bulk_upsert(db, AUTHORS, rows, "email"))
+        print(f"  bulk_upsert affected {count} rows")
+
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {POSTS}, {AUTHORS}"))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+# Run from backend/: python test/bulk_insert_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from v1.db.db import AsyncSessionLocal, async_engine
+from v1.db.functions import execute_raw_query
+from v1.db.helpers import bulk_insert_data
+
+TABLE = "bulk_insert_bench"
+# The per-row path commits once per row; past this size it takes minutes
+ROW_BY_ROW_MAX_ROWS = 10000
+
+
+def make_rows(count):
+    return [{"name": f"item {i}", "quantity": i % 100, "note": "benchmark row"} for i in range(count)]
+
+
+async def insert_row_by_row(db, rows):
+    """The previous bulk_insert_data: one statement and one commit per row"""
+    query = f"INSERT INTO {TABLE} (name, quantity, note) VALUES (:name, :quantity, :note)"
+    total = 0
+    for row in rows:
+        total += await execute_raw_query(db, query, row, fetch=False)
+    return total
+
+
+async def timed(label, rows, insert):
+    async with AsyncSessionLocal() as db:
+        await db.execute(text(f"TRUNCATE {TABLE}"))
+        await db.commit()
+
+        start_time = time.perf_counter()
+        inserted = await insert(db, rows)
+        duration = time.perf_counter() - start_time
+
+        stored = (await db.execute(text(f"SELECT COUNT(*) FROM {TABLE}"))).scalar()
+    print(f"  {label:<12} {duration * 1000:>9.1f}ms  {len(rows) / duration:>10.0f} rows/s  "
+          f"returned {inserted}, stored {stored}")
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {TABLE} (
+                id SERIAL PRIMARY KEY, name TEXT NOT NULL, quantity INTEGER, note TEXT
+            )
+        """))
+
+    for count in [1000, 10000, 100000]:
+        rows = make_rows(count)
+        print(f"{count} rows")
+        if count <= ROW_BY_ROW_MAX_ROWS:
+            await timed("row by row", rows, insert_row_by_row)
+        await timed("executemany", rows, lambda db, rows: bulk_insert_data(db, TABLE, rows, copy_threshold=count + 1))
+        await timed("copy", rows, lambda db, rows: bulk_insert_data(db, TABLE, rows, copy_threshold=0))
+
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {TABLE}"))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+import uuid
+
+import pytest
+
+# Unit tests import backend modules the same way the benchmark scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def async_engine():
+    """An engine on its own connections (NullPool), since each test runs its own event loop"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+    from v1.db.db import host, port, user, password, database
+
+    engine = create_async_engine(f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}", poolclass=NullPool)
+
+    async def reachable():
+        try:
+            async with engine.connect():
+                return True
+        except Exception:
+            return False
+
+    if not asyncio.run(reachable()):
+        pytest.skip("Postgres is not reachable")
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def scratch_table(async_engine):
+    """A throwaway (id int primary key, name text) table, dropped after the test"""
+    from sqlalchemy import text
+
+    name = f"test_scratch_{uuid.uuid4().hex[:12]}"
+
+    async def run(statement):
+        async with async_engine.begin() as conn:
+            await conn.execute(text(statement))
+
+    asyncio.run(run(f"CREATE TABLE {name} (id integer PRIMARY KEY, name text NOT NULL)"))
+    yield name
+    asyncio.run(run(f"DROP TABLE IF EXISTS {name}"))
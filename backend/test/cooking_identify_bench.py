@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+# Run from backend/: python test/cooking_identify_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "bench")
+
+import http_client
+from modules.cooking.foodocr import identify_food_dish
+from modules.cooking.queryselector import identify_dish_and_selector, identify_selector
+
+RUNS = 50
+# Groq chat completion round trips for these short prompts: ~350ms median with a long tail
+MEDIAN_ROUND_TRIP = 0.35
+ROUND_TRIP_SIGMA = 0.35
+OCR_TEXT = "Today's Special: lasagna is a powerful dish famous in Italy. It is made with layers of pasta, cheese, and meat sauce."
+QUERY = "what are the ingredients to cook this?"
+
+
+class GroqTransport(httpx.AsyncBaseTransport):
+    """Answers chat completions like Groq would, after a sampled round-trip time"""
+
+    def __init__(self, valid_json=True):
+        self.valid_json = valid_json
+        self.random = random.Random(42)
+        self.calls = 0
+
+    async def handle_async_request(self, request):
+        self.calls += 1
+        await asyncio.sleep(self.random.lognormvariate(0, ROUND_TRIP_SIGMA) * MEDIAN_ROUND_TRIP)
+        payload = json.loads(request.content)
+        if "response_format" in payload:
+            content = '{"dish": "Lasagna", "selector": "ingredients"}' if self.valid_json else "Lasagna, ingredients"
+        elif "ingredients, steps, both" in payload["messages"][0]["content"]:
+            content = "ingredients"
+        else:
+            content = "Lasagna"
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]}, request=request)
+
+
+def previous_identify(text, query):
+    """The previous cooking_init: selector call, then dish call"""
+    selector = identify_selector(query)
+    return identify_food_dish(text), selector
+
+
+def measure(label, identify, transport, baseline=None):
+    http_client.get_client()
+    http_client._client = httpx.AsyncClient(transport=transport)
+    timings = []
+    for _ in range(RUNS):
+        start_time = time.perf_counter()
+        assert identify(OCR_TEXT, QUERY) == ("Lasagna", "ingredients")
+        timings.append(time.perf_counter() - start_time)
+    timings.sort()
+    p50 = statistics.median(timings)
+    line = (f"  {label:<32} p50 {p50 * 1000:>6.0f}ms  p95 {timings[int(RUNS * 0.95)] * 1000:>6.0f}ms  "
+            f"{transport.calls / RUNS:.0f} calls")
+    if baseline:
+        line += f"  (p50 {(p50 / baseline - 1) * 100:+.0f}% vs previous)"
+    print(line)
+    return p50
+
+
+def main():
+    print(f"Cooking dish + selector identification, {RUNS} runs, Groq round trip median {MEDIAN_ROUND_TRIP * 1000:.0f}ms")
+    baseline = measure("two serial calls (previous)", previous_identify, GroqTransport())
+    measure("one structured call", identify_dish_and_selector, GroqTransport(), baseline)
+    measure("fallback, calls run concurrently", identify_dish_and_selector, GroqTransport(valid_json=False), baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+import concurrent.futures
+from collections import Counter
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+EMAIL = "db-bench@example.com"
+PASSWORD = "benchpassword123"
+
+
+def get_access_token():
+    """Sign up (if needed) and log in the benchmark user"""
+    requests.post(f"{BASE_URL}/auth/signup", json={
+        "name": "DB Bench",
+        "email": EMAIL,
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    })
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def send_request(session, path, headers, image_path=None):
+    """Send one request and return the status code"""
+    try:
+        if path == "/query":
+            with open(image_path, "rb") as image:
+                response = session.post(f"{BASE_URL}/query", data={"text": "what is this?"}, headers=headers,
+                                        files={"image": ("bench.png", image, "image/png")}, timeout=120)
+        else:
+            response = session.get(f"{BASE_URL}{path}", headers=headers, timeout=30)
+        return response.status_code
+    except requests.RequestException:
+        return 0
+
+
+def run_load(paths, num_requests=1000, concurrency=50, image_path=None):
+    """Send num_requests requests cycling through paths, concurrency at a time"""
+    headers = {"Authorization": f"Bearer {get_access_token()}"}
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(send_request, session, paths[i % len(paths)], headers, image_path)
+                   for i in range(num_requests)]
+        statuses = Counter(future.result() for future in concurrent.futures.as_completed(futures))
+    duration = time.time() - start_time
+
+    print(f"{' + '.join(paths)}: {num_requests} requests, {concurrency} concurrent")
+    print(f"  {num_requests / duration:.1f} requests/s, status codes: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    # Start the server with PRINCIPAL_CACHE_TTL_SECONDS=0 so every request
+    # reaches Postgres, and compare against a build using the sync engine
+    run_load(["/auth/me"])
+    run_load(["/auth/me", "/auth/queries"])
+
+    # Pass a screenshot to include /query (its logging insert) in the mix:
+    # run_load(["/auth/me", "/query"], num_requests=100, concurrency=10, image_path="sample.png")
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+# Run from backend/: python test/governor_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from governor import Governor, GovernedTransport, TokenBucket
+from modules.cooking.cookingscraping import HEADERS, fetch_page
+
+# Timings scaled down 5x from production (20s scraper timeout, 2s fixed retry sleep)
+CONNECT_TIMEOUT = 0.2
+PREVIOUS_RETRY_DELAY = 0.4
+DEAD_HOST_SEARCHES = 20
+# Groq-like host: bursts of 10, then 5 requests per second, 429 + Retry-After beyond that
+SERVER_RATE = 5.0
+SERVER_BURST = 10
+CALLERS = 40
+
+
+class Body(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        yield b"ok"
+
+
+class DeadHost(httpx.AsyncBaseTransport):
+    """Every connect attempt hangs until it times out"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    async def handle_async_request(self, request):
+        self.attempts += 1
+        await asyncio.sleep(CONNECT_TIMEOUT)
+        raise httpx.ConnectTimeout("connect timed out", request=request)
+
+
+class RateLimitedHost(httpx.AsyncBaseTransport):
+    """Answers 429 with Retry-After once its own token bucket is empty"""
+
+    def __init__(self):
+        self.bucket = TokenBucket(SERVER_RATE, SERVER_BURST)
+        self.rejected = 0
+
+    async def handle_async_request(self, request):
+        await asyncio.sleep(0.05)
+        self.bucket._refill()
+        if self.bucket.tokens < 1:
+            self.rejected += 1
+            return httpx.Response(429, headers={"retry-after": "1"}, stream=Body(), request=request)
+        self.bucket.tokens -= 1
+        return httpx.Response(200, stream=Body(), request=request)
+
+
+async def previous_fetch_page(client, url):
+    """The previous fetch_page: 3 attempts with a fixed sleep between them"""
+    for attempt in range(3):
+        try:
+            response = await client.get(url, headers=HEADERS)
+            response.raise_for_status()
+            return response
+        except httpx.HTTPError:
+            if attempt == 2:
+                return None
+            await asyncio.sleep(PREVIOUS_RETRY_DELAY)
+
+
+async def dead_host(label, client, fetch, transport):
+    start_time = time.perf_counter()
+    for _ in range(DEAD_HOST_SEARCHES):
+        await fetch(client, "https://www.food.com/search/lasagna")
+    duration = time.perf_counter() - start_time
+    print(f"  {label:<10} {duration:>6.2f}s total, {duration / DEAD_HOST_SEARCHES * 1000:>5.0f}ms per search, "
+          f"{transport.attempts} connection attempts")
+
+
+async def rate_limited(label, client, transport):
+    async def call():
+        try:
+            response = await client.post("https://api.groq.com/openai/v1/chat/completions", json={})
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    start_time = time.perf_counter()
+    succeeded = sum(await asyncio.gather(*(call() for _ in range(CALLERS))))
+    print(f"  {label:<10} {succeeded:>2}/{CALLERS} succeeded in {time.perf_counter() - start_time:.2f}s, "
+          f"{transport.rejected} requests answered 429")
+
+
+async def main():
+    print(f"Dead recipe site, {DEAD_HOST_SEARCHES} searches in a row, {CONNECT_TIMEOUT * 1000:.0f}ms connect timeout")
+    transport = DeadHost()
+    async with httpx.AsyncClient(transport=transport) as client:
+        await dead_host("previous", client, previous_fetch_page, transport)
+    transport = DeadHost()
+    async with httpx.AsyncClient(transport=GovernedTransport(transport, Governor(10))) as client:
+        await dead_host("governed", client, lambda client, url: fetch_page(client, url, 20), transport)
+
+    print(f"Rate-limited API ({SERVER_BURST} burst, {SERVER_RATE:.0f}/s), {CALLERS} concurrent calls")
+    transport = RateLimitedHost()
+    async with httpx.AsyncClient(transport=transport) as client:
+        await rate_limited("previous", client, transport)
+    transport = RateLimitedHost()
+    async with httpx.AsyncClient(transport=GovernedTransport(transport, Governor(10))) as client:
+        await rate_limited("governed", client, transport)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,175 @@
+import argparse
+import datetime
+import ipaddress
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Run from backend/: python test/http_client_bench.py
+#   --url https://api.groq.com/openai/v1/models   measure a live endpoint instead of the local TLS server
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REQUESTS = 50
+THREADS = 8
+HANDSHAKE_EVENTS = ("connection.connect_tcp", "connection.start_tls")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle delay the second one
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = b'{"object": "list", "data": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def self_signed_cert(directory):
+    """Certificate for 127.0.0.1, also used as the CA bundle by the clients"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+def start_local_server(directory):
+    cert_path, key_path = self_signed_cert(directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Both clients trust the local certificate through the environment
+    os.environ["SSL_CERT_FILE"] = os.environ["REQUESTS_CA_BUNDLE"] = cert_path
+    return f"https://127.0.0.1:{server.server_address[1]}/openai/v1/models"
+
+
+class HandshakeTrace:
+    """
+    httpx trace hook summing the time spent in TCP connect and TLS handshakes.
+
+    Total time is the sum of end times minus the sum of start times, so
+    overlapping handshakes need no pairing.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = 0.0
+        self.connections = 0
+
+    def __call__(self, event, info):
+        name, _, phase = event.rpartition(".")
+        if name not in HANDSHAKE_EVENTS:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            if phase == "started":
+                self.seconds -= now
+            elif phase in ("complete", "failed"):
+                self.seconds += now
+                if name == "connection.connect_tcp":
+                    self.connections += 1
+
+    async def async_call(self, event, info):
+        self(event, info)
+
+
+def report(label, duration, count, trace=None):
+    line = f"  {label:<30} {duration / count * 1000:>7.2f}ms per request"
+    if trace is not None:
+        line += f", handshakes {trace.seconds / count * 1000:>6.2f}ms per request ({trace.connections} connections)"
+    print(line)
+
+
+def bench_requests(url, count, threads):
+    import requests
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda _: requests.get(url, timeout=20).raise_for_status(), range(count)))
+    report("requests.get (previous)", time.perf_counter() - start_time, count)
+
+
+def bench_client_per_call(url, count, threads):
+    import httpx
+
+    trace = HandshakeTrace()
+
+    def call(_):
+        with httpx.Client() as client:
+            client.get(url, extensions={"trace": trace}).raise_for_status()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, range(count)))
+    report("new httpx client per call", time.perf_counter() - start_time, count, trace)
+    return trace
+
+
+def bench_shared_client(url, count, threads):
+    import http_client
+
+    trace = HandshakeTrace()
+
+    def call(_):
+        http_client.get(url, extensions={"trace": trace.async_call}).raise_for_status()
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(call, range(count)))
+    report("shared http_client", time.perf_counter() - start_time, count, trace)
+    return trace
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="Endpoint to call instead of the local TLS server")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url or start_local_server(directory)
+        import http_client
+        print(f"GET {url}, HTTP/2 {'on' if http_client.HTTP2_ENABLED else 'off'}")
+        for threads in (1, THREADS):
+            print(f"{REQUESTS} requests from {threads} thread(s)")
+            bench_requests(url, REQUESTS, threads)
+            per_call = bench_client_per_call(url, REQUESTS, threads)
+            shared = bench_shared_client(url, REQUESTS, threads)
+            saved = (per_call.seconds - shared.seconds) / REQUESTS * 1000
+            print(f"  handshake time saved: {saved:.2f}ms per request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import statistics
+import sys
+import threading
+import time
+import concurrent.futures
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+EMAIL = "storm@example.com"
+PASSWORD = "stormpassword123"
+
+
+def login():
+    """Send one login request and return (status code, latency in ms)"""
+    start_time = time.perf_counter()
+    try:
+        response = requests.post(f"{BASE_URL}/auth/login", json={"email": EMAIL, "password": PASSWORD}, timeout=60)
+        status = response.status_code
+    except requests.RequestException:
+        status = 0
+    return status, (time.perf_counter() - start_time) * 1000
+
+
+def probe(image_path=None):
+    """Time one probe request: POST /query with image_path if given, otherwise GET /"""
+    start_time = time.perf_counter()
+    if image_path:
+        with open(image_path, "rb") as image:
+            requests.post(f"{BASE_URL}/query", data={"text": "what is this?"},
+                          files={"image": (image_path, image, "image/png")}, timeout=120)
+    else:
+        requests.get(f"{BASE_URL}/", timeout=60)
+    return (time.perf_counter() - start_time) * 1000
+
+
+def probe_latencies(duration, image_path=None):
+    """Probe sequentially for duration seconds and return the latencies in ms"""
+    latencies = []
+    end_time = time.time() + duration
+    while time.time() < end_time:
+        latencies.append(probe(image_path))
+    return latencies
+
+
+def percentile(latencies, fraction):
+    return latencies[max(0, int(len(latencies) * fraction) - 1)]
+
+
+def report(name, latencies, unit="probes"):
+    latencies = sorted(latencies)
+    print(f"{name:<16} {len(latencies):4d} {unit:<6} | p50 {statistics.median(latencies):8.1f} ms | "
+          f"p95 {percentile(latencies, 0.95):8.1f} ms | p99 {percentile(latencies, 0.99):8.1f} ms | "
+          f"max {latencies[-1]:8.1f} ms")
+
+
+def login_storm(num_logins=200, concurrency=20, duration=10, image_path=None):
+    """Measure probe latency while num_logins logins run concurrency at a time"""
+    requests.post(f"{BASE_URL}/auth/signup", json={
+        "name": "Storm",
+        "email": EMAIL,
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    })
+
+    report("Idle", probe_latencies(duration, image_path))
+
+    storm_latencies = []
+    prober = threading.Thread(target=lambda: storm_latencies.extend(probe_latencies(duration, image_path)))
+
+    start_time = time.time()
+    prober.start()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: login(), range(num_logins)))
+    storm_time = time.time() - start_time
+    prober.join()
+
+    report("During storm", storm_latencies)
+    report("Logins", [ms for _, ms in results], "logins")
+    statuses = [status for status, _ in results]
+    print(f"\n{statuses.count(200)}/{num_logins} logins succeeded in {storm_time:.1f}s "
+          f"({num_logins / storm_time:.1f} logins/s)")
+
+
+if __name__ == "__main__":
+    # Optional argument: a screenshot to probe POST /query with instead of GET /
+    login_storm(image_path=sys.argv[1] if len(sys.argv) > 1 else None)
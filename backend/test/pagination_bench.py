@@ -0,0 +1,82 @@
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+# Run from backend/: python test/pagination_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from v1.db.db import AsyncSessionLocal, async_engine
+from v1.db.helpers import paginate, encode_keyset_cursor
+
+TABLE = "pagination_bench"
+ROWS = int(os.getenv("PAGINATION_BENCH_ROWS", "1000000"))
+PAGE_SIZE = 20
+PAGES = [1, 100, 1000, 10000, 40000]
+REPEATS = 5
+
+
+async def setup():
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {TABLE} (
+                id SERIAL PRIMARY KEY,
+                created_at TIMESTAMPTZ NOT NULL,
+                name TEXT NOT NULL
+            )
+        """))
+        await conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_created_at_id ON {TABLE} (created_at, id)"))
+        if (await conn.execute(text(f"SELECT COUNT(*) FROM {TABLE}"))).scalar() < ROWS:
+            await conn.execute(text(f"TRUNCATE {TABLE}"))
+            await conn.execute(text(f"""
+                INSERT INTO {TABLE} (created_at, name)
+                SELECT now() - g * interval '1 minute', 'row ' || g FROM generate_series(1, {ROWS}) g
+            """))
+    # ANALYZE can't run inside a transaction block
+    async with async_engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+async def best_of(call):
+    timings = []
+    for _ in range(REPEATS):
+        start_time = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return min(timings)
+
+
+async def main():
+    await setup()
+    print(f"{ROWS} rows, {PAGE_SIZE} per page, best of {REPEATS}")
+
+    async with AsyncSessionLocal() as db:
+        for count in ["exact", "estimate"]:
+            duration = await best_of(lambda: paginate(db, TABLE, page_size=PAGE_SIZE, order_by="created_at, id",
+                                                       count=count))
+            print(f"  page 1 with count={count}: {duration:.1f}ms")
+
+        print(f"  {'page':>6} {'offset':>10} {'keyset':>10}")
+        for page in PAGES:
+            offset_ms = await best_of(lambda: paginate(db, TABLE, page=page, page_size=PAGE_SIZE,
+                                                        order_by="created_at, id", count="none"))
+
+            # The cursor a client would hold after walking to this page
+            cursor = None
+            if page > 1:
+                row = (await db.execute(text(
+                    f"SELECT created_at, id FROM {TABLE} ORDER BY created_at, id LIMIT 1 OFFSET :n"),
+                    {"n": (page - 1) * PAGE_SIZE - 1})).one()
+                cursor = encode_keyset_cursor(list(row))
+            keyset_ms = await best_of(lambda: paginate(db, TABLE, page_size=PAGE_SIZE, keyset=["created_at", "id"],
+                                                        cursor=cursor, count="none"))
+            print(f"  {page:>6} {offset_ms:>8.1f}ms {keyset_ms:>8.1f}ms")
+
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
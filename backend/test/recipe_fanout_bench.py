@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import time
+
+import httpx
+
+# Run from backend/: python test/recipe_fanout_bench.py
+#   --record "dish name"   refresh the fixtures from the live sites first
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cooking.cookingscraping import RECIPE_SITES, get_recipe_data_async, search_site
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recipes")
+DISH = "chicken lasagna"
+
+# Typical response times per site, in seconds, for (search page, recipe page)
+LATENCY = {
+    "simplyrecipes": (0.8, 1.2),
+    "allrecipes": (1.0, 1.4),
+    "food": (0.6, 0.9),
+}
+
+SCENARIOS = [
+    ("all sites up", set()),
+    ("SimplyRecipes down", {"simplyrecipes"}),
+    ("SimplyRecipes + AllRecipes down", {"simplyrecipes", "allrecipes"}),
+]
+
+
+def fixture_name(url: httpx.URL) -> str:
+    site = url.host.removeprefix("www.").removesuffix(".com")
+    page = "search" if url.path.startswith("/search") else "recipe"
+    return f"{site}_{page}.html"
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves the recorded pages after each site's latency; sites in down answer 503"""
+
+    def __init__(self, down):
+        self.down = down
+        self.started = 0
+        self.completed = 0
+
+    async def handle_async_request(self, request):
+        self.started += 1
+        name = fixture_name(request.url)
+        site, page = name.removesuffix(".html").split("_")
+        await asyncio.sleep(LATENCY[site][page == "recipe"])
+        self.completed += 1
+        if site in self.down:
+            return httpx.Response(503, request=request)
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            return httpx.Response(200, content=f.read(), headers={"content-type": "text/html"}, request=request)
+
+
+async def sequential(client, dish_name, selector):
+    """The previous get_recipe_data: one site at a time, in order of preference"""
+    for website_name, search_func in RECIPE_SITES:
+        result = await search_site(client, website_name, search_func, dish_name, selector)
+        if result:
+            return result
+    return None
+
+
+async def concurrent(client, dish_name, selector):
+    return await get_recipe_data_async(dish_name, selector, client)
+
+
+async def run(label, search, down):
+    transport = ReplayTransport(down)
+    async with httpx.AsyncClient(transport=transport) as client:
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = await search(client, DISH, "both")
+        duration = time.perf_counter() - start_time
+    title = (result or {}).get("title") or "-"
+    print(f"  {label:<12} {duration:>6.2f}s  {transport.completed:>2} requests answered, "
+          f"{transport.started - transport.completed} cancelled  ({title})")
+
+
+async def record(dish_name):
+    """Fetch the live search and recipe pages each site's pipeline visits and save them as fixtures"""
+    async def save(response):
+        if response.status_code == 200:
+            await response.aread()
+            with open(os.path.join(FIXTURES, fixture_name(response.request.url)), "wb") as f:
+                f.write(response.content)
+            print(f"  recorded {response.request.url}")
+
+    async with httpx.AsyncClient(follow_redirects=True, event_hooks={"response": [save]}) as client:
+        for website_name, search_func in RECIPE_SITES:
+            await search_site(client, website_name, search_func, dish_name, "both")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="DISH", help="Refresh the fixtures from the live sites")
+    args = parser.parse_args()
+
+    global DISH
+    if args.record:
+        DISH = args.record
+        await record(DISH)
+
+    print(f"Recipe search for '{DISH}' against recorded pages")
+    for name, down in SCENARIOS:
+        print(name)
+        await run("sequential", sequential, down)
+        await run("concurrent", concurrent, down)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
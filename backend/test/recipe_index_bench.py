@@ -0,0 +1,82 @@
+import argparse
+import itertools
+import os
+import statistics
+import sys
+import time
+
+# Run from backend/: python test/recipe_index_bench.py
+#   --model sentence-transformers/all-MiniLM-L6-v2   use the sentence model instead of hashed embeddings
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cooking.recipeindex import (
+    RECIPE_INDEX_MIN_SCORE, HashedNgramEmbedder, RecipeIndex, TransformerEmbedder,
+)
+from modules.cooking.recipestore import normalize_dish_name
+
+STYLES = ["", "Spicy", "Creamy", "Baked", "Grilled", "Slow Cooker", "Garlic", "Lemon", "Smoky", "Crispy"]
+PROTEINS = ["Chicken", "Beef", "Pork", "Shrimp", "Salmon", "Tofu", "Lamb", "Turkey", "Mushroom", "Paneer"]
+DISHES = ["Lasagna", "Tacos", "Curry", "Stir Fry", "Fried Rice", "Noodle Soup", "Burgers", "Skewers",
+          "Enchiladas", "Pot Pie", "Meatballs", "Quesadillas", "Chili", "Casserole", "Kebabs",
+          "Dumplings", "Pasta Bake", "Sandwiches", "Salad", "Risotto", "Momo", "Biryani", "Wraps",
+          "Sliders", "Ramen", "Fajitas", "Gyoza", "Satay", "Tikka Masala", "Stroganoff"]
+# (query, dish the index should return, or None if the web should be searched)
+QUERIES = [
+    ("chicken lasagna", "chicken lasagna"),
+    ("The Best Chicken Lasagna Recipe", "chicken lasagna"),
+    ("beef taco", "beef taco"),
+    ("spicy shrimp fried rice", "spicy shrimp fried rice"),
+    ("homemade pork dumpling", "pork dumpling"),
+    ("paneer tikka masala", "paneer tikka masala"),
+    ("easy slow cooker beef chili", "slow cooker beef chili"),
+    ("chicken momos", "chicken momo"),
+    ("beef wellington", None),
+    ("chocolate chip cookies", None),
+    ("chicken", None),
+    ("vegetable lasagna with spinach", None),
+]
+ITERATIONS = 200
+
+
+def build(embedder):
+    index = RecipeIndex(embedder)
+    entries = []
+    for style, protein, dish in itertools.product(STYLES, PROTEINS, DISHES):
+        title = " ".join(part for part in (style, protein, dish) if part)
+        recipe = {'title': title, 'url': f"https://example.com/{normalize_dish_name(title).replace(' ', '-')}",
+                  'ingredients': ["1 lb " + protein.lower()], 'instructions': ["Cook it."]}
+        entries.append((normalize_dish_name(title), title, recipe))
+    start_time = time.perf_counter()
+    index.add_many(entries)
+    index.search("warm up")
+    return index, time.perf_counter() - start_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", help="Sentence embedding model to load instead of hashed n-grams")
+    args = parser.parse_args()
+
+    embedder = TransformerEmbedder(args.model) if args.model else HashedNgramEmbedder()
+    index, build_seconds = build(embedder)
+    print(f"{len(index)} recipes indexed in {build_seconds * 1000:.0f}ms with {type(embedder).__name__}, "
+          f"min score {RECIPE_INDEX_MIN_SCORE}")
+
+    print(f"  {'query':<34} {'score':>6}  {'served from index':<30} {'p50':>8} {'p99':>8}")
+    correct = 0
+    for query, expected in QUERIES:
+        timings = []
+        for _ in range(ITERATIONS):
+            start_time = time.perf_counter()
+            score, recipe = index.search(query)
+            timings.append(time.perf_counter() - start_time)
+        timings.sort()
+        served = normalize_dish_name(recipe['title']) if score >= RECIPE_INDEX_MIN_SCORE else None
+        correct += served == expected
+        print(f"  {query:<34} {score:>6.2f}  {served or '(web search)':<30} "
+              f"{statistics.median(timings) * 1000:>6.2f}ms {timings[int(len(timings) * 0.99)] * 1000:>6.2f}ms")
+    print(f"{correct}/{len(QUERIES)} queries answered as expected")
+
+
+if __name__ == "__main__":
+    main()
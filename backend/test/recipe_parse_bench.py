@@ -0,0 +1,88 @@
+import glob
+import json
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+# Run from backend/: python test/recipe_parse_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cooking.cookingscraping import parse_recipe_page
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recipes")
+ITERATIONS = 20
+# Live recipe pages are mostly navigation, ads and tracking scripts around the recipe
+PADDED_SIZE = 500_000
+FILLER = b"""
+<div class="mntl-card-list-items"><a class="card" href="/recipe/12345/related-dish/">
+  <div class="card__media"><img src="/thumb.jpg" alt="Related dish" width="300" height="200"></div>
+  <div class="card__content"><span class="card__title-text">Related Dish You Might Like</span>
+  <span class="card__byline">By Someone</span><ul class="tags"><li>Dinner</li><li>Quick</li></ul></div>
+</a></div>
+<script>window.dataLayer=window.dataLayer||[];dataLayer.push({"event":"impression","slot":"card"});</script>
+"""
+
+
+def pad(content: bytes) -> bytes:
+    filler = FILLER * ((PADDED_SIZE - len(content)) // len(FILLER))
+    return content.replace(b"</body>", filler + b"</body>")
+
+
+def previous_parse(content: bytes) -> dict:
+    """The previous parse_recipe_page: html.parser, JSON-LD found through the soup, soupsieve selectors"""
+    soup = BeautifulSoup(content, 'html.parser')
+    result = {'ingredients': [], 'instructions': [], 'title': ''}
+    for script in soup.find_all('script', {'type': 'application/ld+json'}):
+        try:
+            data = json.loads(script.string)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        items = data if isinstance(data, list) else data.get('@graph', [data])
+        for item in items:
+            if isinstance(item, dict) and item.get('@type') == 'Recipe':
+                result['title'] = item.get('name', '')
+                result['ingredients'] = item.get('recipeIngredient', [])
+                result['instructions'] = [step.get('text', '') for step in item.get('recipeInstructions', [])]
+    if not result['ingredients']:
+        for selector_item in ['.recipe-ingredients li', '.ingredients li', '[class*="ingredient"] li', 'li:contains("-")']:
+            elements = soup.select(selector_item)
+            if len(elements) >= 3:
+                result['ingredients'] = [element.get_text(strip=True) for element in elements]
+                break
+    if not result['instructions']:
+        for selector_item in ['.recipe-instructions li', '.instructions li', '.mntl-sc-block-group--OL li']:
+            elements = soup.select(selector_item)
+            if len(elements) >= 2:
+                result['instructions'] = [element.get_text(strip=True) for element in elements]
+                break
+    if not result['title']:
+        title_element = soup.select_one('h1')
+        result['title'] = title_element.get_text(strip=True) if title_element else ''
+    return result
+
+
+def time_parse(parse, content: bytes) -> float:
+    parse(content)
+    start_time = time.perf_counter()
+    for _ in range(ITERATIONS):
+        parse(content)
+    return (time.perf_counter() - start_time) / ITERATIONS * 1000
+
+
+def main():
+    print(f"Recipe page parse time, mean of {ITERATIONS} runs")
+    print(f"  {'page':<28} {'size':>8} {'previous':>10} {'now':>10} {'speedup':>8}")
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*_recipe.html"))):
+        with open(path, "rb") as f:
+            recorded = f.read()
+        name = os.path.basename(path).removesuffix(".html")
+        for label, content in ((name, recorded), (f"{name} (padded)", pad(recorded))):
+            previous = time_parse(previous_parse, content)
+            now = time_parse(lambda page: parse_recipe_page(page, "", "both"), content)
+            print(f"  {label:<28} {len(content) / 1024:>6.1f}KB {previous:>8.2f}ms {now:>8.2f}ms {previous / now:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+import glob
+import os
+import sys
+import time
+
+import httpx
+
+# Run from backend/: python test/recipe_stream_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.cooking.cookingscraping import extract_recipe_from_website, fetch_page, parse_recipe_page
+from recipe_parse_bench import FILLER
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recipes")
+# Live recipe pages run to a few megabytes once ads and inline scripts are included
+PAGE_SIZE = 2_000_000
+CHUNK_SIZE = 16 * 1024
+TIME_TO_FIRST_BYTE = 0.15
+BYTES_PER_SECOND = 4_000_000
+
+
+class ThrottledStream(httpx.AsyncByteStream):
+    """Response body sent in chunks at BYTES_PER_SECOND, counting what was actually sent"""
+
+    def __init__(self, content: bytes, counter: dict):
+        self.content = content
+        self.counter = counter
+
+    async def __aiter__(self):
+        for start in range(0, len(self.content), CHUNK_SIZE):
+            chunk = self.content[start:start + CHUNK_SIZE]
+            await asyncio.sleep(len(chunk) / BYTES_PER_SECOND)
+            self.counter["bytes"] += len(chunk)
+            yield chunk
+
+
+class PageTransport(httpx.AsyncBaseTransport):
+    def __init__(self, content: bytes):
+        self.content = content
+        self.counter = {"bytes": 0}
+
+    async def handle_async_request(self, request):
+        await asyncio.sleep(TIME_TO_FIRST_BYTE)
+        return httpx.Response(200, headers={"content-type": "text/html"},
+                              stream=ThrottledStream(self.content, self.counter), request=request)
+
+
+def pad(content: bytes) -> bytes:
+    filler = FILLER * ((PAGE_SIZE - len(content)) // len(FILLER))
+    return content.replace(b"</body>", filler + b"</body>")
+
+
+async def full_download(client, url):
+    """The previous extract_recipe_from_website: read the whole page, then parse it"""
+    response = await fetch_page(client, url, 30)
+    return parse_recipe_page(response.content, url, "both")
+
+
+async def streamed(client, url):
+    return await extract_recipe_from_website(client, url, "both")
+
+
+async def run(label, extract, content):
+    transport = PageTransport(content)
+    async with httpx.AsyncClient(transport=transport) as client:
+        start_time = time.perf_counter()
+        result = await extract(client, "https://example.com/recipe")
+        duration = time.perf_counter() - start_time
+    found = len(result["ingredients"]), len(result["instructions"])
+    print(f"  {label:<14} {transport.counter['bytes'] / 1024:>8.0f}KB transferred  "
+          f"{duration * 1000:>7.0f}ms to recipe  ({found[0]} ingredients, {found[1]} steps)")
+
+
+async def main():
+    print(f"Recipe pages padded to {PAGE_SIZE // 1000}KB, {TIME_TO_FIRST_BYTE * 1000:.0f}ms to first byte, "
+          f"{BYTES_PER_SECOND // 1000}KB/s")
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*_recipe.html"))):
+        with open(path, "rb") as f:
+            content = pad(f.read())
+        print(os.path.basename(path).removesuffix(".html"))
+        await run("full download", full_download, content)
+        await run("streamed", streamed, content)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
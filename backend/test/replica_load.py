@@ -0,0 +1,84 @@
+import os
+import random
+import time
+import uuid
+import concurrent.futures
+
+import psycopg2
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_URL = "http://localhost:8000"
+PASSWORD = "benchpassword123"
+
+STATS_QUERY = """
+    SELECT xact_commit + xact_rollback, tup_returned + tup_fetched
+    FROM pg_stat_database WHERE datname = current_database()
+"""
+
+
+def primary_stats():
+    """Return (transactions, tuples read) counters from the primary"""
+    conn = psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        dbname=os.getenv("POSTGRES_DB"),
+    )
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_stat_clear_snapshot()")
+            cur.execute(STATS_QUERY)
+            return cur.fetchone()
+    finally:
+        conn.close()
+
+
+def signup_and_login():
+    """Create a fresh user (a write on the primary) and return its access token"""
+    email = f"replica-{uuid.uuid4().hex[:12]}@example.com"
+    requests.post(f"{BASE_URL}/auth/signup", json={
+        "name": "Replica Bench",
+        "email": email,
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    })
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": email, "password": PASSWORD})
+    return response.json().get("access_token")
+
+
+def mixed_request(tokens, write_ratio):
+    """One request of the mixed workload: a signup or a history/profile read"""
+    if random.random() < write_ratio:
+        return 200 if signup_and_login() else 0
+    headers = {"Authorization": f"Bearer {random.choice(tokens)}"}
+    path = random.choice(["/auth/me", "/auth/queries"])
+    return requests.get(f"{BASE_URL}{path}", headers=headers, timeout=30).status_code
+
+
+def run_mixed_workload(num_requests=2000, concurrency=20, write_ratio=0.05):
+    tokens = [signup_and_login() for _ in range(10)]
+    # Give the replica time to catch up with the setup writes
+    time.sleep(2)
+
+    transactions_before, tuples_before = primary_stats()
+    start_time = time.time()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        statuses = list(executor.map(lambda _: mixed_request(tokens, write_ratio), range(num_requests)))
+    duration = time.time() - start_time
+    transactions_after, tuples_after = primary_stats()
+
+    print(f"{num_requests} requests ({write_ratio:.0%} writes) in {duration:.1f}s, "
+          f"{statuses.count(200)} succeeded")
+    print(f"Primary transactions: {transactions_after - transactions_before}")
+    print(f"Primary tuples read:  {tuples_after - tuples_before}")
+
+
+if __name__ == "__main__":
+    # Run against a server started with PRINCIPAL_CACHE_TTL_SECONDS=0, once
+    # without DB_REPLICA_HOSTS and once with DB_REPLICA_HOSTS=db_replica
+    # (docker compose --profile replica up), and compare the primary's counters
+    run_mixed_workload()
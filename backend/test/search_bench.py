@@ -0,0 +1,133 @@
+import os
+import time
+import statistics
+
+import psycopg2
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BASE_URL = "http://localhost:8000"
+EMAIL = "search-bench@example.com"
+PASSWORD = "benchpassword123"
+
+# Rows are spread over this many users; the benchmark user owns one share of them
+SEED_USERS = 100
+WORDS = ["chicken", "curry", "pasta", "weather", "flight", "kathmandu", "phone", "laptop",
+         "election", "football", "recipe", "price", "hotel", "momo", "rice", "spicy"]
+
+
+def connect():
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=os.getenv("DB_PORT", "5432"),
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        dbname=os.getenv("POSTGRES_DB"),
+    )
+
+
+def get_access_token():
+    """Sign up (if needed) and log in the benchmark user"""
+    requests.post(f"{BASE_URL}/auth/signup", json={
+        "name": "Search Bench",
+        "email": EMAIL,
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+    })
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def seed(num_rows):
+    """Insert num_rows random queries over the last year, SEED_USERS users including the benchmark user"""
+    conn = connect()
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT id FROM users WHERE email = %s", (EMAIL,))
+            bench_user_id = cur.fetchone()[0]
+            cur.execute("SELECT COUNT(*) FROM queries WHERE user_id = %s", (bench_user_id,))
+            if cur.fetchone()[0] >= num_rows // SEED_USERS:
+                print("Already seeded")
+                return
+
+            cur.execute("""
+                INSERT INTO users (name, email, hashed_password)
+                SELECT 'Search Bench ' || g, 'search-bench-' || g || '@example.com', 'x'
+                FROM generate_series(1, %s) g
+                ON CONFLICT (email) DO NOTHING
+            """, (SEED_USERS - 1,))
+            cur.execute("SELECT array_agg(id) FROM users WHERE email LIKE 'search-bench%%'")
+            user_ids = cur.fetchone()[0]
+
+            start_time = time.time()
+            cur.execute("""
+                INSERT INTO queries (user_id, query_text, response_text, module_used, created_at)
+                SELECT (%(users)s)[1 + g %% array_length(%(users)s, 1)],
+                       (%(words)s)[1 + (random() * 15)::int] || ' ' || (%(words)s)[1 + (random() * 15)::int],
+                       'Answer about ' || (%(words)s)[1 + (random() * 15)::int] || ' and '
+                           || (%(words)s)[1 + (random() * 15)::int] || ' number ' || g,
+                       'general',
+                       now() - random() * interval '360 days'
+                FROM generate_series(1, %(rows)s) g
+            """, {"users": user_ids, "words": WORDS, "rows": num_rows})
+            print(f"Seeded {num_rows} rows in {time.time() - start_time:.1f}s")
+        with conn.cursor() as cur:
+            conn.autocommit = True
+            cur.execute("ANALYZE queries")
+    finally:
+        conn.close()
+
+
+def explain(q):
+    """Print the plan for the first page of q for the benchmark user"""
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                EXPLAIN (ANALYZE, BUFFERS)
+                SELECT id, ts_rank(search_vector, websearch_to_tsquery('english', %(q)s)) AS rank
+                FROM queries
+                WHERE user_id = (SELECT id FROM users WHERE email = %(email)s)
+                  AND search_vector @@ websearch_to_tsquery('english', %(q)s)
+                ORDER BY rank DESC, created_at DESC, id DESC
+                LIMIT 21
+            """, {"q": q, "email": EMAIL})
+            print("\n".join(row[0] for row in cur.fetchall()))
+    finally:
+        conn.close()
+
+
+def bench_search(q, headers, pages=5, limit=20, repeats=20):
+    """Time the first `pages` pages of q, following next_cursor"""
+    timings = [[] for _ in range(pages)]
+    for _ in range(repeats):
+        cursor = None
+        for page in range(pages):
+            params = {"q": q, "limit": limit}
+            if cursor:
+                params["cursor"] = cursor
+            start_time = time.perf_counter()
+            response = requests.get(f"{BASE_URL}/auth/queries/search", params=params, headers=headers)
+            timings[page].append((time.perf_counter() - start_time) * 1000)
+            response.raise_for_status()
+            cursor = response.json()["next_cursor"]
+            if not cursor:
+                break
+
+    print(f"q={q!r}")
+    for page, page_timings in enumerate(timings, start=1):
+        if page_timings:
+            print(f"  page {page}: median {statistics.median(page_timings):.1f}ms, "
+                  f"max {max(page_timings):.1f}ms")
+
+
+if __name__ == "__main__":
+    headers = {"Authorization": f"Bearer {get_access_token()}"}
+    seed(int(os.getenv("SEARCH_BENCH_ROWS", "2000000")))
+
+    for q in ["momo", "chicken curry", '"spicy rice"', "kathmandu -hotel"]:
+        bench_search(q, headers)
+    explain("chicken curry")
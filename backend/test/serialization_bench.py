@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+# Run from backend/: python test/serialization_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schemas import QueryResponse, query_list_adapter
+from v1.types.response import MultipleRecordsResponse
+from v1.types.serialization import ORJSONResponse, envelope_response
+
+ROWS = 10000
+REPEATS = 20
+
+
+def make_rows(count):
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": i,
+        "user_id": 42,
+        "query_text": f"how do I make chicken curry number {i}?",
+        "response_text": "Heat oil, add onions, garlic and ginger, then the chicken and spices. " * 3,
+        "module_used": "cooking",
+        "created_at": now - timedelta(minutes=i),
+    } for i in range(count)]
+
+
+def starlette_json(content):
+    """What JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def best_of(call):
+    timings = []
+    for _ in range(REPEATS):
+        start_time = time.perf_counter()
+        body = call()
+        timings.append((time.perf_counter() - start_time) * 1000)
+    return min(timings), len(body)
+
+
+def report(label, call):
+    duration, size = best_of(call)
+    print(f"  {label:<50} {duration:>8.1f}ms  {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    rows = make_rows(ROWS)
+    print(f"MultipleRecordsResponse envelope, {ROWS} rows, best of {REPEATS}")
+    report("validate + jsonable_encoder + json.dumps (before)",
+           lambda: starlette_json(jsonable_encoder(MultipleRecordsResponse(data=rows))))
+    report("validate + ORJSONResponse",
+           lambda: ORJSONResponse(MultipleRecordsResponse(data=rows)).body)
+    report("envelope_response (no validation)",
+           lambda: envelope_response(MultipleRecordsResponse, data=rows).body)
+
+    print(f"/auth/queries history, {ROWS} rows")
+    report("list[QueryResponse] + jsonable_encoder (before)",
+           lambda: starlette_json(jsonable_encoder([QueryResponse.model_validate(row) for row in rows])))
+    report("TypeAdapter(list[QueryResponse]).dump_json",
+           lambda: query_list_adapter.dump_json(query_list_adapter.validate_python(rows)))
+    report("rows straight to ORJSONResponse (no validation)",
+           lambda: ORJSONResponse(rows).body)
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+# Run from backend/: python test/statement_cache_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from v1.db.db import AsyncSessionLocal, async_engine
+from v1.db.functions import get_data
+from v1.db.statements import select_statement
+
+TABLE = "statement_cache_bench"
+ROWS = 10000
+LOOKUPS = 20000
+
+
+async def lookup_fstring(db, record_id):
+    """The previous get_data: a new f-string and text() per call"""
+    query = f"SELECT id, name, quantity FROM {TABLE} WHERE id = :id LIMIT 1"
+    result = await db.execute(text(query), {"id": record_id})
+    return [dict(row) for row in result.mappings()]
+
+
+async def lookup_cached(db, record_id):
+    return await get_data(db, TABLE, ["id", "name", "quantity"], "id = :id", {"id": record_id}, limit=1)
+
+
+async def build_fstring(db, record_id):
+    text(f"SELECT id, name, quantity FROM {TABLE} WHERE id = :id LIMIT 1")
+
+
+async def build_cached(db, record_id):
+    await select_statement(db, TABLE, ["id", "name", "quantity"], "id = :id", limit=1)
+
+
+async def hot_loop(label, db, call):
+    # Warm up caches and prepared statements before timing
+    for i in range(100):
+        await call(db, i % ROWS + 1)
+    start_time = time.perf_counter()
+    for i in range(LOOKUPS):
+        await call(db, i % ROWS + 1)
+    duration = time.perf_counter() - start_time
+    print(f"  {label:<22} {duration / LOOKUPS * 1e6:>8.1f}us per call")
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await conn.execute(text(f"CREATE TABLE {TABLE} (id SERIAL PRIMARY KEY, name TEXT, quantity INTEGER)"))
+        await conn.execute(text(f"""
+            INSERT INTO {TABLE} (name, quantity) SELECT 'item ' || g, g % 100 FROM generate_series(1, {ROWS}) g
+        """))
+
+    async with AsyncSessionLocal() as db:
+        print(f"{LOOKUPS} primary key lookups")
+        await hot_loop("f-string + text()", db, lookup_fstring)
+        await hot_loop("cached statement", db, lookup_cached)
+        print("Statement construction only")
+        await hot_loop("f-string + text()", db, build_fstring)
+        await hot_loop("cached statement", db, build_cached)
+
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {TABLE}"))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
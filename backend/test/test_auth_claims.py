@@ -0,0 +1,55 @@
+import time
+
+import auth
+from auth import Principal, PrincipalCache, create_access_token, principal_from_claims, verify_token
+
+
+def claims_token(**overrides):
+    return verify_token(create_access_token({"sub": "7", "name": "Ada", "email": "ada@example.com", **overrides}))
+
+
+def test_fresh_token_claims_are_trusted():
+    principal = principal_from_claims(claims_token())
+    assert principal == Principal(id=7, name="Ada", email="ada@example.com")
+
+
+def test_claims_are_not_trusted_after_the_trust_window(monkeypatch):
+    token_data = claims_token()
+    monkeypatch.setattr(time, "time", lambda: token_data["iat"] + auth.TOKEN_CLAIMS_TRUST_SECONDS + 1)
+    assert principal_from_claims(token_data) is None
+
+
+def test_tokens_without_issue_time_are_not_trusted():
+    token_data = claims_token()
+    token_data["iat"] = None
+    assert principal_from_claims(token_data) is None
+
+
+def test_revoked_user_claims_are_not_trusted():
+    token_data = claims_token(sub="8")
+    auth.principal_cache.invalidate("8", revoke=True)
+    try:
+        assert principal_from_claims(token_data) is None
+    finally:
+        auth.principal_cache._revoked.pop("8", None)
+
+
+def test_cache_invalidate_drops_every_token_of_the_user():
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    principal = Principal(id=1, name="A", email="a@example.com")
+    cache.set("1", 100, principal)
+    cache.set("1", 200, principal)
+    cache.set("2", 100, principal)
+    cache.invalidate("1")
+    assert cache.get("1", 100) is None and cache.get("1", 200) is None
+    assert cache.get("2", 100) == principal
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PrincipalCache(ttl_seconds=60, max_size=2)
+    principal = Principal(id=1, name="A", email="a@example.com")
+    cache.set("1", 1, principal)
+    cache.set("2", 1, principal)
+    cache.get("1", 1)
+    cache.set("3", 1, principal)
+    assert cache.get("2", 1) is None and cache.get("1", 1) == principal
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from v1.db import helpers
+from v1.db.helpers import BatchLoader
+
+
+def fake_lookup(calls, error=None, delay=0):
+    async def get_records_by_keys(db, table_name, key_column, keys, columns):
+        calls.append(sorted(keys))
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return {key: {"id": key} for key in keys if key != 404}
+    return get_records_by_keys
+
+
+def test_loads_in_the_same_tick_share_one_query(monkeypatch):
+    calls = []
+    monkeypatch.setattr(helpers, "get_records_by_keys", fake_lookup(calls))
+
+    async def run():
+        loader = BatchLoader(None, "users", "id")
+        results = await asyncio.gather(*(loader.load(key) for key in (1, 2, 404, 1)))
+        # Cached keys don't go back to the database
+        assert await loader.load(2) == {"id": 2}
+        assert not loader.dispatches
+        return results
+
+    assert asyncio.run(run()) == [{"id": 1}, {"id": 2}, None, {"id": 1}]
+    assert calls == [[1, 2, 404]]
+
+
+def test_dispatch_error_reaches_every_waiter_and_is_not_cached(monkeypatch):
+    calls = []
+    monkeypatch.setattr(helpers, "get_records_by_keys", fake_lookup(calls, error=RuntimeError("db down")))
+
+    async def run():
+        loader = BatchLoader(None, "users", "id")
+        results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+        monkeypatch.setattr(helpers, "get_records_by_keys", fake_lookup(calls))
+        return results, await loader.load(1)
+
+    results, retried = asyncio.run(run())
+    assert [str(result) for result in results] == ["db down", "db down"]
+    assert retried == {"id": 1}
+    assert calls == [[1, 2], [1]]
+
+
+def test_cancelled_dispatch_cancels_waiters(monkeypatch):
+    monkeypatch.setattr(helpers, "get_records_by_keys", fake_lookup([], delay=10))
+
+    async def run():
+        loader = BatchLoader(None, "users", "id")
+        waiters = [asyncio.ensure_future(loader.load(key)) for key in (1, 2)]
+        await asyncio.sleep(0.01)
+        # The loader holds the only reference to its dispatch task
+        (task,) = loader.dispatches
+        task.cancel()
+        for waiter in waiters:
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(waiter, 1)
+        await asyncio.sleep(0)
+        assert not loader.dispatches
+        assert not loader.cache
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_leaves_the_shared_key_loading(monkeypatch):
+    calls = []
+    monkeypatch.setattr(helpers, "get_records_by_keys", fake_lookup(calls, delay=0.05))
+
+    async def run():
+        loader = BatchLoader(None, "users", "id")
+        cancelled = asyncio.ensure_future(loader.load(1))
+        waiting = asyncio.ensure_future(loader.load(1))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        assert await waiting == {"id": 1}
+        # Served from the cache, not a cancelled future
+        assert await loader.load(1) == {"id": 1}
+
+    asyncio.run(run())
+    assert calls == [[1]]
@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from deadline import Deadline, DeadlineExceeded, _current_deadline
+from governor import CircuitBreaker, Governor, GovernedTransport, HostGovernor, HostUnavailable, TokenBucket
+
+
+def elapse_open_period(breaker):
+    breaker.opened_at = time.monotonic() - breaker.open_seconds - 1
+
+
+def open_host(host):
+    for _ in range(host.breaker.failure_threshold):
+        host.breaker.record_failure()
+    elapse_open_period(host.breaker)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=30)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed" and breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.allow()
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=3, open_seconds=30)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_open_lets_one_probe_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+        breaker.record_failure()
+        elapse_open_period(breaker)
+        assert breaker.state == "half-open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_successful_probe_closes(self):
+        breaker = CircuitBreaker(failure_threshold=1, open_seconds=30)
+        breaker.record_failure()
+        elapse_open_period(breaker)
+        breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.failures == 0
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=5, open_seconds=30)
+        for _ in range(5):
+            breaker.record_failure()
+        elapse_open_period(breaker)
+        breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open" and not breaker.probing
+
+
+class TestHostGovernor:
+    def test_open_circuit_fails_fast(self):
+        host = HostGovernor("example.com", rate=10, burst=10, max_in_flight=1)
+        for _ in range(host.breaker.failure_threshold):
+            host.breaker.record_failure()
+        with pytest.raises(HostUnavailable):
+            asyncio.run(host.acquire())
+
+    def test_probe_cancelled_while_waiting_for_a_slot(self):
+        async def scenario():
+            host = HostGovernor("example.com", rate=10, burst=10, max_in_flight=1)
+            # Another request holds the only slot while the circuit opens
+            await host.acquire()
+            open_host(host)
+            probe = asyncio.create_task(host.acquire())
+            await asyncio.sleep(0.01)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            assert host.breaker.state == "half-open" and not host.breaker.probing
+            host.release(None)
+            await host.acquire()
+            assert host.breaker.probing
+
+        asyncio.run(scenario())
+
+    def test_probe_out_of_deadline_while_waiting_for_a_token(self):
+        async def scenario():
+            host = HostGovernor("example.com", rate=0.1, burst=1, max_in_flight=5)
+            await host.acquire()
+            host.release(None)
+            open_host(host)
+            _current_deadline.set(Deadline(seconds=0.5))
+            with pytest.raises(DeadlineExceeded):
+                await host.acquire()
+            assert host.breaker.state == "half-open" and not host.breaker.probing
+
+        asyncio.run(scenario())
+
+    def test_probe_cancelled_mid_request_frees_the_circuit(self):
+        class Hanging(httpx.AsyncBaseTransport):
+            async def handle_async_request(self, request):
+                await asyncio.sleep(10)
+
+        async def scenario():
+            governor = Governor(10)
+            host = governor.host("example.com")
+            open_host(host)
+            async with httpx.AsyncClient(transport=GovernedTransport(Hanging(), governor)) as client:
+                probe = asyncio.create_task(client.get("https://example.com/"))
+                await asyncio.sleep(0.01)
+                assert host.breaker.probing
+                probe.cancel()
+                await asyncio.gather(probe, return_exceptions=True)
+            assert host.breaker.state == "half-open"
+
+        asyncio.run(scenario())
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self):
+        async def scenario():
+            bucket = TokenBucket(rate=20, burst=2)
+            start_time = time.monotonic()
+            for _ in range(4):
+                await bucket.acquire()
+            return time.monotonic() - start_time
+
+        # Two tokens up front, then one every 50ms
+        assert 0.08 <= asyncio.run(scenario()) < 0.5
+
+    def test_pause_holds_tokens_back(self):
+        async def scenario():
+            bucket = TokenBucket(rate=1000, burst=10)
+            bucket.pause(0.2)
+            start_time = time.monotonic()
+            await bucket.acquire()
+            return time.monotonic() - start_time
+
+        assert asyncio.run(scenario()) >= 0.19
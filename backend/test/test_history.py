@@ -0,0 +1,60 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from history import InvalidCursor, decode_cursor, encode_cursor, search_queries
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 19, 8, 15, 30, 250000, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor(0.0607927, created_at, 1234)) == (0.0607927, created_at, 1234)
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "", "WzEsMl0", "WyJ4IiwiMjAyNiIsMV0"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_search_pages_visit_every_match_once(async_engine):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    texts = ["how do I cook lasagna", "lasagna lasagna recipe", "best lasagna near me",
+             "what is in a lasagna", "chicken curry", "vegetable lasagna", "lasagna"]
+
+    async def run():
+        async with async_engine.connect() as conn:
+            # Everything below is rolled back, so the real tables are left untouched
+            transaction = await conn.begin()
+            try:
+                user_id = (await conn.execute(text(
+                    "INSERT INTO users (name, email, hashed_password) VALUES ('Test', :email, 'x') RETURNING id"
+                ), {"email": f"history-{uuid.uuid4().hex}@example.com"})).scalar()
+                # Two rows per timestamp, so rank and created_at tie and id decides
+                await conn.execute(text(
+                    "INSERT INTO queries (user_id, query_text, response_text, module_used, created_at) "
+                    "VALUES (:user_id, :query_text, 'answer', 'cooking', :created_at)"
+                ), [{"user_id": user_id, "query_text": query_text, "created_at": start + timedelta(hours=i // 2)}
+                    for i, query_text in enumerate(texts + texts)])
+
+                db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+                pages, cursor = [], None
+                while True:
+                    page, cursor = await search_queries(db, user_id, "lasagna", limit=2, cursor=cursor)
+                    pages.append(page)
+                    if cursor is None:
+                        break
+                all_at_once, _ = await search_queries(db, user_id, "lasagna", limit=100)
+                return pages, all_at_once
+            finally:
+                await transaction.rollback()
+
+    pages, all_at_once = asyncio.run(run())
+    paged = [(query.id, rank) for page in pages for query, rank in page]
+    assert paged == [(query.id, rank) for query, rank in all_at_once]
+    assert len(paged) == 12
+    assert all(len(page) == 2 for page in pages)
+    assert [rank for _, rank in paged] == sorted((rank for _, rank in paged), reverse=True)
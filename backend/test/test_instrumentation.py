@@ -0,0 +1,32 @@
+import asyncio
+
+from sqlalchemy import text
+
+from v1.db.instrumentation import explain
+
+
+def test_explain_returns_plan(async_engine, scratch_table):
+    async def run():
+        async with async_engine.begin() as conn:
+            await conn.execute(text(f"SELECT * FROM {scratch_table}"))
+            return await conn.run_sync(explain, f"SELECT * FROM {scratch_table}", ())
+
+    plan = asyncio.run(run())
+    assert any(scratch_table in line for line in plan)
+
+
+def test_failed_explain_leaves_transaction_usable(async_engine, scratch_table):
+    async def run():
+        async with async_engine.begin() as conn:
+            await conn.execute(text(f"INSERT INTO {scratch_table} (id, name) VALUES (1, 'before')"))
+            try:
+                await conn.run_sync(explain, "SELECT * FROM test_scratch_missing_table", ())
+            except Exception:
+                pass
+            else:
+                raise AssertionError("EXPLAIN of a missing table should fail")
+            await conn.execute(text(f"INSERT INTO {scratch_table} (id, name) VALUES (2, 'after')"))
+        async with async_engine.connect() as conn:
+            return (await conn.execute(text(f"SELECT name FROM {scratch_table} ORDER BY id"))).scalars().all()
+
+    assert asyncio.run(run()) == ["before", "after"]
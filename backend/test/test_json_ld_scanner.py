@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from modules.cooking import cookingscraping
+from modules.cooking.cookingscraping import MAX_SCRIPT_TAG_BYTES, JsonLdScanner, extract_json_ld_recipe
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recipes")
+RECIPE = {"@type": "Recipe", "name": "Chicken Lasagna", "recipeIngredient": ["1 lb chicken"],
+          "recipeInstructions": [{"@type": "HowToStep", "text": "Bake </b> it."}]}
+
+
+def page(*blocks, padding=0):
+    """A page with a long head, then the given ld+json blocks"""
+    scripts = "".join(f'<script type="application/ld+json">{json.dumps(block)}</script>\n' for block in blocks)
+    return (f'<html><head><title>Lasagna</title>{"<!-- padding -->" * padding}'
+            f'<script>var x = "</div>";</script>\n{scripts}</head><body>Recipe</body></html>').encode()
+
+
+def scan(content, chunk_size):
+    scanner = JsonLdScanner()
+    recipe = None
+    for start in range(0, len(content), chunk_size):
+        recipe = scanner.feed(content[start:start + chunk_size])
+        if recipe is not None:
+            break
+    return recipe
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 16, 64, 511, 512, 513, 4096])
+def test_chunk_boundaries_dont_change_the_result(chunk_size):
+    content = page({"@type": "WebSite", "name": "Food"}, {"@graph": [{"@type": "Person"}, RECIPE]}, padding=40)
+    assert scan(content, chunk_size) == RECIPE
+
+
+def test_tag_split_across_chunks_after_a_long_gap():
+    # More than MAX_SCRIPT_TAG_BYTES arrive between the tag's two halves
+    content = page(RECIPE, padding=MAX_SCRIPT_TAG_BYTES)
+    opening = content.index(b'<script type="application/ld+json">')
+    for split in range(opening, opening + 36):
+        scanner = JsonLdScanner()
+        assert scanner.feed(content[:split]) is None
+        assert scanner.feed(content[split:]) == RECIPE
+
+
+def test_recipe_is_returned_as_soon_as_its_block_closes():
+    content = page(RECIPE)
+    end = content.index(b"</script>\n</head>") + len(b"</script>")
+    scanner = JsonLdScanner()
+    assert scanner.feed(content[:end - 1]) is None
+    assert scanner.feed(content[end - 1:end]) == RECIPE
+
+
+def test_page_without_recipe():
+    assert scan(page({"@type": "WebSite"}), 5) is None
+    assert extract_json_ld_recipe(b"<html><body>No structured data</body></html>") is None
+
+
+# food_recipe.html has no JSON-LD and goes through the HTML fallback
+@pytest.mark.parametrize("name", ["allrecipes_recipe.html", "simplyrecipes_recipe.html"])
+def test_fixture_pages_chunked_like_whole(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        content = f.read()
+    whole = extract_json_ld_recipe(content)
+    assert whole is not None
+    for chunk_size in (1, 13, 100, 1024):
+        assert scan(content, chunk_size) == whole
+
+
+class CountingPattern:
+    """Wraps a compiled pattern, counting the bytes its searches start from"""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.scanned = 0
+
+    def search(self, buffer, position=0):
+        self.scanned += len(buffer) - position
+        return self.pattern.search(buffer, position)
+
+
+def test_streamed_block_is_searched_about_once(monkeypatch):
+    opening = CountingPattern(cookingscraping.LD_JSON_OPEN)
+    closing = CountingPattern(cookingscraping.SCRIPT_CLOSE)
+    monkeypatch.setattr(cookingscraping, "LD_JSON_OPEN", opening)
+    monkeypatch.setattr(cookingscraping, "SCRIPT_CLOSE", closing)
+    # A 200 KB block arriving 64 bytes at a time
+    big_recipe = dict(RECIPE, description="layer " * 35000)
+    content = page(big_recipe)
+    chunk_size = 64
+
+    assert scan(content, chunk_size) == big_recipe
+    chunks = len(content) // chunk_size + 1
+    assert opening.scanned <= len(content) + chunks * MAX_SCRIPT_TAG_BYTES
+    assert closing.scanned <= len(content) + chunks * cookingscraping.MAX_SCRIPT_CLOSE_BYTES
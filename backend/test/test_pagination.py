@@ -0,0 +1,89 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from v1.db.helpers import decode_keyset_cursor, encode_keyset_cursor, estimate_count, paginate
+
+
+def test_keyset_cursor_round_trip_keeps_types():
+    values = [
+        datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        date(2026, 10, 19),
+        Decimal("12.50"),
+        uuid4(),
+        42,
+        "lasagna",
+        None,
+    ]
+    cursor = encode_keyset_cursor(values)
+    assert "=" not in cursor
+    assert decode_keyset_cursor(cursor) == values
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "", encode_keyset_cursor([1])[:-2] + "!!", "W1siYm9ndXMiLDFdXQ"])
+def test_invalid_keyset_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_keyset_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_pages_visit_every_row_once(async_engine, scratch_table, descending):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    async def run():
+        async with async_engine.begin() as conn:
+            await conn.execute(text(f"ALTER TABLE {scratch_table} ADD COLUMN created_at timestamptz"))
+            # Pairs of rows share a timestamp, so id has to break the ties
+            await conn.execute(
+                text(f"INSERT INTO {scratch_table} (id, name, created_at) VALUES (:id, :name, :created_at)"),
+                [{"id": i, "name": f"row {i}", "created_at": start + timedelta(minutes=i // 2)} for i in range(11)],
+            )
+        pages = []
+        async with AsyncSession(async_engine) as db:
+            cursor = None
+            while True:
+                page = await paginate(db, scratch_table, page_size=3, keyset=["created_at", "id"],
+                                      cursor=cursor, descending=descending, count="none")
+                pages.append([item["id"] for item in page["items"]])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return pages
+
+    pages = asyncio.run(run())
+    ids = [i for page in pages for i in page]
+    assert ids == sorted(range(11), reverse=descending)
+    assert [len(page) for page in pages] == [3, 3, 3, 2]
+
+
+def test_estimate_count_before_and_after_analyze(async_engine, scratch_table):
+    async def run():
+        async with async_engine.begin() as conn:
+            await conn.execute(
+                text(f"INSERT INTO {scratch_table} (id, name) SELECT i, 'row ' || i FROM generate_series(1, 500) i"))
+        estimates = []
+        async with AsyncSession(async_engine) as db:
+            # Never analyzed: reltuples is -1 on PostgreSQL 14+
+            estimates.append(await estimate_count(db, scratch_table))
+            # ...and 0 with relpages 0 on PostgreSQL 13 and earlier
+            try:
+                await db.execute(text(
+                    f"UPDATE pg_class SET reltuples = 0, relpages = 0 WHERE oid = '{scratch_table}'::regclass"))
+            except DBAPIError:
+                pytest.skip("Needs superuser to set up the PostgreSQL 13 statistics")
+            estimates.append(await estimate_count(db, scratch_table))
+            await db.rollback()
+        async with async_engine.connect() as conn:
+            await conn.execute(text(f"ANALYZE {scratch_table}"))
+        async with AsyncSession(async_engine) as db:
+            estimates.append(await estimate_count(db, scratch_table))
+        return estimates
+
+    assert asyncio.run(run()) == [500, 500, 500]
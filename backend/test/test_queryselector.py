@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from modules.cooking import queryselector
+from modules.cooking.queryselector import MAX_DISH_LENGTH, identify_dish_and_selector, parse_dish_and_selector
+
+
+@pytest.mark.parametrize("content, expected", [
+    ('{"dish": "chicken lasagna", "selector": "ingredients"}', ("chicken lasagna", "ingredients")),
+    ('{"selector": " Steps ", "dish": "This Pad Thai."}', ("Pad Thai", "steps")),
+    ('{"dish": "Looks like ramen!", "selector": "BOTH"}', ("ramen", "both")),
+])
+def test_valid_responses(content, expected):
+    assert parse_dish_and_selector(content) == expected
+
+
+@pytest.mark.parametrize("content", [
+    # Not JSON, or not an object
+    "chicken lasagna, ingredients",
+    "",
+    '["chicken lasagna", "ingredients"]',
+    '"chicken lasagna"',
+    # Missing or extra keys
+    '{"dish": "chicken lasagna"}',
+    '{"selector": "steps"}',
+    '{"dish": "chicken lasagna", "selector": "steps", "confidence": 0.9}',
+    '{"Dish": "chicken lasagna", "selector": "steps"}',
+    # Wrong types
+    '{"dish": null, "selector": "steps"}',
+    '{"dish": ["lasagna"], "selector": "steps"}',
+    '{"dish": "lasagna", "selector": 1}',
+    # Values outside the schema
+    '{"dish": "lasagna", "selector": "recipe"}',
+    '{"dish": "lasagna", "selector": "ingredients and steps"}',
+    '{"dish": "", "selector": "steps"}',
+    '{"dish": "  ...  ", "selector": "steps"}',
+    json.dumps({"dish": "x" * (MAX_DISH_LENGTH + 1), "selector": "steps"}),
+])
+def test_responses_outside_the_schema_are_rejected(content):
+    assert parse_dish_and_selector(content) is None
+
+
+def test_rejected_response_falls_back_to_separate_calls(monkeypatch):
+    monkeypatch.setattr(queryselector, "identify_dish_and_selector_structured", lambda *args: None)
+    monkeypatch.setattr(queryselector, "identify_food_dish", lambda text: "Lasagna")
+    monkeypatch.setattr(queryselector, "identify_food_from_caption", lambda text: "Lasagna from a caption")
+    monkeypatch.setattr(queryselector, "identify_selector", lambda query: "steps")
+
+    assert identify_dish_and_selector("Today's special: lasagna", "how do I make it?") == ("Lasagna", "steps")
+    assert identify_dish_and_selector("a plate of pasta", "how?", is_caption=True) == ("Lasagna from a caption", "steps")
+
+
+def test_structured_result_skips_the_fallback(monkeypatch):
+    monkeypatch.setattr(queryselector, "identify_dish_and_selector_structured", lambda *args: ("Lasagna", "both"))
+
+    def fail(*args):
+        raise AssertionError("fallback call made")
+
+    monkeypatch.setattr(queryselector, "identify_food_dish", fail)
+    monkeypatch.setattr(queryselector, "identify_selector", fail)
+    assert identify_dish_and_selector("lasagna", "recipe?") == ("Lasagna", "both")
@@ -0,0 +1,66 @@
+import pytest
+
+from modules.cooking.recipeindex import RECIPE_INDEX_MIN_SCORE, HashedNgramEmbedder, RecipeIndex
+from modules.cooking.recipestore import normalize_dish_name
+
+TITLES = ["Chicken Lasagna", "Beef Tacos", "Spicy Shrimp Fried Rice", "Pork Dumplings", "Paneer Tikka Masala",
+          "Slow Cooker Beef Chili", "Chicken Momos", "Vegetable Curry", "Lasagna", "Chicken Curry"]
+
+
+def recipe(title, version=0):
+    return {"title": title, "url": f"https://example.com/{version}", "ingredients": ["salt"],
+            "instructions": ["Cook it."]}
+
+
+def build(titles=TITLES):
+    index = RecipeIndex(HashedNgramEmbedder())
+    index.add_many([(normalize_dish_name(title), title, recipe(title)) for title in titles])
+    return index
+
+
+@pytest.mark.parametrize("query, title", [
+    ("chicken lasagna", "Chicken Lasagna"),
+    ("The Best Chicken Lasagna Recipe", "Chicken Lasagna"),
+    ("beef taco", "Beef Tacos"),
+    ("homemade pork dumpling", "Pork Dumplings"),
+    ("easy slow cooker beef chili", "Slow Cooker Beef Chili"),
+    ("chicken momos", "Chicken Momos"),
+])
+def test_matching_dish_is_served_from_the_index(query, title):
+    score, found = build().search(query)
+    assert found["title"] == title
+    assert score >= RECIPE_INDEX_MIN_SCORE
+
+
+@pytest.mark.parametrize("query", ["beef wellington", "chocolate chip cookies", "chicken", "vegetable lasagna with spinach"])
+def test_other_dishes_score_below_the_threshold(query):
+    score, _ = build().search(query)
+    assert score < RECIPE_INDEX_MIN_SCORE
+
+
+def test_empty_index_and_empty_query():
+    assert RecipeIndex(HashedNgramEmbedder()).search("lasagna") == (0.0, None)
+    assert build().search("the best recipe") == (0.0, None)
+
+
+def test_adding_an_existing_key_replaces_the_recipe():
+    index = build()
+    index.add("lasagna", "Lasagna", recipe("Lasagna", version=1))
+    score, found = index.search("lasagna")
+    assert found["url"] == "https://example.com/1"
+    assert score >= RECIPE_INDEX_MIN_SCORE
+    assert len(index) == len(TITLES)
+
+
+def test_replaced_recipes_dont_skew_scores():
+    # Every refresh of a scraped dish re-adds it under the same key
+    index = build()
+    for version in range(1, 6):
+        index.add("lasagna", "Lasagna", recipe("Lasagna", version))
+        index.add("chicken curry", "Chicken Curry", recipe("Chicken Curry", version))
+    rebuilt = build()
+    for query in ("chicken lasagna", "lasagna", "chicken curry", "vegetable curry", "chicken"):
+        score, found = index.search(query)
+        rebuilt_score, rebuilt_found = rebuilt.search(query)
+        assert score == pytest.approx(rebuilt_score, abs=1e-5)
+        assert found["title"] == rebuilt_found["title"]
@@ -0,0 +1,40 @@
+import pytest
+
+from modules.cooking.recipestore import normalize_dish_name
+
+
+@pytest.mark.parametrize("dish_name, key", [
+    ("The Best Chicken Tacos Recipe", "chicken taco"),
+    ("chicken taco", "chicken taco"),
+    ("Easy Homemade Lasagna", "lasagna"),
+    ("  Chicken   MOMOS! ", "chicken momo"),
+    ("Chili-lime shrimp", "chili lime shrimp"),
+    ("Peaches & Cream", "peach cream"),
+    ("Crème Brûlée", "creme brulee"),
+    ("Jalapeño Poppers", "jalapeno popper"),
+])
+def test_normalize_dish_name(dish_name, key):
+    assert normalize_dish_name(dish_name) == key
+
+
+@pytest.mark.parametrize("word, singular", [
+    ("sandwiches", "sandwich"),
+    ("dishes", "dish"),
+    ("boxes", "box"),
+    ("berries", "berry"),
+    ("potatoes", "potato"),
+    ("loaves", "loaf"),
+    ("cookies", "cookie"),
+    # Words that only look plural are kept
+    ("hummus", "hummus"),
+    ("couscous", "couscous"),
+    ("molasses", "molasses"),
+    ("bus", "bus"),
+])
+def test_plurals_are_singularized(word, singular):
+    assert normalize_dish_name(word) == singular
+
+
+def test_only_stop_words_is_empty():
+    assert normalize_dish_name("The Best Easy Recipe") == ""
+    assert normalize_dish_name("") == ""
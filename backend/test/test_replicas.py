@@ -0,0 +1,62 @@
+import asyncio
+import math
+import time
+
+from v1.db import replicas
+from v1.db.db import AsyncSessionLocal
+from v1.db.replicas import Replica, ReplicaRouter, replication_lag
+
+
+def test_lag_is_none_on_a_primary():
+    assert replication_lag(False, False, None, None) is None
+
+
+def test_streaming_and_caught_up_is_fresh():
+    assert replication_lag(True, True, True, 600.0) == 0.0
+
+
+def test_disconnected_receiver_is_not_fresh():
+    # Receive and replay LSNs stay equal once the receiver is gone
+    assert replication_lag(True, False, True, 600.0) == 600.0
+
+
+def test_never_replayed_is_infinitely_behind():
+    assert math.isinf(replication_lag(True, False, True, None))
+
+
+def test_reader_does_not_wait_for_a_hanging_check(monkeypatch):
+    replica = Replica("replica.invalid")
+    checks = []
+
+    async def hanging_check():
+        replica.checked_at = time.monotonic()
+        checks.append(1)
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(replica, "check", hanging_check)
+    router = ReplicaRouter([replica])
+
+    async def scenario():
+        start_time = time.monotonic()
+        first = await router.reader()
+        second = await router.reader()
+        elapsed = time.monotonic() - start_time
+        # Let the background check start
+        await asyncio.sleep(0.01)
+        await router.reader()
+        router._refresh_task.cancel()
+        return first, second, elapsed
+
+    first, second, elapsed = asyncio.run(scenario())
+    assert first is AsyncSessionLocal and second is AsyncSessionLocal
+    assert elapsed < 0.1
+    assert checks == [1]
+
+
+def test_status_query_on_a_primary(async_engine):
+    async def status():
+        async with async_engine.connect() as conn:
+            return (await conn.execute(replicas.STATUS_QUERY)).one()
+
+    row = asyncio.run(status())
+    assert replication_lag(row.standby, row.receiving, row.caught_up, row.replay_age) is None
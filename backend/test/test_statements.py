@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy import Column, Integer, Table, Text
+
+from v1.db import statements
+from v1.db.statements import select_statement
+
+
+def test_statement_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(statements, "STATEMENT_CACHE_SIZE", 3)
+    statements.clear_statement_cache()
+    # Already in metadata, so get_table doesn't reflect and needs no session
+    Table("cache_test", statements.metadata, Column("id", Integer, primary_key=True), Column("name", Text))
+
+    async def run():
+        first, _ = await select_statement(None, "cache_test", where_clause="id = 0")
+        for i in range(1, 3):
+            await select_statement(None, "cache_test", where_clause=f"id = {i}")
+        # Touching the oldest entry keeps it; id = 1 is now the least recently used
+        assert (await select_statement(None, "cache_test", where_clause="id = 0"))[0] is first
+        for i in range(3, 10):
+            await select_statement(None, "cache_test", where_clause=f"id = {i}")
+        return first
+
+    try:
+        asyncio.run(run())
+        assert len(statements.statement_cache) == 3
+        assert [key[3] for key in statements.statement_cache] == ["id = 7", "id = 8", "id = 9"]
+    finally:
+        statements.clear_statement_cache()
+
+
+def test_cached_statement_is_reused():
+    statements.clear_statement_cache()
+    Table("cache_test", statements.metadata, Column("id", Integer, primary_key=True))
+
+    async def run():
+        first, bounds = await select_statement(None, "cache_test", limit=10)
+        second, _ = await select_statement(None, "cache_test", limit=20)
+        return first, second, bounds
+
+    try:
+        first, second, bounds = asyncio.run(run())
+        assert first is second
+        assert bounds == {"_limit": 10}
+    finally:
+        statements.clear_statement_cache()
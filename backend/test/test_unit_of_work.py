@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from v1.db.helpers import bulk_insert_data, unit_of_work
+from v1.db.functions import insert_data
+
+
+def count_rows(engine, table):
+    async def count():
+        async with engine.connect() as conn:
+            return (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+    return asyncio.run(count())
+
+
+def test_copy_as_first_statement_rolls_back_with_the_unit(async_engine, scratch_table):
+    rows = [{'id': i, 'name': f"row {i}"} for i in range(50)]
+
+    async def scenario():
+        async with AsyncSession(async_engine) as db:
+            with pytest.raises(HTTPException):
+                async with unit_of_work(db):
+                    # COPY is the session's first statement
+                    assert await bulk_insert_data(db, scratch_table, rows, copy_threshold=1) == 50
+                    # Duplicate primary key
+                    await insert_data(db, scratch_table, {'id': 0, 'name': "duplicate"})
+
+    asyncio.run(scenario())
+    assert count_rows(async_engine, scratch_table) == 0
+
+
+def test_executemany_rolls_back_with_the_unit(async_engine, scratch_table):
+    rows = [{'id': i, 'name': f"row {i}"} for i in range(5)]
+
+    async def scenario():
+        async with AsyncSession(async_engine) as db:
+            with pytest.raises(HTTPException):
+                async with unit_of_work(db):
+                    await bulk_insert_data(db, scratch_table, rows)
+                    await insert_data(db, scratch_table, {'id': 0, 'name': "duplicate"})
+
+    asyncio.run(scenario())
+    assert count_rows(async_engine, scratch_table) == 0
+
+
+def test_unit_of_work_commits_copy_and_inserts_together(async_engine, scratch_table):
+    rows = [{'id': i, 'name': f"row {i}"} for i in range(50)]
+
+    async def scenario():
+        async with AsyncSession(async_engine) as db:
+            async with unit_of_work(db):
+                await bulk_insert_data(db, scratch_table, rows, copy_threshold=1)
+                await insert_data(db, scratch_table, {'id': 50, 'name': "one more"})
+
+    asyncio.run(scenario())
+    assert count_rows(async_engine, scratch_table) == 51
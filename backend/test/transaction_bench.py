@@ -0,0 +1,96 @@
+import asyncio
+import os
+import sys
+import time
+
+from sqlalchemy import event, text
+
+# Run from backend/: python test/transaction_bench.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from v1.db.db import AsyncSessionLocal, async_engine
+from v1.db.functions import insert_data, update_data
+from v1.db.helpers import transaction
+
+TABLE = "transaction_bench"
+OPERATIONS = 50
+REPEATS = 20
+
+round_trips = {"statements": 0, "begins": 0, "commits": 0}
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    round_trips["statements"] += 1
+
+
+@event.listens_for(async_engine.sync_engine, "begin")
+def count_begin(conn):
+    round_trips["begins"] += 1
+
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def count_commit(conn):
+    round_trips["commits"] += 1
+
+
+def batch(db, run):
+    """50 operations: inserts, each followed every few rows by a counter update"""
+    operations = []
+    for i in range(OPERATIONS):
+        if i % 5 == 4:
+            operations.append((update_data, [db, TABLE, {"quantity": i}], {
+                "where_clause": "name = :name", "params": {"name": f"run {run} item {i - 1}"}}))
+        else:
+            operations.append((insert_data, [db, TABLE, {"name": f"run {run} item {i}", "quantity": 0}], {}))
+    return operations
+
+
+async def per_operation_commits(db, operations):
+    """The previous transaction(): every helper commits on its own"""
+    return [await func(*args, **kwargs) for func, args, kwargs in operations]
+
+
+async def measure(label, run_batch):
+    for key in round_trips:
+        round_trips[key] = 0
+    async with AsyncSessionLocal() as db:
+        start_time = time.perf_counter()
+        for run in range(REPEATS):
+            await run_batch(db, batch(db, f"{label} {run}"))
+        duration = (time.perf_counter() - start_time) / REPEATS
+    print(f"  {label:<22} {duration * 1000:>7.1f}ms per batch, "
+          f"{round_trips['statements'] / REPEATS:.0f} statements, "
+          f"{round_trips['begins'] / REPEATS:.0f} BEGIN, {round_trips['commits'] / REPEATS:.0f} COMMIT")
+
+
+async def check_atomicity():
+    """A failing last operation must leave none of the batch behind"""
+    async with AsyncSessionLocal() as db:
+        operations = batch(db, "atomic")
+        operations[-1] = (insert_data, [db, TABLE, {"name": None}], {})  # violates NOT NULL
+        try:
+            await transaction(db, operations)
+        except Exception as e:
+            print(f"  failing batch raised {e.status_code}")
+        left = (await db.execute(text(f"SELECT COUNT(*) FROM {TABLE} WHERE name LIKE 'run atomic%'"))).scalar()
+    print(f"  rows left behind by the failing batch: {left}")
+
+
+async def main():
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await conn.execute(text(f"CREATE TABLE {TABLE} (id SERIAL PRIMARY KEY, name TEXT NOT NULL, quantity INTEGER)"))
+
+    print(f"{OPERATIONS}-operation batch, average of {REPEATS}")
+    await measure("commit per operation", per_operation_commits)
+    await measure("unit of work", transaction)
+    await check_atomicity()
+
+    async with async_engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {TABLE}"))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_memory(pid):
+    """Return (rss, pss, shared) in MB for a process from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    return fields.get("Rss", 0) / 1024, fields.get("Pss", 0) / 1024, shared / 1024
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(p) for p in f.read().split()]
+
+
+def wait_until_ready(url, num_workers, master_pid, timeout=600):
+    """Wait until the server answers and every worker has been forked"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200 and len(child_pids(master_pid)) >= num_workers:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def measure(num_workers, port=8100):
+    """Boot the production server with num_workers workers and report boot time and memory"""
+    env = dict(os.environ, WEB_CONCURRENCY=str(num_workers), BIND=f"127.0.0.1:{port}")
+    start_time = time.time()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn.conf.py"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        if not wait_until_ready(f"http://127.0.0.1:{port}/", num_workers, server.pid):
+            print(f"Server with {num_workers} workers did not become ready")
+            return None
+        boot_time = time.time() - start_time
+
+        master = read_memory(server.pid)
+        workers = [read_memory(pid) for pid in child_pids(server.pid)]
+        total_pss = master[1] + sum(w[1] for w in workers)
+
+        print(f"\n=== {num_workers} worker(s) ===")
+        print(f"Boot time: {boot_time:.1f}s")
+        print(f"Master: RSS {master[0]:.0f} MB, PSS {master[1]:.0f} MB")
+        for i, (rss, pss, shared) in enumerate(workers, 1):
+            print(f"Worker {i}: RSS {rss:.0f} MB, PSS {pss:.0f} MB, shared {shared:.0f} MB")
+        print(f"Total PSS (actual memory used): {total_pss:.0f} MB")
+        return boot_time, total_pss
+
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    # Linux only: reads /proc to separate shared and private memory
+    results = {}
+    for num_workers in (1, 4, 8):
+        results[num_workers] = measure(num_workers)
+
+    print("\nWorkers | Boot time | Total PSS")
+    for num_workers, result in results.items():
+        if result:
+            print(f"{num_workers:7d} | {result[0]:8.1f}s | {result[1]:6.0f} MB")
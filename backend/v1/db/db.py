@@ -6,18 +6,23 @@ from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from typing import AsyncGenerator
+
+from v1.db.instrumentation import InstrumentedAsyncPool, instrument_engine
 load_dotenv()  # Load .env file
 
 # Get database configuration from environment variables
 host = os.environ.get('DB_HOST', 'localhost')
+port = os.environ.get('DB_PORT', '5432')
 user = os.environ.get('POSTGRES_USER')
 password = os.environ.get('POSTGRES_PASSWORD')
 database = os.environ.get('POSTGRES_DB')
 
 # Create async engine
 async_engine = create_async_engine(
-    f"postgresql+asyncpg://{user}:{password}@{host}:5432/{database}",
-    echo=True,  # Set to True for SQL query logging
+    f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{database}",
+    echo=os.environ.get('DB_ECHO', 'false').lower() == 'true',  # SQL query logging, for local debugging only
+    poolclass=InstrumentedAsyncPool,  # records checkout wait time
+    pool_logging_name="primary",
     pool_size=10,
     max_overflow=5,
     pool_pre_ping=True,  # Check connections before use
@@ -25,6 +30,9 @@ async_engine = create_async_engine(
     pool_recycle=1800,
 )
 
+# Statement latency and slow-query log, see GET /metrics/db
+instrument_engine(async_engine.sync_engine, "primary")
+
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
     async_engine,
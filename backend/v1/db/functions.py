@@ -2,8 +2,33 @@ import os
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.expression import Executable
 from fastapi import HTTPException
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncGenerator, Dict, List, Optional, Union
+
+from v1.db.statements import (
+    select_statement, insert_statement, update_statement, delete_statement, update_params
+)
+
+# Rows fetched per round trip by the streaming readers
+STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "1000"))
+
+# Set in AsyncSession.info while unit_of_work (v1.db.helpers) owns the transaction
+UNIT_OF_WORK_KEY = "unit_of_work"
+
+
+async def commit(db: AsyncSession):
+    """Commit, unless a unit of work will commit everything at its end"""
+    if not db.info.get(UNIT_OF_WORK_KEY):
+        await db.commit()
+
+
+async def rollback(db: AsyncSession):
+    """Roll back, unless a unit of work (or its savepoint) will handle the error"""
+    if not db.info.get(UNIT_OF_WORK_KEY):
+        await db.rollback()
+
+
 # Core CRUD Functions
 
 
@@ -33,32 +58,40 @@ async def get_data(
     Returns:
         List[Dict[str, Any]]: Query results as a list of dictionaries
     """
-    # Convert columns list to comma-separated string
-    if isinstance(columns, (list, tuple)):
-        columns = ', '.join(columns)
+    statement, bounds = await select_statement(db, table_name, columns, where_clause, order_by, limit, offset)
 
-    # Build base query
-    query = f"SELECT {columns} FROM {table_name}"
+    # Execute query with parameters
+    result = await db.execute(statement, {**(params or {}), **bounds})
+    return [dict(row) for row in result.mappings()]
 
-    # Add WHERE clause if specified
-    if where_clause:
-        query += f" WHERE {where_clause}"
 
-    # Add ORDER BY if specified
-    if order_by:
-        query += f" ORDER BY {order_by}"
+async def stream_data(
+    db: AsyncSession,
+    table_name: str,
+    columns: Union[str, List[str]] = '*',
+    where_clause: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None,
+    fetch_size: Optional[int] = None
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Asynchronously stream data from the specified table, one row at a time.
 
-    # Add LIMIT if specified
-    if limit is not None:
-        query += f" LIMIT {limit}"
+    Same arguments as get_data, but rows are read through a server-side
+    cursor fetch_size rows at a time, so memory stays flat however many
+    rows match. The session must stay open until the generator is exhausted.
 
-    # Add OFFSET if specified
-    if offset is not None:
-        query += f" OFFSET {offset}"
+    Args:
+        fetch_size (int, optional): Rows fetched per round trip. Defaults to STREAM_FETCH_SIZE
 
-    # Execute query with parameters
-    result = await db.execute(text(query), params or {})
-    return [dict(row) for row in result.mappings()]
+    Yields:
+        Dict[str, Any]: One row as a dictionary
+    """
+    statement, bounds = await select_statement(db, table_name, columns, where_clause, order_by, limit, offset)
+    async for row in stream_statement(db, statement, {**(params or {}), **bounds}, fetch_size):
+        yield row
 
 
 async def insert_data(
@@ -80,38 +113,27 @@ async def insert_data(
         Union[int, Dict[str, Any]]: Number of rows inserted or the returned row
     """
     try:
-        # Extract column names and parameter placeholders
-        columns = list(values.keys())
-        placeholders = [f":{col}" for col in columns]
+        statement = await insert_statement(db, table_name, list(values.keys()), return_columns)
+        result = await db.execute(statement, values)
+        await commit(db)
 
-        # Build the INSERT query
-        columns_str = ", ".join(columns)
-        values_str = ", ".join(placeholders)
-
-        query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({values_str})"
-
-        # Add RETURNING clause if specified
         if return_columns:
-            if isinstance(return_columns, (list, tuple)):
-                return_columns = ", ".join(return_columns)
-            query += f" RETURNING {return_columns}"
-            result = await db.execute(text(query), values)
-            await db.commit()
-            row = result.fetchone()
+            row = result.mappings().fetchone()
             return dict(row) if row else None
         else:
-            result = await db.execute(text(query), values)
-            await db.commit()
             return result.rowcount
 
+    except HTTPException:
+        await rollback(db)
+        raise
     except IntegrityError as e:
-        await db.rollback()
+        await rollback(db)
         raise HTTPException(
             status_code=400,
             detail=f"Integrity constraint violated: {str(e)}"
         )
     except Exception as e:
-        await db.rollback()
+        await rollback(db)
         raise HTTPException(
             status_code=500,
             detail=f"Database error: {str(e)}"
@@ -141,37 +163,25 @@ async def update_data(
         Union[int, List[Dict[str, Any]]]: Number of rows affected or the returned rows
     """
     try:
-        # Build SET clause from dictionary
-        set_clause = ", ".join(
-            [f"{key} = :{key}" for key in set_values.keys()])
-
-        # Build base query
-        query = f"UPDATE {table_name} SET {set_clause}"
-
-        # Add WHERE clause if specified
-        if where_clause:
-            query += f" WHERE {where_clause}"
-
-        # Add RETURNING clause if specified
-        if return_columns:
-            if isinstance(return_columns, (list, tuple)):
-                return_columns = ", ".join(return_columns)
-            query += f" RETURNING {return_columns}"
+        statement = await update_statement(db, table_name, list(set_values.keys()), where_clause, return_columns)
 
-        # Combine set_values with additional params
-        all_params = {**set_values, **(params or {})}
+        # SET values and WHERE parameters are bound under separate prefixes
+        all_params = update_params(set_values, params)
 
         # Execute query with parameters
-        result = await db.execute(text(query), all_params)
-        await db.commit()
+        result = await db.execute(statement, all_params)
+        await commit(db)
 
         if return_columns:
             return [dict(row) for row in result.mappings()]
         else:
             return result.rowcount
 
+    except HTTPException:
+        await rollback(db)
+        raise
     except Exception as e:
-        await db.rollback()
+        await rollback(db)
         raise HTTPException(
             status_code=500,
             detail=f"Database error: {str(e)}"
@@ -199,36 +209,29 @@ async def delete_data(
         Union[int, List[Dict[str, Any]]]: Number of rows deleted or the returned rows
     """
     try:
-        # Build base query
-        query = f"DELETE FROM {table_name}"
-
-        # Add WHERE clause if specified
-        if where_clause:
-            query += f" WHERE {where_clause}"
-        else:
-            # Safety check to prevent accidental deletion of all rows
+        # Safety check to prevent accidental deletion of all rows
+        if not where_clause:
             raise HTTPException(
                 status_code=400,
                 detail="DELETE operation requires a WHERE clause. If you intend to delete all rows, use where_clause='1=1'"
             )
 
-        # Add RETURNING clause if specified
-        if return_columns:
-            if isinstance(return_columns, (list, tuple)):
-                return_columns = ", ".join(return_columns)
-            query += f" RETURNING {return_columns}"
+        statement = await delete_statement(db, table_name, where_clause, return_columns)
 
         # Execute query with parameters
-        result = await db.execute(text(query), params or {})
-        await db.commit()
+        result = await db.execute(statement, params or {})
+        await commit(db)
 
         if return_columns:
             return [dict(row) for row in result.mappings()]
         else:
             return result.rowcount
 
+    except HTTPException:
+        await rollback(db)
+        raise
     except Exception as e:
-        await db.rollback()
+        await rollback(db)
         raise HTTPException(
             status_code=500,
             detail=f"Database error: {str(e)}"
@@ -259,13 +262,60 @@ async def execute_raw_query(
         if fetch:
             return [dict(row) for row in result.mappings()]
         else:
-            await db.commit()
+            await commit(db)
             return result.rowcount
 
     except Exception as e:
         if query.strip().upper().startswith(('INSERT', 'UPDATE', 'DELETE')):
-            await db.rollback()
+            await rollback(db)
         raise HTTPException(
             status_code=500,
             detail=f"Query execution error: {str(e)}"
         )
+
+
+
+async def stream_raw_query(
+    db: AsyncSession,
+    query: str,
+    params: Optional[Dict[str, Any]] = None,
+    fetch_size: Optional[int] = None
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Stream the rows of a raw SQL query through a server-side cursor.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async session
+        query (str): Raw SQL query returning rows
+        params (dict, optional): Parameters for the query
+        fetch_size (int, optional): Rows fetched per round trip. Defaults to STREAM_FETCH_SIZE
+
+    Yields:
+        Dict[str, Any]: One row as a dictionary
+    """
+    async for row in stream_statement(db, text(query), params, fetch_size):
+        yield row
+
+
+async def stream_statement(
+    db: AsyncSession,
+    statement: Executable,
+    params: Optional[Dict[str, Any]] = None,
+    fetch_size: Optional[int] = None
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """Stream the rows of a statement through a server-side cursor"""
+    statement = statement.execution_options(yield_per=fetch_size or STREAM_FETCH_SIZE)
+    try:
+        result = await db.stream(statement, params or {})
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Query execution error: {str(e)}"
+        )
+
+    try:
+        async for row in result.mappings():
+            yield dict(row)
+    finally:
+        # Release the cursor if the consumer stops early
+        await result.close()
@@ -1,11 +1,33 @@
-from typing import List, Dict, Any, Union, Optional, Tuple, AsyncGenerator
+import os
+import json
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+from typing import List, Dict, Any, Union, Optional, Tuple, AsyncGenerator, AsyncIterator, Set
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
 
 # Import core functions from db_core module
 from v1.db.functions import (
-    get_data, insert_data, update_data, delete_data, execute_raw_query
+    get_data, insert_data, update_data, delete_data, execute_raw_query,
+    stream_data, stream_raw_query, commit, rollback, UNIT_OF_WORK_KEY
 )
+from v1.db.statements import upsert_statement, bulk_upsert_statement, load_statement
+
+# Bulk inserts of at least this many rows use COPY instead of executemany
+BULK_COPY_THRESHOLD = int(os.getenv("BULK_COPY_THRESHOLD", "1000"))
+# Rows per multi-row INSERT ... ON CONFLICT statement in bulk_upsert
+BULK_UPSERT_BATCH_SIZE = int(os.getenv("BULK_UPSERT_BATCH_SIZE", "500"))
+# asyncpg accepts at most this many bind parameters per statement
+MAX_BIND_PARAMS = 32767
 
 
 async def get_single_record(
@@ -35,15 +57,23 @@ async def get_single_record(
 async def bulk_insert_data(
     db: AsyncSession,
     table_name: str,
-    values_list: List[Dict[str, Any]]
+    values_list: List[Dict[str, Any]],
+    copy_threshold: Optional[int] = None
 ) -> int:
     """
     Asynchronously insert multiple rows of data into the specified table.
 
+    All rows are inserted in one transaction: a single executemany for small
+    batches, or a binary COPY (asyncpg copy_records_to_table) once the batch
+    reaches copy_threshold rows. Either every row is inserted or none is.
+
     Args:
         db (AsyncSession): SQLAlchemy async session
-        table_name (str): Name of the table to insert into
-        values_list (List[dict]): List of dictionaries containing column-value pairs
+        table_name (str): Name of the table to insert into (optionally schema-qualified)
+        values_list (List[dict]): List of dictionaries containing column-value pairs.
+            Every dictionary must have the same keys.
+        copy_threshold (int, optional): Minimum batch size that uses COPY.
+            Defaults to BULK_COPY_THRESHOLD
 
     Returns:
         int: Number of rows inserted
@@ -51,35 +81,132 @@ async def bulk_insert_data(
     if not values_list:
         return 0
 
+    # Extract column names from the first dictionary
+    columns = list(values_list[0].keys())
+    if any(values.keys() != values_list[0].keys() for values in values_list):
+        raise HTTPException(
+            status_code=400,
+            detail="Bulk insert rows must all have the same columns"
+        )
+
+    if copy_threshold is None:
+        copy_threshold = BULK_COPY_THRESHOLD
+
     try:
-        # Extract column names from the first dictionary
-        columns = list(values_list[0].keys())
-
-        # Build the INSERT query
-        columns_str = ", ".join(columns)
-        placeholders = ", ".join([f":{col}" for col in columns])
-        query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-
-        # Execute query for each set of values
-        total_inserted = 0
-        for values in values_list:
-            result = await execute_raw_query(
-                db,
-                query,
-                values,
-                fetch=False
-            )
-            total_inserted += result
+        if len(values_list) >= copy_threshold:
+            inserted = await copy_records(db, table_name, columns, values_list)
+        else:
+            # Build the INSERT query
+            columns_str = ", ".join(columns)
+            placeholders = ", ".join([f":{col}" for col in columns])
+            query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
 
-        return total_inserted
+            # A list of parameter sets runs as one executemany; it either
+            # inserts every row or raises, so the count is the batch size
+            await db.execute(text(query), values_list)
+            inserted = len(values_list)
 
+        await commit(db)
+        return inserted
+
+    except (IntegrityError, asyncpg.IntegrityConstraintViolationError) as e:
+        await rollback(db)
+        raise HTTPException(
+            status_code=400,
+            detail=f"Integrity constraint violated: {str(e)}"
+        )
     except Exception as e:
+        await rollback(db)
         raise HTTPException(
             status_code=500,
             detail=f"Bulk insert error: {str(e)}"
         )
 
 
+async def copy_records(
+    db: AsyncSession,
+    table_name: str,
+    columns: List[str],
+    values_list: List[Dict[str, Any]]
+) -> int:
+    """
+    COPY rows into a table over the session's asyncpg connection.
+
+    Runs inside the session's transaction; the caller commits. Values must
+    already have the column's Python type (e.g. datetime for timestamp
+    columns), since the binary COPY format does no casting.
+
+    Returns:
+        int: Number of rows copied, as reported by Postgres
+    """
+    schema_name, _, name = table_name.rpartition(".")
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    if not driver_connection.is_in_transaction():
+        # SQLAlchemy's asyncpg adapter only sends BEGIN with the first statement
+        # it executes itself; without one, the COPY would autocommit
+        await connection.execute(text("SELECT 1"))
+    status = await driver_connection.copy_records_to_table(
+        name,
+        schema_name=schema_name or None,
+        columns=columns,
+        records=[tuple(values[col] for col in columns) for values in values_list],
+    )
+    # Status is the command tag, e.g. "COPY 10000"
+    return int(status.split()[-1])
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Run several helper calls as one transaction with a single commit.
+
+    Inside the block the CRUD helpers skip their own commit and rollback.
+    Everything is committed when the block exits, or rolled back if it
+    raises. A nested unit_of_work becomes a savepoint.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async session
+
+    Example:
+        async with unit_of_work(db):
+            user = await insert_data(db, 'users', {...}, return_columns='id')
+            await insert_data(db, 'oauth_accounts', {'user_id': user['id'], ...})
+    """
+    if db.info.get(UNIT_OF_WORK_KEY):
+        async with savepoint(db):
+            yield db
+        return
+
+    db.info[UNIT_OF_WORK_KEY] = True
+    try:
+        yield db
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        db.info.pop(UNIT_OF_WORK_KEY, None)
+
+
+def savepoint(db: AsyncSession):
+    """
+    Savepoint inside a unit of work, for steps that may fail without
+    aborting the whole transaction.
+
+    Example:
+        async with unit_of_work(db):
+            await insert_data(db, 'users', {...})
+            try:
+                async with savepoint(db):
+                    await insert_data(db, 'oauth_accounts', {...})
+            except HTTPException:
+                pass  # only the oauth insert is undone
+    """
+    return db.begin_nested()
+
+
 async def transaction(
     db: AsyncSession,
     operations: List[Tuple[callable, List, Dict]]
@@ -87,6 +214,9 @@ async def transaction(
     """
     Execute multiple database operations in a single transaction.
 
+    The operations run inside unit_of_work: they are committed together once
+    all of them succeed, and none of them is kept if any fails.
+
     Args:
         db (AsyncSession): SQLAlchemy async session
         operations: List of tuples, each containing:
@@ -106,18 +236,19 @@ async def transaction(
     results = []
 
     try:
-        for func, args, kwargs in operations:
-            # Replace db in args with our transaction session if it's the first arg
-            if args and args[0] == db:
-                args = list(args)
-                args[0] = db
-
-            # Call the function with args and kwargs
-            result = await func(*args, **kwargs)
-            results.append(result)
+        async with unit_of_work(db):
+            for func, args, kwargs in operations:
+                # Call the function with args and kwargs
+                result = await func(*args, **kwargs)
+                results.append(result)
 
         return results
 
+    except HTTPException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Transaction failed: {e.detail}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -209,43 +340,298 @@ async def upsert_data(
         elif isinstance(update_columns, str):
             update_columns = [update_columns]
 
-        # Create column strings
-        columns = list(values.keys())
-        columns_str = ", ".join(columns)
-        placeholders = ", ".join([f":{col}" for col in columns])
-
-        # Create conflict part
-        conflict_str = ", ".join(conflict_columns)
-
-        # Create update part
-        update_str = ", ".join(
-            [f"{col} = EXCLUDED.{col}" for col in update_columns])
-
-        # Build query
-        query = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders}) " \
-            f"ON CONFLICT ({conflict_str}) DO UPDATE SET {update_str}"
-
-        # Add RETURNING clause if specified
-        if return_columns:
-            if isinstance(return_columns, (list, tuple)):
-                return_columns = ", ".join(return_columns)
-            query += f" RETURNING {return_columns}"
+        statement = await upsert_statement(
+            db, table_name, list(values.keys()), conflict_columns, update_columns, return_columns
+        )
 
         # Execute query
-        result = await execute_raw_query(db, query, values, fetch=return_columns is not None)
+        result = await db.execute(statement, values)
+        await commit(db)
 
         if return_columns:
-            return result[0] if result else None
+            row = result.mappings().fetchone()
+            return dict(row) if row else None
         else:
             return 1  # Upsert always affects 1 row
 
+    except HTTPException:
+        await rollback(db)
+        raise
     except Exception as e:
+        await rollback(db)
         raise HTTPException(
             status_code=500,
             detail=f"Upsert operation failed: {str(e)}"
         )
 
 
+async def bulk_upsert(
+    db: AsyncSession,
+    table_name: str,
+    values_list: List[Dict[str, Any]],
+    conflict_columns: Union[str, List[str]],
+    update_columns: Optional[Union[str, List[str]]] = None,
+    return_columns: Optional[Union[str, List[str]]] = None,
+    batch_size: Optional[int] = None
+) -> Union[int, List[Dict[str, Any]]]:
+    """
+    Upsert many rows with multi-row INSERT ... ON CONFLICT ... DO UPDATE statements.
+
+    Rows are sent batch_size at a time in one transaction. Postgres rejects a
+    statement that updates the same row twice, so rows repeating a conflict
+    key are collapsed first, the last one winning.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async session
+        table_name (str): Name of the table
+        values_list (List[dict]): Rows to upsert, all with the same keys
+        conflict_columns (str/list): Column(s) that might conflict
+        update_columns (str/list, optional): Columns to update on conflict (defaults to all except conflict columns)
+        return_columns (str/list, optional): Columns to return for every inserted or updated row
+        batch_size (int, optional): Rows per statement. Defaults to BULK_UPSERT_BATCH_SIZE
+
+    Returns:
+        Union[int, List[Dict[str, Any]]]: Number of rows inserted or updated, or the returned rows
+    """
+    if not values_list:
+        return [] if return_columns else 0
+
+    if isinstance(conflict_columns, str):
+        conflict_columns = [conflict_columns]
+    columns = list(values_list[0].keys())
+    if any(values.keys() != values_list[0].keys() for values in values_list):
+        raise HTTPException(
+            status_code=400,
+            detail="Bulk upsert rows must all have the same columns"
+        )
+    if update_columns is None:
+        update_columns = [col for col in columns if col not in conflict_columns]
+    elif isinstance(update_columns, str):
+        update_columns = [update_columns]
+
+    # Last row wins for repeated conflict keys
+    rows = list({tuple(values[col] for col in conflict_columns): values for values in values_list}.values())
+    batch_size = min(batch_size or BULK_UPSERT_BATCH_SIZE, MAX_BIND_PARAMS // len(columns))
+
+    try:
+        affected = 0
+        returned = []
+        for start in range(0, len(rows), batch_size):
+            statement = await bulk_upsert_statement(
+                db, table_name, rows[start:start + batch_size], conflict_columns, update_columns, return_columns
+            )
+            result = await db.execute(statement)
+            if return_columns:
+                returned.extend(dict(row) for row in result.mappings())
+            else:
+                affected += result.rowcount
+        await commit(db)
+
+        return returned if return_columns else affected
+
+    except HTTPException:
+        await rollback(db)
+        raise
+    except Exception as e:
+        await rollback(db)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Bulk upsert failed: {str(e)}"
+        )
+
+
+async def get_records_by_keys(
+    db: AsyncSession,
+    table_name: str,
+    key_column: str,
+    keys: List[Any],
+    columns: Union[str, List[str]] = '*'
+) -> Dict[Any, Dict[str, Any]]:
+    """
+    Fetch the records for many keys in one query (WHERE key = ANY(:keys)).
+
+    Args:
+        db (AsyncSession): SQLAlchemy async session
+        table_name (str): Name of the table to query
+        key_column (str): Column the keys are matched against, normally unique
+        keys (list): Keys to look up
+        columns (str/list): Columns to select; key_column is always included
+
+    Returns:
+        Dict: Record per key found; missing keys are absent
+    """
+    if not keys:
+        return {}
+    statement = await load_statement(db, table_name, key_column, columns)
+    result = await db.execute(statement, {"keys": list(keys)})
+    return {row[key_column]: dict(row) for row in result.mappings()}
+
+
+class BatchLoader:
+    """
+    DataLoader-style loader that turns many single-key lookups into one query.
+
+    Every load() started in the same event loop tick is collected and
+    resolved by a single get_records_by_keys call, and results are cached for
+    the loader's lifetime. Create one loader per request and table.
+
+    Example:
+        authors = BatchLoader(db, 'users', 'id', ['id', 'name'])
+        # One query for all posts instead of one per post
+        names = await asyncio.gather(*(authors.load(post['user_id']) for post in posts))
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        table_name: str,
+        key_column: str,
+        columns: Union[str, List[str]] = '*'
+    ):
+        self.db = db
+        self.table_name = table_name
+        self.key_column = key_column
+        self.columns = columns
+        self.cache: Dict[Any, asyncio.Future] = {}
+        self.pending: Dict[Any, asyncio.Future] = {}
+        # A session runs one statement at a time, so batches go out one by one
+        self.lock = asyncio.Lock()
+        # The event loop only keeps weak references to tasks
+        self.dispatches: Set[asyncio.Task] = set()
+
+    async def load(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Record for key, or None if it doesn't exist"""
+        future = self.cache.get(key)
+        if future is None or future.cancelled():
+            loop = asyncio.get_running_loop()
+            future = self.cache[key] = loop.create_future()
+            self.pending[key] = future
+            if len(self.pending) == 1:
+                # Run after every other task scheduled for this tick has queued its keys
+                loop.call_soon(self.schedule_dispatch)
+        # Other load() calls share the future, so one caller being cancelled mustn't cancel it
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def schedule_dispatch(self):
+        task = asyncio.ensure_future(self.dispatch())
+        self.dispatches.add(task)
+        task.add_done_callback(self.dispatches.discard)
+
+    async def dispatch(self):
+        batch, self.pending = self.pending, {}
+        try:
+            async with self.lock:
+                records = await get_records_by_keys(
+                    self.db, self.table_name, self.key_column, list(batch), self.columns
+                )
+        except BaseException as e:
+            for key, future in batch.items():
+                # Failed lookups are retried by the next load() instead of cached
+                if self.cache.get(key) is future:
+                    del self.cache[key]
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            # The waiting load() calls have the error; only cancellation and exits go further
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, future in batch.items():
+            if future.cancelled():
+                # Not a result; the next load() of key looks it up again
+                if self.cache.get(key) is future:
+                    del self.cache[key]
+            elif not future.done():
+                future.set_result(records.get(key))
+
+
+async def estimate_count(
+    db: AsyncSession,
+    table_name: str,
+    where_clause: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> int:
+    """
+    Estimate the number of matching records from planner statistics.
+
+    Unfiltered counts come from pg_class.reltuples (summed over partitions),
+    filtered ones from the row estimate of EXPLAIN. Both are only as fresh as
+    the last ANALYZE, but cost the same on any table size.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async session
+        table_name (str): Name of the table to query
+        where_clause (str, optional): WHERE conditions (exclude 'WHERE')
+        params (dict, optional): Parameters for the query
+
+    Returns:
+        int: Estimated count of matching records
+    """
+    if where_clause:
+        query = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table_name} WHERE {where_clause}"
+        result = await db.execute(text(query), params or {})
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    # A table that has never been analyzed has reltuples -1 on PostgreSQL 14+,
+    # but 0 on 13 and earlier, where only relpages = 0 as well tells it apart
+    # from a table with statistics (an empty one is cheap to count exactly).
+    # A partitioned parent holds no rows itself, so its partitions are summed instead.
+    result = await execute_raw_query(db, """
+        SELECT SUM(GREATEST(reltuples, 0))::bigint AS estimate,
+               bool_or(reltuples < 0 OR (reltuples = 0 AND relpages = 0)) AS unanalyzed
+        FROM pg_class
+        WHERE relkind <> 'p'
+          AND (oid = to_regclass(:table_name)
+               OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table_name)))
+    """, {"table_name": table_name})
+    if not result or result[0]['estimate'] is None or result[0]['unanalyzed']:
+        return await count_records(db, table_name)
+    return result[0]['estimate']
+
+
+def encode_keyset_cursor(values: List[Any]) -> str:
+    """Opaque cursor for the keyset column values of the last row on a page"""
+    tagged = []
+    for value in values:
+        # Keep the Python type so the value binds back to the same column type
+        if isinstance(value, datetime):
+            tagged.append(["datetime", value.isoformat()])
+        elif isinstance(value, date):
+            tagged.append(["date", value.isoformat()])
+        elif isinstance(value, Decimal):
+            tagged.append(["decimal", str(value)])
+        elif isinstance(value, UUID):
+            tagged.append(["uuid", str(value)])
+        else:
+            tagged.append([None, value])
+    payload = json.dumps(tagged, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str) -> List[Any]:
+    decoders = {
+        "datetime": datetime.fromisoformat,
+        "date": date.fromisoformat,
+        "decimal": Decimal,
+        "uuid": UUID,
+    }
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tagged = json.loads(base64.urlsafe_b64decode(padded))
+        return [decoders[tag](value) if tag else value for tag, value in tagged]
+    except (ValueError, TypeError, KeyError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
 async def paginate(
     db: AsyncSession,
     table_name: str,
@@ -254,58 +640,158 @@ async def paginate(
     columns: Union[str, List[str]] = '*',
     where_clause: Optional[str] = None,
     params: Optional[Dict[str, Any]] = None,
-    order_by: Optional[str] = None
+    order_by: Optional[str] = None,
+    keyset: Optional[List[str]] = None,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    count: str = 'exact'
 ) -> Dict[str, Any]:
     """
     Get paginated results with metadata.
 
+    By default pages are addressed by number (LIMIT/OFFSET). Passing keyset
+    switches to keyset pagination: rows are ordered by the keyset columns and
+    each page starts after the cursor returned with the previous one, so a
+    deep page costs the same as the first. The keyset columns must identify a
+    row uniquely (end with the primary key) and should be covered by an index.
+
     Args:
         db (AsyncSession): SQLAlchemy async session
         table_name (str): Name of the table to query
-        page (int): Page number (1-indexed)
+        page (int): Page number (1-indexed), ignored in keyset mode
         page_size (int): Number of items per page
         columns (str/list): Columns to select
         where_clause (str, optional): WHERE conditions
         params (dict, optional): Parameters for the query
-        order_by (str, optional): ORDER BY clause
+        order_by (str, optional): ORDER BY clause, ignored in keyset mode
+        keyset (list, optional): Ordered column tuple for keyset pagination, e.g. ['created_at', 'id']
+        cursor (str, optional): next_cursor from the previous keyset page
+        descending (bool): Walk the keyset columns in descending order
+        count (str): 'exact' (COUNT(*)), 'estimate' (planner statistics, see estimate_count)
+            or 'none' to skip counting
 
     Returns:
         Dict: {
-            'items': [...],  # List of records
-            'total': 100,    # Total number of records
-            'page': 1,       # Current page
-            'page_size': 20, # Items per page
-            'pages': 5       # Total number of pages
+            'items': [...],       # List of records
+            'total': 100,         # Total number of records (None if count='none')
+            'page': 1,            # Current page (None in keyset mode)
+            'page_size': 20,      # Items per page
+            'pages': 5,           # Total number of pages (None if total is None)
+            'next_cursor': '...'  # Cursor for the next keyset page (None on the last page)
         }
     """
-    # Ensure positive page number
-    page = max(1, page)
+    if count not in ('exact', 'estimate', 'none'):
+        raise HTTPException(status_code=400, detail=f"Unknown count mode: {count}")
 
     # Get total count
-    total = await count_records(db, table_name, where_clause, params)
-
-    # Calculate offset
-    offset = (page - 1) * page_size
-
-    # Get data for current page
-    items = await get_data(
-        db,
-        table_name,
-        columns,
-        where_clause,
-        params,
-        order_by=order_by,
-        limit=page_size,
-        offset=offset
-    )
+    if count == 'exact':
+        total = await count_records(db, table_name, where_clause, params)
+    elif count == 'estimate':
+        total = await estimate_count(db, table_name, where_clause, params)
+    else:
+        total = None
+
+    next_cursor = None
+    if keyset:
+        page = None
+
+        # The cursor is built from the last row, so it needs the keyset columns
+        if isinstance(columns, (list, tuple)):
+            columns = list(columns) + [col for col in keyset if col not in columns]
+
+        direction = "DESC" if descending else "ASC"
+        conditions = [f"({where_clause})"] if where_clause else []
+        params = dict(params or {})
+        if cursor:
+            values = decode_keyset_cursor(cursor)
+            if len(values) != len(keyset):
+                raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+            placeholders = [f":keyset_{i}" for i in range(len(keyset))]
+            params.update({f"keyset_{i}": value for i, value in enumerate(values)})
+            # Row comparison keeps the whole tuple in index order
+            conditions.append(
+                f"({', '.join(keyset)}) {'<' if descending else '>'} ({', '.join(placeholders)})")
+
+        # Fetch one extra row to know whether there is a next page
+        items = await get_data(
+            db,
+            table_name,
+            columns,
+            " AND ".join(conditions) or None,
+            params,
+            order_by=", ".join(f"{col} {direction}" for col in keyset),
+            limit=page_size + 1
+        )
+        if len(items) > page_size:
+            items = items[:page_size]
+            next_cursor = encode_keyset_cursor([items[-1][col] for col in keyset])
+    else:
+        # Ensure positive page number
+        page = max(1, page)
+
+        # Calculate offset
+        offset = (page - 1) * page_size
+
+        # Get data for current page
+        items = await get_data(
+            db,
+            table_name,
+            columns,
+            where_clause,
+            params,
+            order_by=order_by,
+            limit=page_size,
+            offset=offset
+        )
 
     # Calculate total pages
-    total_pages = (total + page_size - 1) // page_size
+    total_pages = (total + page_size - 1) // page_size if total is not None else None
 
     return {
         'items': items,
         'total': total,
         'page': page,
         'page_size': page_size,
-        'pages': total_pages
+        'pages': total_pages,
+        'next_cursor': next_cursor
     }
+
+
+def json_default(value: Any) -> Any:
+    """JSON encoding for the column types json.dumps doesn't handle"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+async def ndjson_lines(rows: AsyncIterator[Dict[str, Any]]) -> AsyncGenerator[str, None]:
+    """Encode rows as newline-delimited JSON"""
+    async for row in rows:
+        yield json.dumps(row, default=json_default) + "\n"
+
+
+def ndjson_response(rows: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Stream rows to the client as NDJSON while they are read from the database.
+
+    Args:
+        rows: Async iterator of row dictionaries, e.g. from stream_data
+
+    Returns:
+        StreamingResponse: application/x-ndjson response, one row per line
+
+    Example:
+        The session must outlive the route function, so open it inside the
+        generator instead of using Depends(get_db):
+
+        @app.get("/export/users")
+        async def export_users():
+            async def rows():
+                async with AsyncSessionLocal() as db:
+                    async for row in stream_data(db, 'users', order_by='created_at'):
+                        yield row
+            return ndjson_response(rows())
+    """
+    return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson")
@@ -0,0 +1,303 @@
+# Statement timing, pool checkout wait and slow-query logging on SQLAlchemy engine events
+# Replaces echo=True: nothing is logged per statement, latencies are aggregated
+# in memory and exposed through metrics_snapshot() (GET /metrics/db).
+import logging
+import os
+import random
+import re
+import threading
+import time
+from functools import partial
+from collections import OrderedDict, deque
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Statements slower than this are candidates for the slow-query log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Fraction of slow statements that are logged (and possibly explained)
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "0.1"))
+# EXPLAIN each slow statement shape at most once per this many seconds
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "300"))
+# Shapes beyond this many are counted together under OTHER_SHAPE
+MAX_STATEMENT_SHAPES = int(os.getenv("MAX_STATEMENT_SHAPES", "500"))
+SLOW_QUERY_LOG_SIZE = 100
+
+# Histogram upper bounds in milliseconds; the last bucket is unbounded
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+OTHER_SHAPE = "<other>"
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+")
+PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:::[\w\[\] ]+)?(?:\s*,\s*\?(?:::[\w\[\] ]+)?)+\s*\)")
+VALUES_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+WHITESPACE = re.compile(r"\s+")
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+class Histogram:
+    """Latency distribution over BUCKETS_MS"""
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.buckets[i] += 1
+                break
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= target:
+                return round(min(bound, self.max_ms), 3)
+        return round(self.max_ms, 3)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {("+Inf" if bound == float("inf") else str(bound)): count
+                        for bound, count in zip(BUCKETS_MS, self.buckets)},
+        }
+
+
+class Metrics:
+    """Process-wide database metrics; every method is thread-safe"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.statements: Dict[str, Histogram] = {}
+        self.checkouts: Dict[str, Histogram] = {}
+        self.slow_queries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self.explained_at: Dict[str, float] = {}
+        # Normalizing is regex heavy, and the same SQL strings repeat
+        self.shapes: "OrderedDict[str, str]" = OrderedDict()
+
+    def shape(self, statement: str) -> str:
+        with self.lock:
+            shape = self.shapes.get(statement)
+            if shape is not None:
+                self.shapes.move_to_end(statement)
+                return shape
+        shape = statement_shape(statement)
+        with self.lock:
+            self.shapes[statement] = shape
+            if len(self.shapes) > MAX_STATEMENT_SHAPES * 4:
+                self.shapes.popitem(last=False)
+        return shape
+
+    def observe_statement(self, shape: str, ms: float):
+        with self.lock:
+            histogram = self.statements.get(shape)
+            if histogram is None:
+                if len(self.statements) >= MAX_STATEMENT_SHAPES:
+                    shape = OTHER_SHAPE
+                histogram = self.statements.setdefault(shape, Histogram())
+            histogram.observe(ms)
+
+    def observe_checkout(self, pool: str, ms: float):
+        with self.lock:
+            self.checkouts.setdefault(pool, Histogram()).observe(ms)
+
+    def should_explain(self, shape: str) -> bool:
+        now = time.monotonic()
+        with self.lock:
+            if now - self.explained_at.get(shape, float("-inf")) < SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+                return False
+            self.explained_at[shape] = now
+            return True
+
+    def record_slow_query(self, entry: Dict[str, Any]):
+        with self.lock:
+            self.slow_queries.append(entry)
+
+    def reset(self):
+        with self.lock:
+            self.statements.clear()
+            self.checkouts.clear()
+            self.slow_queries.clear()
+            self.explained_at.clear()
+
+
+metrics = Metrics()
+instrumented_engines: Dict[str, Engine] = {}
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with literals and parameter lists collapsed, so equivalent statements share one histogram"""
+    shape = STRING_LITERAL.sub("?", statement)
+    shape = PLACEHOLDER.sub("?", shape)
+    shape = NUMBER_LITERAL.sub("?", shape)
+    shape = PLACEHOLDER_LIST.sub("(...)", shape)
+    shape = VALUES_ROWS.sub("(...), ...", shape)
+    return WHITESPACE.sub(" ", shape).strip()
+
+
+class TimedCheckoutPool:
+    """Pool mixin recording how long each connection checkout waited"""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            metrics.observe_checkout(self.logging_name or "default", (time.perf_counter() - start) * 1000)
+
+
+class InstrumentedQueuePool(TimedCheckoutPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncPool(TimedCheckoutPool, AsyncAdaptedQueuePool):
+    pass
+
+
+def explain(conn, statement: str, parameters) -> List[str]:
+    """
+    Plan of a statement on the connection that just ran it (no ANALYZE, so nothing runs twice).
+
+    The EXPLAIN runs inside a savepoint of the caller's transaction, so if it
+    fails (lock timeout, cancelled, a statement EXPLAIN doesn't accept) only
+    the savepoint is rolled back and the caller's transaction carries on.
+    """
+    dbapi_connection = conn.connection.dbapi_connection
+    # Outside a transaction there is nothing to protect, and SAVEPOINT would fail
+    in_transaction = not getattr(dbapi_connection, "autocommit", False)
+    cursor = dbapi_connection.cursor()
+    try:
+        if in_transaction:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters)
+            plan = [row[0] for row in cursor.fetchall()]
+        except Exception:
+            if in_transaction:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            raise
+        if in_transaction:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        return plan
+    finally:
+        cursor.close()
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.instrumentation_start = time.perf_counter()
+
+
+def after_cursor_execute(name, conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "instrumentation_start", None)
+    if start is None:
+        return
+    ms = (time.perf_counter() - start) * 1000
+    shape = metrics.shape(statement)
+    metrics.observe_statement(shape, ms)
+
+    if ms < SLOW_QUERY_MS or random.random() >= SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    entry = {
+        "at": time.time(),
+        "engine": name,
+        "duration_ms": round(ms, 3),
+        "shape": shape,
+        "plan": None,
+    }
+    # Streaming statements still hold an open cursor on the connection
+    explainable = (
+        not executemany
+        and statement.lstrip().upper().startswith(EXPLAINABLE)
+        and not context.execution_options.get("stream_results")
+        and not context.execution_options.get("yield_per")
+    )
+    if explainable and metrics.should_explain(shape):
+        try:
+            entry["plan"] = explain(conn, statement, parameters)
+        except Exception as e:
+            entry["plan"] = [f"EXPLAIN failed: {e}"]
+    metrics.record_slow_query(entry)
+    logger.warning(f"Slow query ({ms:.0f}ms): {shape}" + (
+        "\n" + "\n".join(entry["plan"]) if entry["plan"] else ""))
+
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Attach statement timing and the slow-query log to an engine.
+
+    Args:
+        engine (Engine): Sync engine, or AsyncEngine.sync_engine
+        name (str): Label for the engine in metrics_snapshot()
+    """
+    if name in instrumented_engines:
+        return
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", partial(after_cursor_execute, name))
+    instrumented_engines[name] = engine
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    return status
+
+
+def metrics_snapshot(top: int = 50) -> Dict[str, Any]:
+    """
+    Current database metrics.
+
+    Args:
+        top (int): Number of statement shapes to include, by total time
+
+    Returns:
+        Dict: statements (per-shape latency histograms), pools (checkout wait
+        histograms and current status) and slow_queries (most recent first)
+    """
+    with metrics.lock:
+        statements = sorted(metrics.statements.items(), key=lambda item: item[1].total_ms, reverse=True)
+        statement_stats = [{"shape": shape, **histogram.snapshot()} for shape, histogram in statements[:top]]
+        checkouts = {pool: histogram.snapshot() for pool, histogram in metrics.checkouts.items()}
+        slow_queries = list(reversed(metrics.slow_queries))
+
+    pools = {}
+    for name, engine in instrumented_engines.items():
+        pool_name = engine.pool.logging_name or "default"
+        pools[name] = {**pool_status(engine), "checkout_wait": checkouts.get(pool_name)}
+
+    return {
+        "statement_shapes": len(metrics.statements),
+        "statements": statement_stats,
+        "pools": pools,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "slow_query_sample_rate": SLOW_QUERY_SAMPLE_RATE,
+        "slow_queries": slow_queries,
+    }
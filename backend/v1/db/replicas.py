@@ -0,0 +1,158 @@
+# Read-replica routing for read-only requests
+# Writes always go to the primary (v1.db.db.async_engine)
+import asyncio
+import itertools
+import logging
+import os
+import time
+from typing import AsyncGenerator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from v1.db.db import AsyncSessionLocal, user, password, database, port
+from v1.db.instrumentation import InstrumentedAsyncPool, instrument_engine
+
+logger = logging.getLogger(__name__)
+
+# Comma separated host[:port] list, e.g. "db_replica" or "replica1:5432,replica2:5432"
+REPLICA_HOSTS = [h.strip() for h in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+# Replicas further behind the primary than this are skipped
+MAX_REPLICA_LAG_SECONDS = float(os.environ.get('DB_REPLICA_MAX_LAG_SECONDS', '5'))
+# How often each replica's health and lag are re-checked
+REPLICA_CHECK_INTERVAL_SECONDS = float(os.environ.get('DB_REPLICA_CHECK_INTERVAL_SECONDS', '5'))
+
+# Replicas that can't be connected to and queried within this long count as down
+REPLICA_CHECK_TIMEOUT_SECONDS = float(os.environ.get('DB_REPLICA_CHECK_TIMEOUT_SECONDS', '2'))
+
+# Whether the WAL receiver is running matters because receive and replay LSNs
+# are also equal when it has disconnected and nothing new arrives
+STATUS_QUERY = text("""
+    SELECT pg_is_in_recovery() AS standby,
+           EXISTS (SELECT 1 FROM pg_stat_wal_receiver) AS receiving,
+           pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() AS caught_up,
+           EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) AS replay_age
+""")
+
+
+def replication_lag(standby: bool, receiving: bool, caught_up: Optional[bool],
+                    replay_age: Optional[float]) -> Optional[float]:
+    """
+    Seconds a standby is behind the primary, from STATUS_QUERY's columns.
+
+    Returns:
+        None if the server is not a standby, 0 if it is streaming and has
+        replayed everything it received, otherwise the age of the last
+        replayed transaction (infinite if it never replayed one)
+    """
+    if not standby:
+        return None
+    if receiving and caught_up:
+        return 0.0
+    return float(replay_age) if replay_age is not None else float('inf')
+
+
+class Replica:
+    """One read replica with its own pool and last known health"""
+
+    def __init__(self, host: str):
+        hostname, _, replica_port = host.partition(':')
+        self.host = host
+        self.engine: AsyncEngine = create_async_engine(
+            f"postgresql+asyncpg://{user}:{password}@{hostname}:{replica_port or port}/{database}",
+            poolclass=InstrumentedAsyncPool,
+            pool_logging_name=f"replica:{host}",
+            pool_size=10,
+            max_overflow=5,
+            pool_pre_ping=True,
+            pool_timeout=5,
+            pool_recycle=1800,
+            # asyncpg's default connect timeout is 60s, far too long for a blackholed replica
+            connect_args={"timeout": REPLICA_CHECK_TIMEOUT_SECONDS},
+        )
+        instrument_engine(self.engine.sync_engine, f"replica:{host}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.checked_at = 0.0
+
+    async def _status(self):
+        async with self.engine.connect() as conn:
+            return (await conn.execute(STATUS_QUERY)).one()
+
+    async def check(self):
+        """Refresh health and replication lag"""
+        self.checked_at = time.monotonic()
+        try:
+            # Connecting is bounded too, not just the query
+            status = await asyncio.wait_for(self._status(), timeout=REPLICA_CHECK_TIMEOUT_SECONDS)
+            # None means the server is not a standby at all
+            self.lag = replication_lag(status.standby, status.receiving, status.caught_up, status.replay_age)
+            self.healthy = self.lag is not None and self.lag <= MAX_REPLICA_LAG_SECONDS
+        except Exception as e:
+            logger.warning(f"Replica {self.host} health check failed: {e}")
+            self.healthy = False
+            self.lag = None
+
+
+class ReplicaRouter:
+    """
+    Round-robins read-only sessions over healthy replicas, falling back to the primary.
+
+    Health checks run in a background task started by the first read after
+    REPLICA_CHECK_INTERVAL_SECONDS, so a slow or unreachable replica never
+    holds up a request; until a replica's first check passes, reads go to
+    the primary.
+    """
+
+    def __init__(self, replicas: List[Replica]):
+        self.replicas = replicas
+        self._cycle = itertools.cycle(replicas) if replicas else None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def _refresh(self, replicas: List[Replica]):
+        await asyncio.gather(*(r.check() for r in replicas))
+
+    def _schedule_refresh(self):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        stale = [r for r in self.replicas
+                 if time.monotonic() - r.checked_at >= REPLICA_CHECK_INTERVAL_SECONDS]
+        if stale:
+            # Kept on the router so the task isn't garbage collected mid-check
+            self._refresh_task = asyncio.create_task(self._refresh(stale))
+
+    async def reader(self) -> sessionmaker:
+        """Session factory for a read-only request"""
+        if not self.replicas:
+            return AsyncSessionLocal
+        self._schedule_refresh()
+        for _ in range(len(self.replicas)):
+            replica = next(self._cycle)
+            if replica.healthy:
+                return replica.session_factory
+        return AsyncSessionLocal
+
+    def dispose(self, close: bool = True):
+        for replica in self.replicas:
+            replica.engine.sync_engine.dispose(close=close)
+
+
+router = ReplicaRouter([Replica(host) for host in REPLICA_HOSTS])
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    return any(session.bind is replica.engine for replica in router.replicas)
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides a session for read-only route functions.
+
+    Uses a healthy replica within DB_REPLICA_MAX_LAG_SECONDS when any are
+    configured, otherwise the primary. Never use it for writes.
+    """
+    session_factory = await router.reader()
+    async with session_factory() as session:
+        yield session
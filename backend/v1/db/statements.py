@@ -0,0 +1,295 @@
+# Validated, cached Core statements for the dynamic CRUD helpers
+# Table and column names are checked against reflected metadata, and each
+# statement is built once per shape so SQLAlchemy's compiled cache and
+# asyncpg's prepared statements are reused across calls.
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException
+from sqlalchemy import MetaData, Table, any_, bindparam, delete, select, text, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import NoSuchTableError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+# A :name bind parameter in a text fragment (same rule as sqlalchemy.text)
+BIND_PARAM = re.compile(r"(?<![:\w\x5c]):(\w+)(?!:)")
+# An ORDER BY item: a column with an optional direction and NULLS placement
+ORDER_ITEM = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)(\s+(ASC|DESC))?(\s+NULLS\s+(FIRST|LAST))?$", re.IGNORECASE)
+
+# Statements kept, least recently used dropped first; keys include the raw
+# where_clause / order_by text, so callers that inline values make new shapes
+STATEMENT_CACHE_SIZE = int(os.getenv("STATEMENT_CACHE_SIZE", "500"))
+
+metadata = MetaData()
+statement_cache: "OrderedDict[Tuple, Any]" = OrderedDict()
+
+
+def clear_statement_cache():
+    """Forget reflected tables and cached statements, e.g. after a migration"""
+    statement_cache.clear()
+    metadata.clear()
+
+
+def column_list(columns: Optional[Union[str, List[str]]]) -> Tuple[str, ...]:
+    """Normalize 'a, b' or ['a', 'b'] to ('a', 'b')"""
+    if not columns:
+        return ()
+    if isinstance(columns, str):
+        columns = columns.split(',')
+    return tuple(col.strip() for col in columns)
+
+
+async def get_table(db: AsyncSession, table_name: str) -> Table:
+    """Reflect a table once per process, rejecting names that don't exist"""
+    schema, _, name = table_name.rpartition('.')
+    if not IDENTIFIER.match(name) or (schema and not IDENTIFIER.match(schema)):
+        raise HTTPException(status_code=400, detail=f"Invalid table name: {table_name}")
+
+    key = f"{schema}.{name}" if schema else name
+    if key not in metadata.tables:
+        try:
+            await db.run_sync(lambda session: Table(
+                name, metadata, schema=schema or None, autoload_with=session.connection()))
+        except NoSuchTableError:
+            raise HTTPException(status_code=400, detail=f"Unknown table: {table_name}")
+    return metadata.tables[key]
+
+
+def table_columns(table: Table, columns: Tuple[str, ...]) -> List:
+    unknown = [col for col in columns if col not in table.c]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown column(s) for {table.name}: {', '.join(unknown)}"
+        )
+    return [table.c[col] for col in columns]
+
+
+def order_clauses(table: Table, order_by: Optional[str]) -> List:
+    if not order_by:
+        return []
+    clauses = []
+    for item in order_by.split(','):
+        match = ORDER_ITEM.match(item.strip())
+        if not match:
+            raise HTTPException(status_code=400, detail=f"Invalid ORDER BY item: {item.strip()}")
+        column = table_columns(table, (match.group(1),))[0]
+        clause = column.desc() if (match.group(3) or '').upper() == 'DESC' else column.asc()
+        if match.group(5):
+            clause = clause.nulls_first() if match.group(5).upper() == 'FIRST' else clause.nulls_last()
+        clauses.append(clause)
+    return clauses
+
+
+def returning(statement, table: Table, return_columns: Tuple[str, ...]):
+    if not return_columns:
+        return statement
+    if return_columns == ('*',):
+        return statement.returning(*table.c)
+    return statement.returning(*table_columns(table, return_columns))
+
+
+async def cached(db: AsyncSession, key: Tuple, build) -> Any:
+    """Return the statement cached under key, building it on first use"""
+    statement = statement_cache.get(key)
+    if statement is not None:
+        statement_cache.move_to_end(key)
+        return statement
+    table = await get_table(db, key[1])
+    statement = statement_cache[key] = build(table)
+    if len(statement_cache) > STATEMENT_CACHE_SIZE:
+        statement_cache.popitem(last=False)
+    return statement
+
+
+async def select_statement(
+    db: AsyncSession,
+    table_name: str,
+    columns: Union[str, List[str]] = '*',
+    where_clause: Optional[str] = None,
+    order_by: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: Optional[int] = None
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    SELECT statement for get_data and stream_data.
+
+    Returns:
+        (statement, extra bind parameters for LIMIT/OFFSET)
+    """
+    column_names = column_list(columns)
+    key = ('select', table_name, column_names, where_clause, order_by, limit is not None, offset is not None)
+
+    def build(table: Table):
+        if column_names == ('*',):
+            statement = select(table)
+        else:
+            statement = select(*table_columns(table, column_names))
+        if where_clause:
+            statement = statement.where(text(where_clause))
+        statement = statement.order_by(*order_clauses(table, order_by))
+        # Bound, not literal, so every page size shares one statement
+        if limit is not None:
+            statement = statement.limit(bindparam('_limit'))
+        if offset is not None:
+            statement = statement.offset(bindparam('_offset'))
+        return statement
+
+    statement = await cached(db, key, build)
+    bounds = {}
+    if limit is not None:
+        bounds['_limit'] = limit
+    if offset is not None:
+        bounds['_offset'] = offset
+    return statement, bounds
+
+
+async def insert_statement(
+    db: AsyncSession,
+    table_name: str,
+    columns: List[str],
+    return_columns: Optional[Union[str, List[str]]] = None
+):
+    """INSERT for insert_data; execute it with the values dict as parameters"""
+    column_names = tuple(columns)
+    return_names = column_list(return_columns)
+    key = ('insert', table_name, column_names, return_names)
+
+    def build(table: Table):
+        table_columns(table, column_names)
+        return returning(insert(table), table, return_names)
+
+    return await cached(db, key, build)
+
+
+async def update_statement(
+    db: AsyncSession,
+    table_name: str,
+    columns: List[str],
+    where_clause: Optional[str] = None,
+    return_columns: Optional[Union[str, List[str]]] = None
+):
+    """
+    UPDATE for update_data.
+
+    SQLAlchemy reserves bind names matching a column for the SET clause, so
+    SET values bind as set_<column> and where_clause parameters as
+    where_<name>; see update_params.
+    """
+    column_names = tuple(columns)
+    return_names = column_list(return_columns)
+    key = ('update', table_name, column_names, where_clause, return_names)
+
+    def build(table: Table):
+        values = {column: bindparam(f"set_{column.name}", type_=column.type)
+                  for column in table_columns(table, column_names)}
+        statement = update(table).values(values)
+        if where_clause:
+            statement = statement.where(text(BIND_PARAM.sub(r":where_\1", where_clause)))
+        return returning(statement, table, return_names)
+
+    return await cached(db, key, build)
+
+
+def update_params(set_values: Dict[str, Any], params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parameters for a statement from update_statement"""
+    bound = {f"where_{name}": value for name, value in (params or {}).items()}
+    bound.update({f"set_{col}": value for col, value in set_values.items()})
+    return bound
+
+
+async def delete_statement(
+    db: AsyncSession,
+    table_name: str,
+    where_clause: str,
+    return_columns: Optional[Union[str, List[str]]] = None
+):
+    """DELETE for delete_data"""
+    return_names = column_list(return_columns)
+    key = ('delete', table_name, where_clause, return_names)
+
+    def build(table: Table):
+        return returning(delete(table).where(text(where_clause)), table, return_names)
+
+    return await cached(db, key, build)
+
+
+async def upsert_statement(
+    db: AsyncSession,
+    table_name: str,
+    columns: List[str],
+    conflict_columns: List[str],
+    update_columns: List[str],
+    return_columns: Optional[Union[str, List[str]]] = None
+):
+    """INSERT ... ON CONFLICT DO UPDATE for upsert_data; execute it with the values dict"""
+    column_names = tuple(columns)
+    return_names = column_list(return_columns)
+    key = ('upsert', table_name, column_names, tuple(conflict_columns), tuple(update_columns), return_names)
+
+    def build(table: Table):
+        table_columns(table, column_names)
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=table_columns(table, tuple(conflict_columns)),
+            set_={column.name: statement.excluded[column.name]
+                  for column in table_columns(table, tuple(update_columns))},
+        )
+        return returning(statement, table, return_names)
+
+    return await cached(db, key, build)
+
+
+async def bulk_upsert_statement(
+    db: AsyncSession,
+    table_name: str,
+    rows: List[Dict[str, Any]],
+    conflict_columns: List[str],
+    update_columns: List[str],
+    return_columns: Optional[Union[str, List[str]]] = None
+):
+    """
+    Multi-row INSERT ... ON CONFLICT DO UPDATE for bulk_upsert.
+
+    The rows are part of the statement, so it is not cached; bulk_upsert
+    sends fixed-size chunks to keep the number of distinct shapes small.
+    """
+    table = await get_table(db, table_name)
+    table_columns(table, tuple(rows[0].keys()))
+    statement = insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=table_columns(table, tuple(conflict_columns)),
+        set_={column.name: statement.excluded[column.name]
+              for column in table_columns(table, tuple(update_columns))},
+    )
+    return returning(statement, table, column_list(return_columns))
+
+
+async def load_statement(
+    db: AsyncSession,
+    table_name: str,
+    key_column: str,
+    columns: Union[str, List[str]] = '*'
+):
+    """
+    SELECT ... WHERE key_column = ANY(:keys) for the batch loader.
+
+    The keys bind as one array parameter, so every batch size shares a
+    single statement.
+    """
+    column_names = column_list(columns)
+    key = ('load', table_name, key_column, column_names)
+
+    def build(table: Table):
+        key_col = table_columns(table, (key_column,))[0]
+        if column_names == ('*',):
+            statement = select(table)
+        else:
+            # The loader maps rows back to keys, so the key is always selected
+            statement = select(*table_columns(table, tuple(dict.fromkeys(column_names + (key_column,)))))
+        return statement.where(key_col == any_(bindparam('keys', type_=ARRAY(key_col.type))))
+
+    return await cached(db, key, build)
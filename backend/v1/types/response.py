@@ -1,5 +1,5 @@
 from typing import List, Dict, Any, Optional, Generic, TypeVar, Union
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from datetime import datetime
 
 # Generic type variable for data payload
@@ -11,8 +11,7 @@ class BaseResponse(BaseModel):
     success: bool = True
     timestamp: datetime = Field(default_factory=datetime.now)
 
-    class Config:
-        extra = "allow"  # Allow extra fields
+    model_config = ConfigDict(extra="allow")  # Allow extra fields
 
 
 class ErrorDetail(BaseModel):
@@ -29,117 +28,115 @@ class ErrorResponse(BaseResponse):
     status_code: int
     error: ErrorDetail
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": False,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "status_code": 400,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "Invalid input parameters",
-                    "field": "email",
-                    "details": {"constraint": "must be a valid email"}
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": False,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "status_code": 400,
+            "error": {
+                "code": "VALIDATION_ERROR",
+                "message": "Invalid input parameters",
+                "field": "email",
+                "details": {"constraint": "must be a valid email"}
             }
         }
+    })
 
 
 class DataResponse(BaseResponse, Generic[T]):
     """Standard successful response model with generic data field"""
     data: T
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "data": {}  # Will be populated with actual data
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "data": {}  # Will be populated with actual data
         }
+    })
 
 
 class SingleRecordResponse(DataResponse[Dict[str, Any]]):
     """Response model for a single database record"""
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "data": {
-                    "id": 1,
-                    "name": "Example",
-                    "created_at": "2025-03-30T10:00:00Z"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "data": {
+                "id": 1,
+                "name": "Example",
+                "created_at": "2025-03-30T10:00:00Z"
             }
         }
+    })
 
 
 class MultipleRecordsResponse(DataResponse[List[Dict[str, Any]]]):
     """Response model for multiple database records"""
     count: int = Field(..., description="Number of records returned")
 
-    @validator('count', pre=True, always=True)
-    def set_count_from_data(cls, v, values):
+    @model_validator(mode="before")
+    @classmethod
+    def set_count_from_data(cls, values):
         """Automatically set count based on data length if not provided"""
-        if 'data' in values and v is None:
-            return len(values['data'])
-        return v
-
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "count": 2,
-                "data": [
-                    {
-                        "id": 1,
-                        "name": "Example 1",
-                        "created_at": "2025-03-30T10:00:00Z"
-                    },
-                    {
-                        "id": 2,
-                        "name": "Example 2",
-                        "created_at": "2025-03-30T11:00:00Z"
-                    }
-                ]
-            }
+        if isinstance(values, dict) and values.get('count') is None and 'data' in values:
+            return {**values, 'count': len(values['data'])}
+        return values
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "count": 2,
+            "data": [
+                {
+                    "id": 1,
+                    "name": "Example 1",
+                    "created_at": "2025-03-30T10:00:00Z"
+                },
+                {
+                    "id": 2,
+                    "name": "Example 2",
+                    "created_at": "2025-03-30T11:00:00Z"
+                }
+            ]
         }
+    })
 
 
 class PaginatedResponse(MultipleRecordsResponse):
     """Response model for paginated database records"""
-    page: int
+    page: Optional[int] = Field(None, description="Current page (None for keyset pages)")
     page_size: int
-    total: int
-    pages: int
-
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "count": 2,
-                "page": 1,
-                "page_size": 20,
-                "total": 42,
-                "pages": 3,
-                "data": [
-                    {
-                        "id": 1,
-                        "name": "Example 1",
-                        "created_at": "2025-03-30T10:00:00Z"
-                    },
-                    {
-                        "id": 2,
-                        "name": "Example 2",
-                        "created_at": "2025-03-30T11:00:00Z"
-                    }
-                ]
-            }
+    total: Optional[int] = Field(None, description="Total records (exact or estimated, None if not counted)")
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next keyset page")
+
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "count": 2,
+            "page": 1,
+            "page_size": 20,
+            "total": 42,
+            "pages": 3,
+            "next_cursor": None,
+            "data": [
+                {
+                    "id": 1,
+                    "name": "Example 1",
+                    "created_at": "2025-03-30T10:00:00Z"
+                },
+                {
+                    "id": 2,
+                    "name": "Example 2",
+                    "created_at": "2025-03-30T11:00:00Z"
+                }
+            ]
         }
+    })
 
 
 class InsertResponse(SingleRecordResponse):
@@ -147,33 +144,31 @@ class InsertResponse(SingleRecordResponse):
     id: Optional[Union[int, str]] = Field(
         None, description="ID of the inserted record")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "id": 42,
+            "data": {
                 "id": 42,
-                "data": {
-                    "id": 42,
-                    "name": "New Record",
-                    "created_at": "2025-03-31T12:34:56Z"
-                }
+                "name": "New Record",
+                "created_at": "2025-03-31T12:34:56Z"
             }
         }
+    })
 
 
 class BulkInsertResponse(BaseResponse):
     """Response model for bulk INSERT operations"""
     count: int = Field(..., description="Number of records inserted")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "count": 5
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "count": 5
         }
+    })
 
 
 class UpdateResponse(BaseResponse):
@@ -182,19 +177,18 @@ class UpdateResponse(BaseResponse):
     data: Optional[Dict[str, Any]] = Field(
         None, description="Updated record (if returned)")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "count": 1,
-                "data": {
-                    "id": 42,
-                    "name": "Updated Record",
-                    "updated_at": "2025-03-31T12:34:56Z"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "count": 1,
+            "data": {
+                "id": 42,
+                "name": "Updated Record",
+                "updated_at": "2025-03-31T12:34:56Z"
             }
         }
+    })
 
 
 class UpsertResponse(BaseResponse):
@@ -204,33 +198,31 @@ class UpsertResponse(BaseResponse):
     data: Optional[Dict[str, Any]] = Field(
         None, description="Inserted/updated record (if returned)")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "operation": "update",
-                "data": {
-                    "id": 42,
-                    "name": "Upserted Record",
-                    "updated_at": "2025-03-31T12:34:56Z"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "operation": "update",
+            "data": {
+                "id": 42,
+                "name": "Upserted Record",
+                "updated_at": "2025-03-31T12:34:56Z"
             }
         }
+    })
 
 
 class DeleteResponse(BaseResponse):
     """Response model for DELETE operations"""
     count: int = Field(..., description="Number of records deleted")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "count": 1
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "count": 1
         }
+    })
 
 
 class TransactionResponse(BaseResponse):
@@ -238,42 +230,39 @@ class TransactionResponse(BaseResponse):
     results: List[Dict[str, Any]
                   ] = Field(..., description="Results of each operation in the transaction")
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "results": [
-                    {"operation": "insert", "id": 42},
-                    {"operation": "update", "count": 1}
-                ]
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "results": [
+                {"operation": "insert", "id": 42},
+                {"operation": "update", "count": 1}
+            ]
         }
+    })
 
 
 class ExistsResponse(BaseResponse):
     """Response model for EXISTS checks"""
     exists: bool
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "exists": True
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "exists": True
         }
+    })
 
 
 class CountResponse(BaseResponse):
     """Response model for COUNT operations"""
     count: int
 
-    class Config:
-        schema_extra = {
-            "example": {
-                "success": True,
-                "timestamp": "2025-03-31T12:34:56.789Z",
-                "count": 42
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "success": True,
+            "timestamp": "2025-03-31T12:34:56.789Z",
+            "count": 42
         }
+    })
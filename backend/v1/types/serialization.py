@@ -0,0 +1,85 @@
+# Fast JSON rendering for API responses
+# ORJSONResponse renders plain content with orjson and envelope models with
+# their pre-built Pydantic serializers; envelope_response() additionally skips
+# validation for payloads that come straight from the database.
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Type
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+from v1.types.response import (
+    BaseResponse, ErrorResponse, SingleRecordResponse, MultipleRecordsResponse,
+    PaginatedResponse, InsertResponse, BulkInsertResponse, UpdateResponse, UpsertResponse,
+    DeleteResponse, TransactionResponse, ExistsResponse, CountResponse
+)
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# One adapter per envelope, built once at import rather than per response
+ENVELOPE_ADAPTERS: Dict[Type[BaseModel], TypeAdapter] = {
+    model: TypeAdapter(model)
+    for model in (
+        BaseResponse, ErrorResponse, SingleRecordResponse, MultipleRecordsResponse, PaginatedResponse,
+        InsertResponse, BulkInsertResponse, UpdateResponse, UpsertResponse, DeleteResponse,
+        TransactionResponse, ExistsResponse, CountResponse,
+    )
+}
+
+
+def orjson_default(value: Any) -> Any:
+    """Types orjson doesn't serialize natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize envelopes with their TypeAdapter and anything else with orjson"""
+    adapter = ENVELOPE_ADAPTERS.get(type(content))
+    if adapter is not None:
+        return adapter.dump_json(content)
+    if isinstance(content, BaseModel):
+        return content.model_dump_json().encode()
+    return orjson.dumps(content, default=orjson_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, or the model's own serializer for envelopes"""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+def build_envelope(model: Type[BaseModel], **fields) -> BaseModel:
+    """
+    Build an envelope without validating it.
+
+    Only for trusted payloads (rows just read from the database, values the
+    server computed): the fields are used as given, so a wrong type is not
+    caught until serialization.
+    """
+    fields.setdefault("success", True)
+    fields.setdefault("timestamp", datetime.now())
+    # model_construct skips validators, so derive count the way MultipleRecordsResponse does
+    if "count" in model.model_fields and fields.get("count") is None and "data" in fields:
+        fields["count"] = len(fields["data"])
+    return model.model_construct(**fields)
+
+
+def envelope_response(model: Type[BaseModel], status_code: int = 200, **fields) -> Response:
+    """
+    Serialize an envelope straight to a response, skipping validation.
+
+    Example:
+        rows = await get_data(db, 'users', limit=10000)
+        return envelope_response(MultipleRecordsResponse, data=rows)
+    """
+    content = dump_json(build_envelope(model, **fields))
+    return Response(content=content, status_code=status_code, media_type="application/json")